@@ -1,25 +1,26 @@
-import re
-import spacy
-from bs4 import BeautifulSoup
+from main_file.nlp_models import get_nlp, NER_COMPONENTS
+from main_file.chunked_ner import chunked_entities
+from main_file.content_rank import rank_sections
+from main_file.keyword_rank import rank_keywords
+from main_file.formats import is_format
+from main_file.html_extract import extract_html_file, log_content_stats
+from main_file import instrument
 import logging
-from sumy.parsers.plaintext import PlaintextParser
-from sumy.nlp.tokenizers import Tokenizer
-from sumy.summarizers.text_rank import TextRankSummarizer
 
 # 配置日志记录
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
 
 # 解析HTML文件的函数
+@instrument.instrumented('parse_html')
 def parse_html(file_path):
     try:
         if not file_path or not isinstance(file_path, str):
             raise ValueError("无效的文件路径，路径必须是字符串类型")
-        with open(file_path, 'r', encoding='utf-8') as file:
-            html_content = file.read()
-            soup = BeautifulSoup(html_content, 'html.parser')
-            text_content = soup.get_text()
-            return text_content
+        # 单次流式遍历提取正文，去掉导航、页脚等样板内容，不构建文档树
+        content = extract_html_file(file_path, text_only=True, main_content=True)
+        log_content_stats(content.stats, file_path)
+        return content.text
     except FileNotFoundError:
         logging.error(f"文件未找到: {file_path}")
         return ""
@@ -32,30 +33,30 @@ def parse_html(file_path):
 
 
 # 使用TextRank算法提取关键词
+@instrument.instrumented('extract_keywords')
 def extract_keywords(text):
     try:
         if not text or not isinstance(text, str):
             raise ValueError("无效的文本输入，文本必须是字符串类型")
-        parser = PlaintextParser.from_string(text, Tokenizer("english"))
-        summarizer = TextRankSummarizer()
-        keywords = summarizer(parser.document, 10)
-        return [keyword.word for keyword in keywords]
+        # 基于词共现图的 PageRank 关键词排序，返回按得分从高到低的关键词
+        return [keyword.word for keyword in rank_keywords(text)]
     except Exception as e:
         logging.error(f"关键词提取时出错: {e}")
         return []
 
 
 # 使用NER识别品牌名称、热门关键词、流行趋势的函数
+@instrument.instrumented('ner_analysis')
 def ner_analysis(text):
     try:
         if not text or not isinstance(text, str):
             raise ValueError("无效的文本输入，文本必须是字符串类型")
-        nlp = spacy.load("en_core_web_sm")
-        doc = nlp(text)
+        nlp = get_nlp("en", components=NER_COMPONENTS)
+        # 分块进行NER（相邻片段有重叠，重叠区域的重复实体会被去掉），超过spacy max_length的长文档也能处理
         brand_names = []
-        for ent in doc.ents:
-            if ent.label_ in ["ORG", "PRODUCT"]:
-                brand_names.append(ent.text)
+        for ent_text, label, _, _ in chunked_entities(text, nlp):
+            if label in ["ORG", "PRODUCT"]:
+                brand_names.append(ent_text)
         keywords = extract_keywords(text)
         return brand_names, keywords
     except Exception as e:
@@ -64,18 +65,11 @@ def ner_analysis(text):
 
 
 # 结合搜索引擎排序算法，筛选最具影响力的营销内容的函数
-def sort_marketing_content(html_content, keywords):
+def sort_marketing_content(html_content, keywords, top_k=None):
     try:
         if not html_content or not isinstance(html_content, str) or not keywords or not isinstance(keywords, list):
             raise ValueError("无效的输入，html_content必须是字符串类型，keywords必须是列表类型")
-        sections = re.split(r'\n+|\s{2,}', html_content.strip())
-        content_scores = []
-        for section in sections:
-            keyword_count = sum([section.count(keyword) for keyword in keywords])
-            score = len(section) + keyword_count
-            content_scores.append((section, score))
-        sorted_content = sorted(content_scores, key=lambda item: item[1], reverse=True)
-        return [c[0] for c in sorted_content]
+        return rank_sections(html_content, keywords, top_k)
     except Exception as e:
         logging.error(f"筛选营销内容时出错: {e}")
         return []
@@ -83,15 +77,15 @@ def sort_marketing_content(html_content, keywords):
 
 def html_main():
     html_file_path = input("请输入你的html文件路径: ")
-    if not html_file_path or not isinstance(html_file_path, str) or not html_file_path.endswith('.html'):
-        logging.error("无效的文件路径，请输入有效的.html文件路径")
+    if not html_file_path or not isinstance(html_file_path, str) or not is_format(html_file_path, 'html'):
+        logging.error("无效的文件路径，请输入有效的.html文件路径（按文件内容判断格式）")
         return
     html_text = parse_html(html_file_path)
     if html_text:
         brand_names_html, keywords_html = ner_analysis(html_text)
         print("识别到的.html文件中的品牌名称:", brand_names_html)
         print("识别到的.html文件中的热门关键词:", keywords_html)
-        sorted_marketing_html = sort_marketing_content(html_text, keywords_html)
+        sorted_marketing_html = sort_marketing_content(html_text, keywords_html, top_k=5)
         print("最具影响力的.html文件中的营销内容:")
         for content in sorted_marketing_html[:5]:
             print(content)
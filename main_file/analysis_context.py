@@ -0,0 +1,112 @@
+from main_file import instrument
+from main_file.lang_detect import detect_language, as_language
+from main_file.nlp_models import get_nlp
+from main_file.text_normalize import lemmatize_text, stem_text
+from main_file.syntax_table import syntax_table_from_chunks
+from main_file.chunked_ner import ChunkDoc, DEFAULT_CHUNK_SIZE, DEFAULT_OVERLAP, iter_chunk_docs, merge_entities
+
+# 被视为品牌名称的实体标签
+BRAND_LABELS = ("ORG", "PRODUCT")
+
+
+class AnalysisContext:
+    """
+    单个文档的分析上下文：文本只经过一次spacy处理得到 Doc，
+    实体、句法信息和词元（lemma）都从同一个 Doc 中派生；
+    NLTK 的词法化和词干化只在被访问时才计算。
+    文本超过 chunk_size 时改为分块处理（相邻片段重叠 overlap 个字符），
+    实体、句法信息和词元按片段归属合并，结果与单次处理的格式相同。
+    """
+
+    def __init__(self, text, language=None, nlp=None, doc=None, chunk_size=DEFAULT_CHUNK_SIZE, overlap=DEFAULT_OVERLAP,
+                 components=None):
+        self.text = text
+        # language 为 detect_language 的结果（也可以直接给语言代码），未提供时检测一次
+        self.language = as_language(language) if language is not None else detect_language(text)
+        # 可以直接传入模型或已处理好的 Doc（例如批量模式下 nlp.pipe 的输出）
+        self._nlp = nlp
+        # 需要的spacy组件（如 NER_COMPONENTS），None 表示完整管道
+        self.components = components
+        self._doc = doc
+        self._chunks = None
+        self.chunk_size = chunk_size
+        self.overlap = overlap
+        self._lemmatized_text = None
+        self._stemmed_text = None
+        self._syntax_table = None
+
+    @property
+    def lang(self):
+        return self.language.lang
+
+    @property
+    def chunked(self):
+        return self._doc is None and len(self.text) > self.chunk_size
+
+    def _model(self):
+        return self._nlp if self._nlp is not None else get_nlp(self.lang, components=self.components)
+
+    @property
+    def doc(self):
+        if self._doc is None:
+            nlp = self._model()
+            with instrument.span('nlp', chars_in=len(self.text)):
+                self._doc = nlp(self.text)
+        return self._doc
+
+    def chunks(self):
+        """
+        返回 ChunkDoc 列表；短文本时只有一个覆盖全文的片段
+        """
+        if self._chunks is None:
+            if self.chunked:
+                nlp = self._model()
+                with instrument.span('nlp', chars_in=len(self.text), chunked=True):
+                    self._chunks = list(iter_chunk_docs(self.text, nlp, self.chunk_size, self.overlap))
+            else:
+                self._chunks = [ChunkDoc(0, 0, len(self.text), self.doc)]
+        return self._chunks
+
+    def _tokens(self):
+        # 只取每个片段负责区间内的词元，重叠区域中的词元不会重复出现
+        for chunk in self.chunks():
+            for token in chunk.doc:
+                if chunk.owned_start <= chunk.start + token.idx < chunk.owned_end:
+                    yield token
+
+    def entities(self):
+        return merge_entities(self.chunks())
+
+    def brand_names(self, labels=BRAND_LABELS):
+        return [text for text, label, _, _ in self.entities() if label in labels]
+
+    def syntax_table(self):
+        # 列式句法信息（SyntaxTable），分块处理时按片段归属合并
+        if self._syntax_table is None:
+            self._syntax_table = syntax_table_from_chunks(self.chunks())
+        return self._syntax_table
+
+    def syntax_rows(self):
+        # 每个词元的 (文本, 词性, 依存关系, 头词)
+        return list(self.syntax_table().rows())
+
+    def lemmas(self):
+        """
+        每个词元的 lemma。模型需要包含 lemmatizer 组件（components 中合并 LEMMA_COMPONENTS），
+        否则 spacy 会为所有词元返回空字符串，这里直接报错而不是返回空结果
+        """
+        if any(len(chunk.doc) and not chunk.doc.has_annotation("LEMMA") for chunk in self.chunks()):
+            raise ValueError("当前模型没有 lemmatizer 组件，无法取得词元；请在 components 中合并 LEMMA_COMPONENTS")
+        return [token.lemma_ for token in self._tokens()]
+
+    @property
+    def lemmatized_text(self):
+        if self._lemmatized_text is None:
+            self._lemmatized_text = lemmatize_text(self.text)
+        return self._lemmatized_text
+
+    @property
+    def stemmed_text(self):
+        if self._stemmed_text is None:
+            self._stemmed_text = stem_text(self.text)
+        return self._stemmed_text
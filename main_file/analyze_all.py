@@ -1,33 +1,28 @@
-
-import ssl
-
-try:
-    _create_unverified_https_context = ssl._create_unverified_context
-except AttributeError:
-    # Legacy Python that doesn't verify HTTPS certificates by default
-    # Старая версия Python, которая по умолчанию не проверяет HTTPS-сертификаты
-    pass
-else:
-    # Handle target environment that doesn't support HTTPS verification
-    # Обработка целевого окружения, которое не поддерживает проверку HTTPS
-    ssl._create_default_https_context = _create_unverified_https_context
-
+# 最先导入启动计时模块；spacy、PyPDF2、docx、bs4、nltk、jieba、scipy 等重量级库只在对应格式或分析阶段第一次用到时才导入
+# Сначала импортировать модуль замера времени запуска; тяжелые библиотеки (spacy, PyPDF2, docx, bs4, nltk, jieba, scipy и т.д.) импортируются только при первом использовании соответствующего формата или этапа
+from main_file import startup
+from main_file import instrument
 import re
-import spacy
+from main_file.analysis_context import AnalysisContext
+from main_file.nlp_models import NER_COMPONENTS, SYNTAX_COMPONENTS, merge_components, model_name_for
+from main_file.text_normalize import lemmatize_text, stem_text
 import os
-from docx import Document
-import PyPDF2
-from bs4 import BeautifulSoup
+from main_file.pdf_extract import extract_pdf_pages
+from main_file.docx_extract import docx_text
+from main_file.djvu_extract import iter_djvu_pages
+from main_file.text_stream import iter_chunks, analyze_stream, DETECT_CHARS
+from main_file.formats import detect_format, get_format_registry
+from main_file.html_extract import extract_html_file, log_content_stats
+from main_file.text_cache import cached_parse, cached_text, record_chunks, split_chunks, stream_parser_name
+from main_file.result_cache import (cached_analysis, analysis_fingerprint, file_result_key, load_file_result,
+                                    store_file_result)
+from main_file.syntax_table import SyntaxTable, syntax_table, iter_syntax_lines, open_syntax_writer
+import argparse
+from contextlib import nullcontext
 import traceback
 import logging
-from sumy.parsers.plaintext import PlaintextParser
-from sumy.summarizers.text_rank import TextRankSummarizer
-from langdetect import detect
-import jieba
-import nltk
-from nltk.stem import WordNetLemmatizer, PorterStemmer
-
-nltk.download('wordnet')
+from main_file.keyword_rank import rank_keywords, KeywordGraph
+from main_file.lang_detect import detect_language, as_language
 
 
 # 定义不同语言的停用词
@@ -53,24 +48,17 @@ STOPWORDS = {
 # 配置日志记录，设置日志级别为INFO，定义日志格式，包括时间、日志级别和消息内容
 # Конфигурация логирования, установка уровня логирования INFO, определение формата лога, который включает время, уровень логирования и содержание сообщения
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+startup.mark('imports')
 
 
 # 解析.pdf文件的函数，接受文件路径作为参数
 # Функция для разбора PDF-файла, принимает путь к файлу в качестве параметра
-def parse_pdf(file_path):
+@instrument.instrumented('parse_pdf')
+def parse_pdf(file_path, workers=1):
     try:
-        text = ""
-        # 以二进制只读模式打开PDF文件
-        # Открыть PDF-файл в бинарном режиме для чтения
-        with open(file_path, 'rb') as file:
-            reader = PyPDF2.PdfReader(file)
-            # 遍历PDF文件的每一页
-            # Пробежаться по каждой странице PDF-файла
-            for page in reader.pages:
-                # 提取每一页的文本内容并累加到text变量中
-                # Извлечь текст каждой страницы и добавить его в переменную text
-                text += page.extract_text()
-        return text
+        # 提取每一页的文本（workers 大于1时按页面范围并行提取），再按页序一次性拼接
+        # Извлечь текст каждой страницы (при workers больше 1 диапазоны страниц обрабатываются параллельно), затем соединить в порядке страниц за один раз
+        return "".join(extract_pdf_pages(file_path, workers))
     # 如果在解析过程中出现异常，记录错误日志并返回空字符串
     # Если во время разбора возникает исключение, записать ошибку в журнал и вернуть пустую строку
     except Exception as e:
@@ -80,19 +68,14 @@ def parse_pdf(file_path):
 
 # 解析.docx和部分.doc文件的函数，接受文件路径作为参数
 # Функция для разбора DOCX и некоторых DOC-файлов, принимает путь к файлу в качестве параметра
+@instrument.instrumented('parse_docx')
 def parse_docx(file_path):
     try:
-        doc = Document(file_path)
-        full_text = []
-        # 遍历.docx文件中的每一个段落
-        # Пробежаться по каждому абзацу в DOCX-файле
-        for para in doc.paragraphs:
-            # 将每个段落的文本添加到full_text列表中
-            # Добавить текст каждого абзаца в список full_text
-            full_text.append(para.text)
-        # 使用换行符连接列表中的所有文本并返回
-        # Соединить все тексты в списке с помощью символа переноса строки и вернуть результат
-        return "\n".join(full_text)
+        # 直接从压缩包中流式解析 word/document.xml 以及页眉、页脚、脚注，包括表格中的文字，不构建 python-docx 对象模型
+        # Потоково разбирать word/document.xml, а также колонтитулы и сноски прямо из архива, включая текст таблиц, без построения объектной модели python-docx
+        # 段落之间用换行符连接
+        # Абзацы соединяются символом переноса строки
+        return docx_text(file_path)
     # 如果在解析过程中出现异常，记录错误日志并返回空字符串
     # Если во время разбора возникает исключение, записать ошибку в журнал и вернуть пустую строку
     except Exception as e:
@@ -102,19 +85,16 @@ def parse_docx(file_path):
 
 # 解析.html文件的函数，接受文件路径作为参数
 # Функция для разбора HTML-файла, принимает путь к файлу в качестве параметра
+@instrument.instrumented('parse_html')
 def parse_html(file_path):
     try:
-        # 以只读模式打开HTML文件，指定编码为utf-8
-        # Открыть HTML-файл в режиме для чтения, указать кодировку UTF-8
-        with open(file_path, 'r', encoding='utf-8') as file:
-            html_content = file.read()
-            # 使用BeautifulSoup解析HTML内容，指定解析器为html.parser
-            # Разобрать содержимое HTML с использованием BeautifulSoup, указать парсер html.parser
-            soup = BeautifulSoup(html_content, 'html.parser')
-            # 提取文本内容并返回
-            # Извлечь текстовое содержимое и вернуть его
-            text_content = soup.get_text()
-            return text_content
+        # 分块读取文件（utf-8），单次流式遍历提取可见文本，不构建文档树；安装了 lxml 时使用 lxml，否则使用 html.parser
+        # Читать файл блоками (UTF-8) и извлекать видимый текст за один потоковый проход без построения дерева документа; при наличии lxml используется lxml, иначе html.parser
+        # 文本密度低或链接密度高的块（导航、页脚等）在进入NLP之前去掉，并记录去除的字符数
+        # Блоки с низкой плотностью текста или высокой плотностью ссылок (навигация, подвал и т.п.) отбрасываются до NLP, в журнал записывается число удаленных символов
+        content = extract_html_file(file_path, text_only=True, main_content=True)
+        log_content_stats(content.stats, file_path)
+        return content.text
     # 如果文件未找到，记录错误日志并返回空字符串
     # Если файл не найден, записать ошибку в журнал и вернуть пустую строку
     except FileNotFoundError:
@@ -127,60 +107,46 @@ def parse_html(file_path):
         return ""
 
 
-# 尝试解析.djvu文件的函数（需要安装pydjvu库），接受文件路径作为参数
-# Функция для попытки разбора DJVU-файла (требуется установка библиотеки pydjvu), принимает путь к файлу в качестве параметра
+# 解析.djvu文件的函数，接受文件路径作为参数；使用 djvutxt 命令行工具（按页面范围并发提取）或 python-djvulibre 库
+# Функция для разбора DJVU-файла, принимает путь к файлу в качестве параметра; использует утилиту djvutxt (параллельное извлечение по диапазонам страниц) или библиотеку python-djvulibre
+@instrument.instrumented('parse_djvu')
 def parse_djvu(file_path):
     try:
-        from pydjvu.lib import DjVuDocument
-        doc = DjVuDocument(file_path)
-        text = ""
-        # 遍历.djvu文件的每一页
-        # Пробежаться по каждой странице DJVU-файла
-        for page in doc:
-            # 提取每一页的文本内容并累加到text变量中
-            # Извлечь текст каждой страницы и добавить его в переменную text
-            text += page.get_text()
-        return text
-    # 如果未安装pydjvu库，捕获ImportError异常，记录错误日志并返回空字符串
-    # Если библиотека pydjvu не установлена, перехватить исключение ImportError, записать ошибку в журнал и вернуть пустую строку
-    except ImportError:
-        logging.error("未安装pydjvu库，无法解析.djvu文件。")
-        return ""
-    # 如果在解析过程中出现其他异常，记录错误日志并返回空字符串
-    # Если во время разбора возникает другое исключение, записать ошибку в журнал и вернуть пустую строку
+        # 按页序逐页读取文本，页与页之间用换行符连接；单页提取超时或失败时该页为空，不影响其他页
+        # Читать текст постранично по порядку и соединять страницы символом переноса строки; при тайм-ауте или ошибке страница остается пустой, не затрагивая остальные
+        return "\n".join(text for _, text in iter_djvu_pages(file_path))
+    # 如果既没有 djvutxt 也没有 python-djvulibre，或解析过程中出现其他异常，记录错误日志并返回空字符串
+    # Если нет ни djvutxt, ни python-djvulibre, или во время разбора возникает другое исключение, записать ошибку в журнал и вернуть пустую строку
     except Exception as e:
         logging.error(f"解析.djvu文件时出错: {e}")
         return ""
 
 
+# 本模块中各格式的解析函数；注册表中的其他格式使用注册时提供的解析函数
+# Функции разбора форматов в этом модуле; для остальных форматов из реестра используются функции, указанные при регистрации
+PARSERS = {
+    'pdf': parse_pdf,
+    'docx': parse_docx,
+    'html': parse_html,
+    'djvu': parse_djvu,
+}
+
+
 # 使用NER（命名实体识别）识别品牌名称、热门关键词、流行趋势的函数，接受文本作为参数
 # Функция для определения имен брендов, популярных ключевых слов и трендов с использованием NER (определение именованных сущностей), принимает текст в качестве параметра
-def ner_analysis(text):
+@instrument.instrumented('ner_analysis')
+def ner_analysis(text, context=None, language=None):
     try:
-        # 使用langdetect库检测文本的语言
-        # Определить язык текста с использованием библиотеки langdetect
-        lang = detect(text)
-        # 根据检测到的语言加载相应的spacy模型
-        # Загрузить соответствующую модель spacy в зависимости от определенного языка
-        if lang == 'zh':
-            nlp = spacy.load("zh_core_web_sm")
-        elif lang == 'ru':
-            nlp = spacy.load("ru_core_news_sm")
-        else:
-            nlp = spacy.load("en_core_web_sm")
-        doc = nlp(text)
-        brand_names = []
-        keywords = []
-        # 遍历文档中的每一个实体
-        # Пробежаться по каждой сущности в документе
-        for ent in doc.ents:
-            # 如果实体的标签是"ORG"（组织）或"PRODUCT"（产品），将其添加到品牌名称列表中
-            # Если метка сущности - "ORG" (организация) или "PRODUCT" (продукт), добавить ее в список имен брендов
-            if ent.label_ in ["ORG", "PRODUCT"]:
-                brand_names.append(ent.text)
-        # 调用extract_keywords函数提取关键词
-        # Вызвать функцию extract_keywords для извлечения ключевых слов
-        keywords = extract_keywords(text)
+        # 复用调用方传入的分析上下文，没有时新建一个（只检测一次语言、只处理一次文本）
+        # Использовать переданный контекст анализа, если его нет, создать новый (язык определяется один раз, текст обрабатывается один раз)
+        if context is None:
+            context = AnalysisContext(text, language, components=NER_COMPONENTS)
+        # 从同一个 Doc 中取出标签为"ORG"（组织）或"PRODUCT"（产品）的实体作为品牌名称
+        # Взять из того же Doc сущности с метками "ORG" (организация) или "PRODUCT" (продукт) в качестве имен брендов
+        brand_names = context.brand_names()
+        # 调用extract_keywords函数提取关键词，沿用上下文中的语言检测结果
+        # Вызвать функцию extract_keywords для извлечения ключевых слов, используя результат определения языка из контекста
+        keywords = extract_keywords(text, context.language)
         return brand_names, keywords
     # 如果在NER分析过程中出现异常，记录错误日志并返回空的品牌名称和关键词列表
     # Если во время анализа NER возникает исключение, записать ошибку в журнал и вернуть пустые списки имен брендов и ключевых слов
@@ -189,54 +155,18 @@ def ner_analysis(text):
         return [], []
 
 
-# 使用TextRank算法提取关键词的函数，接受文本作为参数
-# Функция для извлечения ключевых слов с использованием алгоритма TextRank, принимает текст в качестве параметра
-def extract_keywords(text):
+# 使用词共现图和PageRank算法提取关键词的函数，接受文本作为参数
+# Функция для извлечения ключевых слов с использованием графа совместной встречаемости и алгоритма PageRank, принимает текст в качестве параметра
+@instrument.instrumented('extract_keywords')
+def extract_keywords(text, language=None):
     try:
-        # 使用langdetect库检测文本的语言
-        # Определить язык текста с использованием библиотеки langdetect
-        lang = detect(text)
-        if lang == 'zh' or lang == 'zh-cn':
-            # 中文分词
-            # Разделение на токены для китайского языка
-            words = jieba.lcut(text)
-            new_text = " ".join(words)
-        else:
-            # 英文使用空格分割
-            # Разделение на токены для английского языка с использованием пробела
-            new_text = text
-
-        # 手动创建分词器，实现to_sentences和to_words方法
-        # Создать токенизатор вручную, реализовать методы to_sentences и to_words
-        class SimpleTokenizer:
-            def to_sentences(self, text):
-                # 简单地按句号分割句子
-                # Простое разделение предложений по точке
-                return text.split('.')
-
-            def to_words(self, text):
-                return text.split()
-
-        tokenizer = SimpleTokenizer()
-        # 创建解析器，传入文本和分词器
-        # Создать парсер, передать в него текст и токенизатор
-        parser = PlaintextParser.from_string(new_text, tokenizer)
-        summarizer = TextRankSummarizer()
-        # 使用TextRankSummarizer提取10个关键句子
-        # Извлечь 10 ключевых предложений с использованием TextRankSummarizer
-        sentences = summarizer(parser.document, 10)
-        keywords = []
-        # 遍历提取的每一个句子
-        # Пробежаться по каждому извлеченному предложению
-        for sentence in sentences:
-            # 遍历句子中的每一个单词
-            # Пробежаться по каждому слову в предложении
-            for word in sentence.words:
-                # 过滤停用词
-                # Фильтрация стоп-слов
-                if word not in STOPWORDS.get(lang, set()) and word not in keywords:
-                    keywords.append(word)
-        return keywords
+        # 使用调用方传入的语言检测结果，没有时检测一次；语言代码已规范化（'zh-cn' 等统一为 'zh'）
+        # Использовать переданный результат определения языка, если его нет, определить один раз; код языка уже нормализован ('zh-cn' и т.п. приводятся к 'zh')
+        language = detect_language(text) if language is None else as_language(language)
+        # 基于词共现图的 PageRank 排序（中文先用 jieba 分词），过滤停用词，关键词按得分从高到低返回
+        # Ранжирование PageRank на графе совместной встречаемости слов (китайский текст сначала токенизируется jieba), стоп-слова отфильтровываются, ключевые слова возвращаются по убыванию оценки
+        lang = language.lang
+        return [keyword.word for keyword in rank_keywords(text, lang, STOPWORDS.get(lang, set()))]
     # 如果在关键词提取过程中出现异常，记录错误日志
     # Если во время извлечения ключевых слов возникает исключение, записать ошибку в журнал
     except Exception as e:
@@ -244,92 +174,220 @@ def extract_keywords(text):
         return []
 
 
-# 句法分析函数，接受文本作为参数
-# Функция для синтаксического анализа, принимает текст в качестве параметра
-def syntax_analysis(text):
+# 流式分析使用的增量关键词图：逐个片段加入，停用词与 extract_keywords 相同
+# Инкрементальный граф ключевых слов для потокового анализа: фрагменты добавляются по одному, стоп-слова те же, что в extract_keywords
+def keyword_graph(language):
+    lang = as_language(language).lang
+    return KeywordGraph(lang, STOPWORDS.get(lang, set()))
+
+
+# 句法分析函数，接受文本作为参数；返回列式的 SyntaxTable，writer 不为空时写入文件，print_rows 为 True 时逐行打印
+# Функция для синтаксического анализа, принимает текст в качестве параметра; возвращает колоночную SyntaxTable, при заданном writer записывает ее в файл, при print_rows=True выводит построчно
+@instrument.instrumented('syntax_analysis')
+def syntax_analysis(text, context=None, language=None, writer=None, print_rows=False):
     try:
-        # 使用langdetect库检测文本的语言
-        # Определить язык текста с использованием библиотеки langdetect
-        lang = detect(text)
-        # 根据检测到的语言加载相应的spacy模型
-        # Загрузить соответствующую модель spacy в зависимости от определенного языка
-        if lang == 'zh':
-            nlp = spacy.load("zh_core_web_sm")
-        elif lang == 'ru':
-            nlp = spacy.load("ru_core_news_sm")
-        else:
-            nlp = spacy.load("en_core_web_sm")
-        doc = nlp(text)
-        # 遍历文档中的每一个词元（token）
-        # Пробежаться по каждому токену в документе
-        for token in doc:
-            # 打印词元的文本、词性、依存关系和头词
-            # Вывести текст токена, часть речи, зависимость и головное слово
-            print(f"词: {token.text}, 词性: {token.pos_}, 依存关系: {token.dep_}, 头词: {token.head.text}")
+        # 复用分析上下文中已经处理好的 Doc，避免再次运行 nlp(text)
+        # Использовать уже обработанный Doc из контекста анализа, чтобы не запускать nlp(text) повторно
+        if context is None:
+            context = AnalysisContext(text, language, components=SYNTAX_COMPONENTS)
+        table = context.syntax_table()
+        emit_syntax(table, writer, print_rows)
+        return table
     # 如果在句法分析过程中出现异常，记录错误日志
     # Если во время синтаксического анализа возникает исключение, записать ошибку в журнал
     except Exception as e:
         logging.error(f"句法分析时出错: {e}")
+        return None
 
 
-# 词法化函数
-# Функция для лемматизации
-def lemmatize_text(text):
-    lemmatizer = WordNetLemmatizer()
-    words = text.split()
-    lemmatized_words = [lemmatizer.lemmatize(word) for word in words]
-    return " ".join(lemmatized_words)
+# 输出句法分析结果：写入列式文件（.npz / .parquet），只有需要打印时才逐行格式化
+# Вывод результатов синтаксического анализа: запись в колоночный файл (.npz / .parquet), построчное форматирование только при необходимости печати
+def emit_syntax(table, writer=None, print_rows=False):
+    if writer is not None:
+        writer.write(table)
+    if print_rows:
+        for line in iter_syntax_lines(table):
+            print(line)
 
 
-# 词干化函数
-# Функция для стемминга
-def stem_text(text):
-    stemmer = PorterStemmer()
-    words = text.split()
-    stemmed_words = [stemmer.stem(word) for word in words]
-    return " ".join(stemmed_words)
+# 流式分析时对每个片段的 Doc 输出句法信息的回调
+# Обратный вызов для вывода синтаксической информации по Doc каждого фрагмента при потоковом анализе
+def doc_syntax_handler(writer=None, print_rows=False):
+    def on_doc(index, doc):
+        emit_syntax(syntax_table(doc), writer, print_rows)
+    return on_doc
 
 
 # 主函数，程序入口
 # Главная функция, точка входа в программу
-def main():
-    file_path = input("请输入文件路径: ")
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="解析文件并进行NER、关键词和句法分析")
+    arg_parser.add_argument('file_path', nargs='?', help="要分析的文件路径（不提供时交互式输入）")
+    arg_parser.add_argument('--startup-report', action='store_true', help="输出各启动阶段的耗时和已导入的重量级库")
+    arg_parser.add_argument('--syntax-output', help="把句法分析结果以列式表写入文件（.npz 或 .parquet）")
+    arg_parser.add_argument('--print-syntax', action='store_true', help="逐行打印每个词元的句法信息")
+    arg_parser.add_argument('--metrics', help="记录各阶段的耗时、字符数、缓存命中和模型加载并导出（.jsonl 或 .prom）")
+    arg_parser.add_argument('--metrics-summary', action='store_true', help="运行结束时输出各阶段的埋点汇总表")
+    # 流式分析的语言检测从全文中按字符预算抽样；预算越大，多语言混排的文档检测越稳定，但检测更慢
+    # Определение языка при потоковом анализе использует выборку по всему документу в пределах бюджета символов; больший бюджет надежнее для многоязычных документов, но медленнее
+    arg_parser.add_argument('--detect-chars', type=int, default=DETECT_CHARS,
+                            help=f"流式分析时从全文抽样用于语言检测的字符数（默认 {DETECT_CHARS}）")
+    args = arg_parser.parse_args(argv)
+    # 只有需要导出指标时才启用埋点，未启用时埋点只是一次全局变量判断
+    # Инструментирование включается только при необходимости экспорта метрик; без него каждая точка замера сводится к одной проверке глобальной переменной
+    if args.metrics or args.metrics_summary:
+        instrument.enable()
+    try:
+        run(args.file_path, args.syntax_output, args.print_syntax, args.detect_chars)
+    finally:
+        if args.startup_report:
+            startup.mark('done')
+            startup.log_startup_report()
+        if args.metrics:
+            instrument.export(args.metrics)
+        if args.metrics_summary:
+            instrument.log_summary()
+
+
+# 分析单个文件；file_path 为 None 时交互式输入
+# Анализ одного файла; если file_path равен None, путь вводится интерактивно
+def run(file_path=None, syntax_output=None, print_syntax=False, detect_chars=DETECT_CHARS):
+    if file_path is None:
+        file_path = input("请输入文件路径: ")
     # 如果文件路径为空或文件不存在，记录错误日志并返回
     # Если путь к файлу пустой или файл не существует, записать ошибку в журнал и вернуться
     if not file_path or not os.path.exists(file_path):
         logging.error("输入的文件路径无效。")
         return
 
-    file_extension = file_path.split('.')[-1].lower()
-    # 根据文件扩展名调用相应的解析函数
-    # Вызвать соответствующую функцию разбора в зависимости от расширения файла
-    if file_extension == "pdf":
-        text = parse_pdf(file_path)
-    elif file_extension == "docx" or file_extension == "doc":
-        text = parse_docx(file_path)
-    elif file_extension == "html":
-        text = parse_html(file_path)
-    elif file_extension == "djvu":
-        text = parse_djvu(file_path)
-    else:
-        logging.error("不支持的文件类型。")
+    # 按文件头的魔数判断格式（PDF、ZIP/OOXML、DjVu、HTML），扩展名作为后备；不支持的文件直接跳过，不再尝试解析
+    # Формат определяется по сигнатуре в начале файла (PDF, ZIP/OOXML, DjVu, HTML), расширение используется как запасной вариант; неподдерживаемые файлы отклоняются сразу, без попытки разбора
+    file_format = detect_format(file_path)
+    if file_format is None or (file_format.parser is None and file_format.reader is None):
+        logging.error(f"不支持的文件类型: {file_format.name if file_format else file_path}")
         return
+    # 句法分析结果只在指定了输出文件时写入，写入器在分析结束后关闭
+    # Результаты синтаксического анализа записываются только при указании выходного файла; writer закрывается по окончании анализа
+    with open_syntax_writer(syntax_output) if syntax_output else nullcontext() as writer:
+        with instrument.span('document', path=file_path, format=file_format.name):
+            analyze_file(file_path, file_format, writer, print_syntax, detect_chars)
+
+
+# 分析结果对应的模型版本和停用词；任何一项变化时缓存的流式分析结果失效
+# Версия модели и стоп-слова, соответствующие результату анализа; при изменении любого из них кэшированный результат потокового анализа становится недействительным
+def result_fingerprint(lang):
+    return analysis_fingerprint(lang, model_name_for(lang), STOPWORDS.get(lang, set()))
+
+
+# 按格式分析单个文件；writer 和 print_syntax 控制句法分析结果的输出，
+# detect_chars 是流式分析时语言检测样本的字符数
+# Анализ одного файла в зависимости от формата; writer и print_syntax управляют выводом результатов синтаксического анализа
+# detect_chars — число символов выборки для определения языка при потоковом анализе
+def analyze_file(file_path, file_format, writer=None, print_syntax=False, detect_chars=DETECT_CHARS):
+    # 抽样字符数不同时检测的语言可能不同，分别缓存
+    # Результаты зависят от размера выборки для определения языка и кэшируются отдельно
+    mode = f"stream:{detect_chars}"
+    if file_format.reader is not None:
+        # 文件未变化时直接使用上次流式读取时缓存的片段，不再逐页提取；缓存的片段与重新读取的完全相同，
+        # 仍然走流式分析，结果不因缓存是否命中而不同
+        # Если файл не изменился, используются фрагменты, закэшированные при предыдущем потоковом чтении, страницы повторно не извлекаются; фрагменты совпадают с заново прочитанными и проходят тот же потоковый анализ, поэтому результат не зависит от попадания в кэш
+        digest, text = cached_text(file_path, [stream_parser_name(file_format.name)])
+        # 不输出句法信息时，同一文件（按内容哈希）的流式分析结果直接从缓存读取，不做任何NLP处理
+        # Если синтаксическая информация не выводится, результат потокового анализа того же файла (по хешу содержимого) читается из кэша без какой-либо обработки NLP
+        if digest is not None and writer is None and not print_syntax:
+            cached = load_file_result(file_result_key(digest, mode, NER_COMPONENTS), result_fingerprint)
+            if cached is not None:
+                logging.info(f"检测到的语言: {cached['lang']} (置信度: {cached['confidence']:.2f})")
+                print("识别到的品牌名称:", cached['brand_names'])
+                print("识别到的热门关键词:", cached['keywords'])
+                return
+    # PDF、DOCX、DJVU 按页或段落流式读取并增量分析，内存占用取决于片段大小而不是文档大小
+    # PDF, DOCX, DJVU читаются потоково по страницам или абзацам и анализируются инкрементально, расход памяти зависит от размера фрагмента, а не документа
+    if file_format.reader is not None:
+        try:
+            if text is not None:
+                chunks = split_chunks(text)
+            else:
+                # 单个大PDF使用全部CPU核心并行提取页面
+                # Для одного большого PDF извлекать страницы параллельно на всех ядрах CPU
+                chunks = iter_chunks(file_path, workers=None)
+                # 边读取边把规范化后的片段压缩写入文本缓存，下次分析同一文件时不再提取
+                # Нормализованные фрагменты сжимаются и записываются в текстовый кэш по мере чтения, при следующем анализе того же файла извлечение не требуется
+                if digest is not None:
+                    chunks = record_chunks(chunks, digest, stream_parser_name(file_format.name))
+            startup.mark('reader_ready')
+            # 不需要输出句法信息时只加载NER组件
+            # Если синтаксическая информация не нужна, загружаются только компоненты NER
+            if writer is not None or print_syntax:
+                on_doc = doc_syntax_handler(writer, print_syntax)
+                components = merge_components(NER_COMPONENTS, SYNTAX_COMPONENTS)
+            else:
+                on_doc, components = None, NER_COMPONENTS
+            result = analyze_stream(chunks, keyword_graph=keyword_graph, on_doc=on_doc, components=components,
+                                    detect_chars=detect_chars)
+        except Exception as e:
+            logging.error(f"流式分析文件时出错: {e}")
+            return
+        if digest is not None:
+            store_file_result(file_result_key(digest, mode, components), {
+                'lang': result.language.lang,
+                'confidence': result.language.confidence,
+                'brand_names': result.brand_names,
+                'keywords': result.keywords,
+            }, result_fingerprint)
+        logging.info(f"检测到的语言: {result.language.lang} (置信度: {result.language.confidence:.2f})")
+        print("识别到的品牌名称:", result.brand_names)
+        print("识别到的热门关键词:", result.keywords)
+        return
+
+    # 其余格式（如HTML）整篇解析；文件未变化时只需计算一次哈希并读取一次缓存（设置 ANALYZE_NO_CACHE=1 可跳过缓存）
+    # Остальные форматы (например, HTML) разбираются целиком; если файл не изменился, достаточно вычислить хеш и один раз прочитать кэш (ANALYZE_NO_CACHE=1 отключает кэш)
+    parser = PARSERS.get(file_format.name) or get_format_registry().parser_for(file_path)[1]
+    text = cached_parse(file_path, parser)
 
     # 预处理文本，去除多余空格和空字符
     # Предварительная обработка текста, удаление лишних пробелов и пустых символов
     text = text.strip()
     text = re.sub(r'\s+', ' ', text)
+    startup.mark('text_ready')
 
     if text:
-        # 词法化和词干化
-        # Лемматизация и стемминг
-        lemmatized_text = lemmatize_text(text)
-        stemmed_text = stem_text(text)
-
-        brand_names, keywords = ner_analysis(text)
-        print("识别到的品牌名称:", brand_names)
-        print("识别到的热门关键词:", keywords)
-        syntax_analysis(text)
+        # 对文本抽样做一次语言检测、一次spacy处理，结果由NER和句法分析共享；
+        # 词法化和词干化只在访问 context.lemmatized_text / context.stemmed_text 时才计算
+        # Одно определение языка и одна обработка spacy, результат используется и NER, и синтаксическим анализом;
+        # лемматизация и стемминг вычисляются только при обращении к context.lemmatized_text / context.stemmed_text
+        language = detect_language(text)
+        logging.info(f"检测到的语言: {language.lang} (置信度: {language.confidence:.2f})")
+        # 与流式分析一样，只有要求输出句法信息时才加载 tagger、parser 并构建句法表，否则只加载NER组件
+        # Как и при потоковом анализе, tagger и parser загружаются и синтаксическая таблица строится только при запросе синтаксического вывода, иначе загружаются только компоненты NER
+        want_syntax = writer is not None or print_syntax
+        components = merge_components(NER_COMPONENTS, SYNTAX_COMPONENTS) if want_syntax else NER_COMPONENTS
+        context = AnalysisContext(text, language, components=components)
+        require = ('brand_names', 'keywords', 'syntax') if want_syntax else ('brand_names', 'keywords')
+
+        def analyze():
+            result = {
+                'brand_names': context.brand_names(),
+                'keywords': extract_keywords(text, language),
+            }
+            if want_syntax:
+                result['syntax'] = context.syntax_table().to_dict()
+            return result
+
+        # 同一文本、语言、模型版本和停用词的分析结果直接从缓存读取，不做任何NLP处理
+        # Результаты для того же текста, языка, версии модели и стоп-слов читаются из кэша без какой-либо обработки NLP
+        try:
+            result = cached_analysis(text, language, analyze, model_name_for(language.lang),
+                                     STOPWORDS.get(language.lang, set()), require=require)
+        except Exception as e:
+            logging.error(f"分析文本时出错: {e}")
+            return
+        print("识别到的品牌名称:", result['brand_names'])
+        print("识别到的热门关键词:", result['keywords'])
+        if want_syntax:
+            table = SyntaxTable.from_dict(result['syntax'])
+            logging.info(f"句法分析: {table.n_tokens} 个词元")
+            emit_syntax(table, writer, print_syntax)
 
 
 if __name__ == "__main__":
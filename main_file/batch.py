@@ -0,0 +1,327 @@
+import os
+import glob
+import time
+import json
+import argparse
+import logging
+from functools import partial
+from multiprocessing import Pool
+from collections import namedtuple
+from main_file import instrument
+from main_file.nlp_models import get_nlp, NER_COMPONENTS, model_name_for
+from main_file.lang_detect import detect_language
+from main_file.analysis_context import AnalysisContext
+from main_file.chunked_ner import chunk_size_for
+from main_file.text_cache import cached_parse, cache_disabled
+from main_file.result_cache import result_key, get_result_cache
+from main_file.formats import get_format_registry
+from main_file.manifest import Manifest, plan_changes, SETTLE_SECONDS
+
+# 每种语言缓冲多少篇文档后送入 nlp.pipe（按 batch_size * n_process 的倍数计算）
+FLUSH_FACTOR = 4
+# 监视模式下两轮扫描之间的间隔（秒）
+WATCH_INTERVAL = 30.0
+
+
+def collect_paths(source):
+    """
+    根据输入收集待处理的文件路径：目录（递归，只收集已注册格式的扩展名）、glob 模式或清单文件（每行一个路径）
+    """
+    if os.path.isdir(source):
+        extensions = get_format_registry().extensions()
+        paths = []
+        for root, _, files in os.walk(source):
+            for name in sorted(files):
+                if name.split('.')[-1].lower() in extensions:
+                    paths.append(os.path.join(root, name))
+        return sorted(paths)
+    if glob.has_magic(source):
+        return sorted(p for p in glob.glob(source, recursive=True) if os.path.isfile(p))
+    if os.path.isfile(source):
+        base = os.path.dirname(os.path.abspath(source))
+        paths = []
+        with open(source, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line or line.startswith('#'):
+                    continue
+                paths.append(line if os.path.isabs(line) else os.path.join(base, line))
+        return paths
+    logging.error(f"无效的批量输入: {source}")
+    return []
+
+
+def _parse_file(file_path, bypass_cache=False):
+    # 按文件内容选择解析函数（扩展名错误的文件也能正确解析），不支持的格式直接报错，不做解析尝试
+    _, parser = get_format_registry().parser_for(file_path)
+    # 返回规范化后的文本；文件未变化时直接读取缓存
+    return cached_parse(file_path, parser, bypass=bypass_cache)
+
+
+# 第一阶段的输出；cached 为结果缓存中已有的分析结果（命中时不再需要文本），
+# metrics 为工作进程中记录的埋点数据（instrument.drain() 的结果），由父进程并入
+Extracted = namedtuple('Extracted', ['path', 'text', 'language', 'keywords', 'error', 'cache_key', 'cached', 'metrics'],
+                       defaults=(None,))
+
+
+def extract_document(file_path, bypass_cache=False):
+    """
+    批量模式的第一阶段（在工作进程中运行）：解析文件、规范化文本、检测语言，
+    查询结果缓存，未命中时提取关键词
+    """
+    from main_file.analyze_all import extract_keywords, STOPWORDS
+    with instrument.span('extract_document', path=file_path) as current:
+        try:
+            text = _parse_file(file_path, bypass_cache)
+            if not text:
+                return Extracted(file_path, None, None, None, "未提取到文本", None, None)
+            current.set(chars_out=len(text))
+            language = detect_language(text)
+            cache_key = None
+            if not bypass_cache and not cache_disabled():
+                cache_key = result_key(text, language, model_name_for(language.lang),
+                                       STOPWORDS.get(language.lang, set()))
+                cached = get_result_cache().get_result(cache_key)
+                if cached is not None:
+                    return Extracted(file_path, None, language, cached['keywords'], None, cache_key, cached)
+            keywords = extract_keywords(text, language)
+            return Extracted(file_path, text, language, keywords, None, cache_key, None)
+        except Exception as e:
+            current.set(error=type(e).__name__)
+            return Extracted(file_path, None, None, None, str(e), None, None)
+
+
+def _extract_in_worker(file_path, bypass_cache=False):
+    # 在工作进程中运行：测量结果随提取结果一起传回父进程
+    item = extract_document(file_path, bypass_cache)
+    return item._replace(metrics=instrument.drain())
+
+
+def _record(item, brand_names):
+    return {
+        'path': item.path,
+        'lang': item.language.lang,
+        'confidence': round(item.language.confidence, 4),
+        'brand_names': brand_names,
+        'keywords': item.keywords,
+    }
+
+
+def _emit_error(path, error, emit):
+    logging.error(f"处理文件 {path} 时出错: {error}")
+    emit({'path': path, 'error': error})
+
+
+def _emit_result(item, brand_names, emit):
+    if item.cache_key is not None:
+        get_result_cache().put_result(item.cache_key, {'brand_names': brand_names, 'keywords': item.keywords})
+    emit(_record(item, brand_names))
+
+
+def _flush(lang, items, emit, batch_size, n_process, get_model):
+    """
+    同一语言的短文档一起送入 nlp.pipe；超过分块大小（或模型 max_length）的长文档分块处理。批量模式只需要NER组件。
+    整批处理出错时剩余文档逐篇重试，仍然失败的文档与读取失败一样输出 error 记录。返回 (成功数, 失败数)
+    """
+    with instrument.span('ner_batch', lang=lang, chars_in=sum(len(item.text) for item in items)) as current:
+        done, failed = _flush_items(lang, items, emit, batch_size, n_process, get_model)
+        current.set(items_out=done, failed=failed)
+    return done, failed
+
+
+def _flush_items(lang, items, emit, batch_size, n_process, get_model):
+    try:
+        nlp = get_model(lang, components=NER_COMPONENTS)
+    except Exception as e:
+        for item in items:
+            _emit_error(item.path, f"加载模型失败: {e}", emit)
+        return 0, len(items)
+    chunk_size = chunk_size_for(nlp)
+    short = [item for item in items if len(item.text) <= chunk_size]
+    retry = [item for item in items if len(item.text) > chunk_size]
+    done = failed = 0
+    docs = nlp.pipe((item.text for item in short), batch_size=batch_size, n_process=n_process)
+    for index, item in enumerate(short):
+        # 只捕获NER本身的异常；每篇文档的结果在 try 之外立即输出，增量模式下逐篇记入清单
+        try:
+            brand_names = AnalysisContext(item.text, item.language, doc=next(docs)).brand_names()
+        except Exception as e:
+            logging.warning(f"语言 {lang} 的批次处理出错，剩余 {len(short) - index} 篇改为逐篇处理: {e}")
+            retry = short[index:] + retry
+            break
+        _emit_result(item, brand_names, emit)
+        done += 1
+    for item in retry:
+        try:
+            brand_names = AnalysisContext(item.text, item.language, nlp=nlp, chunk_size=chunk_size).brand_names()
+        except Exception as e:
+            _emit_error(item.path, str(e), emit)
+            failed += 1
+            continue
+        _emit_result(item, brand_names, emit)
+        done += 1
+    return done, failed
+
+
+def run_batch(paths, output_path, batch_size=64, n_process=1, workers=None, get_model=get_nlp, bypass_cache=False):
+    """
+    批量处理文件：按检测到的语言分组，通过 nlp.pipe 做NER，每篇文档输出一行JSON记录。
+    结果缓存命中的文档不再做任何NLP处理。返回 (成功数, 失败数)。
+    """
+    with open(output_path, 'w', encoding='utf-8') as out:
+        def emit(record):
+            out.write(json.dumps(record, ensure_ascii=False) + "\n")
+        return process_documents(paths, emit, batch_size, n_process, workers, get_model, bypass_cache)
+
+
+def process_documents(paths, emit, batch_size=64, n_process=1, workers=None, get_model=get_nlp, bypass_cache=False):
+    """
+    run_batch 的处理核心：每篇文档的结果记录（失败时含 error）完成后立即交给 emit(record)，返回 (成功数, 失败数)
+    """
+    if workers is None:
+        workers = n_process
+    flush_size = max(batch_size * n_process * FLUSH_FACTOR, 1)
+    buffers = {}
+    done = failed = cache_hits = 0
+    # 启用埋点时工作进程各自记录，测量结果随每篇文档的提取结果传回并入父进程
+    pool = Pool(workers, initializer=instrument.init_worker, initargs=(instrument.enabled(),)) if workers > 1 else None
+    try:
+        if pool:
+            extract = partial(_extract_in_worker, bypass_cache=bypass_cache)
+            results = pool.imap_unordered(extract, paths, chunksize=4)
+        else:
+            results = map(partial(extract_document, bypass_cache=bypass_cache), paths)
+        for item in results:
+            instrument.merge(item.metrics)
+            if item.error:
+                _emit_error(item.path, item.error, emit)
+                failed += 1
+                continue
+            if item.cached is not None:
+                emit(_record(item, item.cached['brand_names']))
+                done += 1
+                cache_hits += 1
+                continue
+            buffer = buffers.setdefault(item.language.lang, [])
+            buffer.append(item)
+            if len(buffer) >= flush_size:
+                flushed, flush_failed = _flush(item.language.lang, buffer, emit, batch_size, n_process, get_model)
+                done += flushed
+                failed += flush_failed
+                buffers[item.language.lang] = []
+        for lang, buffer in buffers.items():
+            if buffer:
+                flushed, flush_failed = _flush(lang, buffer, emit, batch_size, n_process, get_model)
+                done += flushed
+                failed += flush_failed
+    finally:
+        if pool:
+            pool.close()
+            pool.join()
+    logging.info(f"结果缓存: 命中 {cache_hits} 个, 未命中 {done - cache_hits} 个")
+    return done, failed
+
+
+# 一轮增量处理的统计：处理成功、失败、未变化、仅更新 stat、已删除、仍在写入的文件数
+IncrementalResult = namedtuple('IncrementalResult', ['done', 'failed', 'unchanged', 'touched', 'deleted', 'pending'])
+
+
+def run_incremental(source, state_dir, output_path=None, retry_errors=False, settle=SETTLE_SECONDS, **options):
+    """
+    增量处理：根据状态目录中的清单只处理新增或变化的文件，删除已不存在的文件的结果；
+    每篇文档完成后立即记入清单，中断后再次运行会跳过已完成的文档。
+    output_path 不为空时把当前全部结果导出为一个JSON Lines文件。options 传给 process_documents
+    """
+    paths = [os.path.abspath(path) for path in collect_paths(source)]
+    with Manifest(state_dir) as manifest:
+        plan = plan_changes(manifest, paths, retry_errors, settle)
+        for path in plan.deleted:
+            manifest.remove(path)
+        for state in plan.touched:
+            manifest.touch(state)
+        states = {state.path: state for state in plan.process}
+        logging.info(f"增量处理: 待处理 {len(states)} 个, 未变化 {len(plan.unchanged) + len(plan.touched)} 个, "
+                     f"已删除 {len(plan.deleted)} 个, 仍在写入 {len(plan.pending)} 个")
+        done = failed = 0
+        if states:
+            def emit(record):
+                manifest.record(states[record['path']], record)
+            done, failed = process_documents(list(states), emit, **options)
+        if output_path:
+            manifest.export(output_path)
+    return IncrementalResult(done, failed, len(plan.unchanged), len(plan.touched), len(plan.deleted),
+                             len(plan.pending))
+
+
+def watch(source, state_dir, output_path=None, interval=WATCH_INTERVAL, max_rounds=None, **options):
+    """
+    监视模式：每隔 interval 秒运行一轮 run_incremental，处理新落地或变化的文件；模型在各轮之间保持加载。
+    max_rounds 为 None 时一直运行到被中断
+    """
+    rounds = 0
+    while max_rounds is None or rounds < max_rounds:
+        started = time.monotonic()
+        result = run_incremental(source, state_dir, output_path, **options)
+        if result.done or result.failed or result.deleted:
+            logging.info(f"本轮处理完成: 成功 {result.done} 个, 失败 {result.failed} 个, 删除 {result.deleted} 个")
+        rounds += 1
+        if max_rounds is None or rounds < max_rounds:
+            time.sleep(max(0.0, interval - (time.monotonic() - started)))
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="批量解析文件并进行NER和关键词分析")
+    arg_parser.add_argument('source', help="目录、glob 模式或清单文件（每行一个路径）")
+    arg_parser.add_argument('-o', '--output', default='results.jsonl', help="输出的JSON Lines文件")
+    arg_parser.add_argument('--batch-size', type=int, default=64, help="nlp.pipe 的 batch_size")
+    arg_parser.add_argument('--n-process', type=int, default=1, help="nlp.pipe 的进程数")
+    arg_parser.add_argument('--workers', type=int, default=None, help="文本提取进程数（默认与 --n-process 相同）")
+    arg_parser.add_argument('--no-cache', action='store_true', help="不使用提取文本缓存")
+    arg_parser.add_argument('--state-dir', help="增量模式：清单和每篇文档结果的保存目录，只处理新增或变化的文件")
+    arg_parser.add_argument('--retry-errors', action='store_true', help="增量模式下重试之前失败且未变化的文件")
+    arg_parser.add_argument('--watch', action='store_true', help="持续监视 source，定期处理新文件（需要 --state-dir）")
+    arg_parser.add_argument('--interval', type=float, default=WATCH_INTERVAL, help="监视模式的扫描间隔（秒）")
+    arg_parser.add_argument('--metrics', help="记录各阶段的耗时、字符数、缓存命中和模型加载并导出（.jsonl 或 .prom），"
+                                              "包括文本提取进程中的测量")
+    arg_parser.add_argument('--metrics-summary', action='store_true', help="运行结束时输出各阶段的埋点汇总表")
+    args = arg_parser.parse_args(argv)
+    if args.watch and not args.state_dir:
+        arg_parser.error("--watch 需要同时指定 --state-dir")
+    # 只有需要导出指标时才启用埋点
+    if args.metrics or args.metrics_summary:
+        instrument.enable()
+    try:
+        _run_main(args)
+    finally:
+        if args.metrics:
+            instrument.export(args.metrics)
+        if args.metrics_summary:
+            instrument.log_summary()
+
+
+def _run_main(args):
+
+    if args.state_dir:
+        options = dict(batch_size=args.batch_size, n_process=args.n_process, workers=args.workers,
+                       bypass_cache=args.no_cache)
+        if args.watch:
+            watch(args.source, args.state_dir, args.output, args.interval, retry_errors=args.retry_errors, **options)
+            return
+        result = run_incremental(args.source, args.state_dir, args.output, args.retry_errors, **options)
+        logging.info(f"增量处理完成: 成功 {result.done} 个, 失败 {result.failed} 个, 未变化 "
+                     f"{result.unchanged + result.touched} 个, 删除 {result.deleted} 个, 结果已写入 {args.output}")
+        return
+
+    paths = collect_paths(args.source)
+    if not paths:
+        logging.error("没有找到需要处理的文件。")
+        return
+    logging.info(f"共 {len(paths)} 个文件待处理")
+    done, failed = run_batch(paths, args.output, args.batch_size, args.n_process, args.workers,
+                             bypass_cache=args.no_cache)
+    logging.info(f"处理完成: 成功 {done} 个, 失败 {failed} 个, 结果已写入 {args.output}")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    main()
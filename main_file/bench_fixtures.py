@@ -0,0 +1,188 @@
+import os
+import sys
+import stat
+import random
+import zipfile
+from xml.sax.saxutils import escape
+
+# 合成语料使用的词表：普通词加上少量品牌名，保证关键词和实体识别有内容可找
+WORDS = (
+    'market', 'brand', 'customer', 'product', 'growth', 'campaign', 'digital', 'social', 'media', 'strategy',
+    'sales', 'price', 'value', 'quality', 'service', 'launch', 'trend', 'data', 'analysis', 'audience',
+    'engagement', 'content', 'retail', 'online', 'mobile', 'design', 'innovation', 'share', 'loyalty', 'report',
+    'the', 'a', 'of', 'and', 'to', 'in', 'for', 'with', 'on', 'new', 'more', 'our', 'their', 'this', 'that',
+)
+BRANDS = ('Apple', 'Samsung', 'Nike', 'Adidas', 'Google', 'Amazon', 'Tesla', 'Microsoft')
+# 每页PDF和DjVu的行数、每行的词数
+LINES_PER_PAGE = 40
+WORDS_PER_LINE = 12
+
+
+def sentence(rng, n_words=WORDS_PER_LINE):
+    words = [rng.choice(BRANDS) if rng.random() < 0.05 else rng.choice(WORDS) for _ in range(n_words)]
+    return " ".join(words).capitalize() + "."
+
+
+def synthetic_paragraphs(count, seed=0, sentences=3):
+    """
+    按固定种子生成 count 个段落，相同参数每次结果相同
+    """
+    rng = random.Random(seed)
+    return [" ".join(sentence(rng) for _ in range(sentences)) for _ in range(count)]
+
+
+def synthetic_text(n_words, seed=0):
+    rng = random.Random(seed)
+    lines = []
+    while n_words > 0:
+        lines.append(sentence(rng, min(WORDS_PER_LINE, n_words)))
+        n_words -= WORDS_PER_LINE
+    return "\n".join(lines)
+
+
+def _page_lines(rng):
+    return [sentence(rng) for _ in range(LINES_PER_PAGE)]
+
+
+def make_pdf(path, pages, seed=0):
+    """
+    生成含文本层的PDF：安装了 reportlab 时用它绘制，否则用 PyPDF2 直接写入 Helvetica 文本内容流
+    """
+    rng = random.Random(seed)
+    try:
+        from reportlab.pdfgen import canvas
+    except ImportError:
+        canvas = None
+    if canvas is not None:
+        pdf = canvas.Canvas(path)
+        for _ in range(pages):
+            text = pdf.beginText(50, 800)
+            text.setFont('Helvetica', 10)
+            for line in _page_lines(rng):
+                text.textLine(line)
+            pdf.drawText(text)
+            pdf.showPage()
+        pdf.save()
+        return path
+
+    from PyPDF2 import PdfWriter, PageObject
+    from PyPDF2.generic import DecodedStreamObject, DictionaryObject, NameObject
+    writer = PdfWriter()
+    font = writer._add_object(DictionaryObject({
+        NameObject('/Type'): NameObject('/Font'),
+        NameObject('/Subtype'): NameObject('/Type1'),
+        NameObject('/BaseFont'): NameObject('/Helvetica'),
+    }))
+    for _ in range(pages):
+        page = PageObject.create_blank_page(None, 612, 792)
+        lines = b" T* ".join(b"(%s) Tj" % line.encode('latin-1') for line in _page_lines(rng))
+        content = DecodedStreamObject()
+        content.set_data(b"BT /F1 10 Tf 12 TL 50 750 Td " + lines + b" ET")
+        page[NameObject('/Contents')] = writer._add_object(content)
+        page[NameObject('/Resources')] = DictionaryObject({
+            NameObject('/Font'): DictionaryObject({NameObject('/F1'): font}),
+        })
+        writer.add_page(page)
+    with open(path, 'wb') as file:
+        writer.write(file)
+    return path
+
+
+_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/word/document.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>'
+    '</Types>'
+)
+_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="word/document.xml"/></Relationships>'
+)
+
+
+def make_docx(path, paragraphs, seed=0, table_every=50):
+    """
+    直接写出最小的OOXML包：每 table_every 个段落插入一个 2x2 表格；word/document.xml 分块写入，不在内存中拼接整篇
+    """
+    def paragraph(text):
+        return f'<w:p><w:r><w:t xml:space="preserve">{escape(text)}</w:t></w:r></w:p>'
+
+    rng = random.Random(seed + 1)
+    with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr('[Content_Types].xml', _CONTENT_TYPES)
+        archive.writestr('_rels/.rels', _RELS)
+        with archive.open('word/document.xml', 'w', force_zip64=True) as file:
+            file.write(b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                       b'<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"><w:body>')
+            for index, text in enumerate(synthetic_paragraphs(paragraphs, seed)):
+                file.write(paragraph(text).encode('utf-8'))
+                if table_every and index % table_every == table_every - 1:
+                    cells = "".join(f'<w:tc>{paragraph(sentence(rng, 4))}</w:tc>' for _ in range(2))
+                    file.write(f'<w:tbl><w:tr>{cells}</w:tr><w:tr>{cells}</w:tr></w:tbl>'.encode('utf-8'))
+            file.write(b'<w:sectPr/></w:body></w:document>')
+    return path
+
+
+def make_html(path, paragraphs, seed=0):
+    """
+    生成带导航、侧栏、页脚和脚本等样板内容的HTML页面，正文为 paragraphs 个段落
+    """
+    links = "".join(f'<li><a href="/{word}">{word.title()}</a></li>' for word in WORDS[:12])
+    with open(path, 'w', encoding='utf-8') as file:
+        file.write(f'<!DOCTYPE html><html><head><title>Synthetic report</title>'
+                   f'<script>var tracking = {{}};</script><style>p {{ margin: 0 }}</style></head>'
+                   f'<body><nav><ul>{links}</ul></nav><article><h1>Market report</h1>\n')
+        for index, text in enumerate(synthetic_paragraphs(paragraphs, seed)):
+            file.write(f'<p>{escape(text)}</p>\n')
+            if index % 100 == 99:
+                file.write(f'<aside><ul>{links}</ul></aside>\n')
+        file.write(f'</article><footer><ul>{links}</ul><p>Copyright</p></footer></body></html>\n')
+    return path
+
+
+_FAKE_DJVUTXT = """#!{python}
+import sys
+sys.path.insert(0, {root!r})
+from main_file.bench_fixtures import djvu_page_text
+args = [arg for arg in sys.argv[1:] if not arg.startswith('--page=')]
+pages = [arg[len('--page='):] for arg in sys.argv[1:] if arg.startswith('--page=')]
+with open(args[0] + '.pages') as file:
+    count, seed = map(int, file.read().split())
+start, _, end = (pages[0] if pages else '1-%d' % count).partition('-')
+for page in range(int(start), int(end or start) + 1):
+    sys.stdout.write(djvu_page_text(page, seed) + '\\n\\f')
+"""
+_FAKE_DJVUSED = """#!/bin/sh
+cut -d' ' -f1 "$3.pages"
+"""
+
+
+def djvu_page_text(page, seed=0):
+    return "\n".join(_page_lines(random.Random(seed * 1000003 + page)))
+
+
+def make_djvu(path, pages, seed=0, tools_dir=None):
+    """
+    生成DjVu基准测试用的替身：带 DjVu 文件头的文件和按页输出合成文本的假 djvutxt / djvused 脚本。
+    真实的DjVu编码需要 DjVuLibre 的编码工具，这里只测量分页、并发和子进程调度的开销。
+    返回需要加到 PATH 最前面的脚本目录
+    """
+    tools_dir = tools_dir or os.path.join(os.path.dirname(os.path.abspath(path)), 'djvu_tools')
+    os.makedirs(tools_dir, exist_ok=True)
+    with open(path, 'wb') as file:
+        file.write(b'AT&TFORM\x00\x00\x00\x04DJVM')
+    with open(path + '.pages', 'w') as file:
+        file.write(f"{pages} {seed}")
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    scripts = {'djvutxt': _FAKE_DJVUTXT.format(python=sys.executable, root=root), 'djvused': _FAKE_DJVUSED}
+    for name, content in scripts.items():
+        script = os.path.join(tools_dir, name)
+        with open(script, 'w') as file:
+            file.write(content)
+        os.chmod(script, os.stat(script).st_mode | stat.S_IEXEC)
+    return tools_dir
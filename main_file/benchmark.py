@@ -0,0 +1,307 @@
+import os
+import sys
+import json
+import math
+import time
+import logging
+import argparse
+import platform
+import tempfile
+import statistics
+import multiprocessing
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from main_file import bench_fixtures
+
+# 每个阶段默认测试的规模（页数、段落数或词数），用于画出扩展曲线
+DEFAULT_SIZES = {
+    'pdf': (25, 100, 400),
+    'docx': (1000, 4000, 16000),
+    'html': (1000, 4000, 16000),
+    'djvu': (25, 100, 400),
+    'text': (20000, 80000, 320000),
+}
+DEFAULT_REPEAT = 3
+# 耗时超过基线的比例超过该值时视为性能回退
+REGRESSION_TOLERANCE = 0.25
+
+# 一个基准测试阶段：fixture 决定生成哪种合成文件（'text' 表示直接使用合成文本），unit 为规模的单位
+Stage = namedtuple('Stage', ['name', 'fixture', 'unit', 'run'])
+# 一次测量的结果；被跳过的阶段 skipped 为原因，其余字段为 None
+Measurement = namedtuple('Measurement', ['stage', 'size', 'unit', 'seconds', 'median_seconds', 'throughput',
+                                         'peak_rss_mb', 'skipped'])
+
+
+def _parser(name):
+    def run(path, size, state):
+        from main_file import analyze_all
+        return getattr(analyze_all, name)(path)
+    return run
+
+
+def _ner(path, size, state):
+    from main_file.analyze_all import ner_analysis
+    from main_file.analysis_context import AnalysisContext
+    return ner_analysis(state['text'], context=AnalysisContext(state['text'], 'en', nlp=state['nlp']))
+
+
+def _keywords(path, size, state):
+    from main_file.analyze_all import extract_keywords
+    return extract_keywords(state['text'], 'en')
+
+
+def _sort_marketing_content(n_keywords):
+    # 各入口的 sort_marketing_content 都委托给 rank_sections；调用方通常传入 rank_keywords 的20个关键词，
+    # 更多的关键词（不在文本中出现的变体）用来观察自动机分支
+    def run(path, size, state):
+        from main_file.content_rank import rank_sections
+        words = bench_fixtures.WORDS
+        keywords = [words[i % len(words)] + (str(i // len(words)) if i >= len(words) else '')
+                    for i in range(n_keywords)]
+        return rank_sections(state['text'], keywords, top_k=5)
+    return run
+
+
+def _pipeline(fixture):
+    def run(path, size, state):
+        import re
+        from main_file.analyze_all import PARSERS, extract_keywords
+        from main_file.content_rank import rank_sections
+        text = re.sub(r'\s+', ' ', PARSERS[fixture](path).strip())
+        keywords = extract_keywords(text, 'en')
+        rank_sections(text, keywords, top_k=5)
+        if state.get('nlp') is not None:
+            from main_file.analysis_context import AnalysisContext
+            AnalysisContext(text, 'en', nlp=state['nlp']).brand_names()
+        return text
+    return run
+
+
+STAGES = {stage.name: stage for stage in [
+    Stage('parse_pdf', 'pdf', 'pages', _parser('parse_pdf')),
+    Stage('parse_docx', 'docx', 'paragraphs', _parser('parse_docx')),
+    Stage('parse_html', 'html', 'paragraphs', _parser('parse_html')),
+    Stage('parse_djvu', 'djvu', 'pages', _parser('parse_djvu')),
+    Stage('ner_analysis', 'text', 'words', _ner),
+    Stage('extract_keywords', 'text', 'words', _keywords),
+    Stage('sort_marketing_content', 'text', 'words', _sort_marketing_content(20)),
+    Stage('sort_marketing_content_10kw', 'text', 'words', _sort_marketing_content(10)),
+    Stage('sort_marketing_content_1000kw', 'text', 'words', _sort_marketing_content(1000)),
+    Stage('pipeline_pdf', 'pdf', 'pages', _pipeline('pdf')),
+    Stage('pipeline_docx', 'docx', 'paragraphs', _pipeline('docx')),
+    Stage('pipeline_html', 'html', 'paragraphs', _pipeline('html')),
+    Stage('pipeline_djvu', 'djvu', 'pages', _pipeline('djvu')),
+]}
+
+
+def make_fixture(fixture, size, workdir, seed=0):
+    """
+    生成（或复用已生成的）合成文件，返回文件路径；'text' 阶段不需要文件，返回 None
+    """
+    if fixture == 'text':
+        return None
+    path = os.path.join(workdir, f"bench_{size}_{seed}.{fixture}")
+    if not os.path.exists(path):
+        makers = {'pdf': bench_fixtures.make_pdf, 'docx': bench_fixtures.make_docx, 'html': bench_fixtures.make_html,
+                  'djvu': bench_fixtures.make_djvu}
+        makers[fixture](path, size, seed)
+    return path
+
+
+def _peak_rss_mb():
+    try:
+        import resource
+    except ImportError:
+        return None
+    # Linux 上 ru_maxrss 的单位是KB，macOS 上是字节
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+def _prepare(stage, path, size, seed):
+    # 在计时之外准备输入：合成文本、spacy模型、DjVu替身工具的 PATH
+    state = {'nlp': None}
+    if stage.fixture == 'text':
+        state['text'] = bench_fixtures.synthetic_text(size, seed)
+    if stage.fixture == 'djvu':
+        tools_dir = os.path.join(os.path.dirname(path), 'djvu_tools')
+        os.environ['PATH'] = tools_dir + os.pathsep + os.environ.get('PATH', '')
+    if stage.name == 'ner_analysis' or stage.name.startswith('pipeline_'):
+        from main_file.nlp_models import get_nlp, NER_COMPONENTS
+        try:
+            state['nlp'] = get_nlp('en', components=NER_COMPONENTS)
+        except Exception as e:
+            if stage.name == 'ner_analysis':
+                raise RuntimeError(f"无法加载spacy模型: {e}") from None
+    return state
+
+
+def measure(stage_name, size, path=None, repeat=DEFAULT_REPEAT, seed=0):
+    """
+    在当前进程中运行一个阶段 repeat 次，返回 Measurement；准备输入的时间不计入
+    """
+    stage = STAGES[stage_name]
+    old_path = os.environ.get('PATH', '')
+    try:
+        try:
+            state = _prepare(stage, path, size, seed)
+        except Exception as e:
+            return Measurement(stage_name, size, stage.unit, None, None, None, None, str(e))
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            stage.run(path, size, state)
+            timings.append(time.perf_counter() - started)
+    finally:
+        os.environ['PATH'] = old_path
+    best = min(timings)
+    return Measurement(stage_name, size, stage.unit, round(best, 6), round(statistics.median(timings), 6),
+                       round(size / best, 2) if best > 0 else None, _peak_rss_mb(), None)
+
+
+def run_benchmarks(stages=None, sizes=None, repeat=DEFAULT_REPEAT, workdir=None, isolate=True, seed=0):
+    """
+    依次测量各阶段在各规模下的耗时，返回报告字典。
+    isolate 为 True 时每次测量在新启动的子进程中进行，峰值内存（RSS）互不影响
+    """
+    stages = list(stages or STAGES)
+    own_workdir = None
+    if workdir is None:
+        own_workdir = tempfile.TemporaryDirectory()
+        workdir = own_workdir.name
+    results = []
+    try:
+        for name in stages:
+            stage = STAGES[name]
+            for size in (sizes or {}).get(stage.fixture) or DEFAULT_SIZES[stage.fixture]:
+                path = make_fixture(stage.fixture, size, workdir, seed)
+                if isolate:
+                    context = multiprocessing.get_context('spawn')
+                    with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+                        result = executor.submit(measure, name, size, path, repeat, seed).result()
+                else:
+                    result = measure(name, size, path, repeat, seed)
+                logging.info(f"{name} @ {size} {stage.unit}: "
+                             + (f"跳过（{result.skipped}）" if result.skipped else
+                                f"{result.seconds:.4f}s, {result.throughput} {stage.unit}/s, 峰值RSS {result.peak_rss_mb}MB"))
+                results.append(result)
+    finally:
+        if own_workdir is not None:
+            own_workdir.cleanup()
+    return {
+        'meta': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'repeat': repeat,
+            'seed': seed,
+            'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        },
+        'results': [result._asdict() for result in results],
+        'scaling': scaling_curves(results),
+    }
+
+
+def scaling_exponent(sizes, seconds):
+    """
+    耗时随规模增长的幂指数（对数坐标下的最小二乘斜率）：约等于1为线性，明显大于1说明有超线性的开销
+    """
+    points = [(math.log(size), math.log(value)) for size, value in zip(sizes, seconds) if size > 0 and value]
+    if len(points) < 2:
+        return None
+    mean_x = sum(x for x, _ in points) / len(points)
+    mean_y = sum(y for _, y in points) / len(points)
+    denominator = sum((x - mean_x) ** 2 for x, _ in points)
+    if not denominator:
+        return None
+    return round(sum((x - mean_x) * (y - mean_y) for x, y in points) / denominator, 3)
+
+
+def scaling_curves(results):
+    curves = {}
+    for result in results:
+        if result.skipped:
+            continue
+        curve = curves.setdefault(result.stage, {'unit': result.unit, 'sizes': [], 'seconds': [], 'throughput': []})
+        curve['sizes'].append(result.size)
+        curve['seconds'].append(result.seconds)
+        curve['throughput'].append(result.throughput)
+    for curve in curves.values():
+        curve['exponent'] = scaling_exponent(curve['sizes'], curve['seconds'])
+    return curves
+
+
+def compare_reports(current, baseline, tolerance=REGRESSION_TOLERANCE):
+    """
+    按 (阶段, 规模) 对比两份报告，返回耗时增长超过 tolerance 的回退列表；任一方被跳过的条目不比较
+    """
+    previous = {(item['stage'], item['size']): item for item in baseline.get('results', []) if not item.get('skipped')}
+    regressions = []
+    for item in current.get('results', []):
+        before = previous.get((item['stage'], item['size']))
+        if item.get('skipped') or before is None or not before['seconds']:
+            continue
+        ratio = item['seconds'] / before['seconds']
+        if ratio > 1 + tolerance:
+            regressions.append({'stage': item['stage'], 'size': item['size'], 'baseline_seconds': before['seconds'],
+                                'seconds': item['seconds'], 'ratio': round(ratio, 3)})
+    return regressions
+
+
+def load_report(path):
+    with open(path, 'r', encoding='utf-8') as file:
+        return json.load(file)
+
+
+def save_report(report, path):
+    with open(path, 'w', encoding='utf-8') as file:
+        json.dump(report, file, ensure_ascii=False, indent=2)
+
+
+def _parse_sizes(value):
+    # 形如 "pdf=10,50;text=1000,5000" 的规模覆盖
+    sizes = {}
+    for part in filter(None, value.split(';')):
+        fixture, _, numbers = part.partition('=')
+        sizes[fixture.strip()] = tuple(int(number) for number in numbers.split(','))
+    return sizes
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="用合成语料测量各解析和分析阶段的耗时、吞吐量和峰值内存")
+    arg_parser.add_argument('--stages', help=f"逗号分隔的阶段名称（默认全部）: {', '.join(STAGES)}")
+    arg_parser.add_argument('--sizes', type=_parse_sizes, help="覆盖规模，例如 'pdf=10,50;text=1000,5000'")
+    arg_parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT, help="每个规模重复次数，取最短耗时")
+    arg_parser.add_argument('--workdir', help="合成文件的目录（默认临时目录，用完删除）")
+    arg_parser.add_argument('--no-isolate', action='store_true', help="在当前进程中测量，不为每次测量启动子进程")
+    arg_parser.add_argument('--output', help="把报告写入JSON文件")
+    arg_parser.add_argument('--baseline', help="与该基线报告比较，有回退时退出码为1")
+    arg_parser.add_argument('--save-baseline', help="把本次报告保存为新的基线")
+    arg_parser.add_argument('--tolerance', type=float, default=REGRESSION_TOLERANCE, help="允许的耗时增长比例")
+    args = arg_parser.parse_args(argv)
+
+    stages = args.stages.split(',') if args.stages else None
+    unknown = [name for name in stages or () if name not in STAGES]
+    if unknown:
+        arg_parser.error(f"未知的阶段: {', '.join(unknown)}")
+    report = run_benchmarks(stages, args.sizes, args.repeat, args.workdir, isolate=not args.no_isolate)
+    if args.output:
+        save_report(report, args.output)
+    else:
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+    if args.save_baseline:
+        save_report(report, args.save_baseline)
+    if args.baseline:
+        regressions = compare_reports(report, load_report(args.baseline), args.tolerance)
+        for item in regressions:
+            logging.warning(f"性能回退: {item['stage']} @ {item['size']}: {item['baseline_seconds']:.4f}s -> "
+                            f"{item['seconds']:.4f}s (x{item['ratio']})")
+        if regressions:
+            return 1
+        logging.info("与基线相比没有性能回退")
+    return 0
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    sys.exit(main())
@@ -0,0 +1,53 @@
+from collections import namedtuple
+
+# 通常只包含导航、页眉页脚等样板内容的语义元素
+BOILERPLATE_TAGS = frozenset(['nav', 'header', 'footer', 'aside', 'form', 'menu'])
+# 文本长度达到该值（去掉多余空白后的字符数）的块视为"长块"
+MIN_BLOCK_CHARS = 80
+# 链接文字占比超过该值的块视为导航或链接列表
+MAX_LINK_DENSITY = 0.33
+
+# 页面中的一个文本块：规范化后的文本、其中链接文字的字符数、是否位于样板语义元素内
+Block = namedtuple('Block', ['text', 'link_chars', 'boilerplate_tag'])
+# 正文提取统计：可见文本总字符数、保留的字符数、去除的字符数
+ContentStats = namedtuple('ContentStats', ['total_chars', 'kept_chars', 'removed_chars'])
+
+
+def link_density(block):
+    return block.link_chars / len(block.text) if block.text else 0.0
+
+
+def _is_candidate(block):
+    # 不在样板元素内、链接占比不高的块才可能是正文
+    return not block.boilerplate_tag and link_density(block) <= MAX_LINK_DENSITY
+
+
+def classify_blocks(blocks, min_chars=MIN_BLOCK_CHARS):
+    """
+    按文本密度和链接密度判断每个块是否为正文，返回与 blocks 等长的布尔列表：
+    长度达到 min_chars 且链接占比低的块为正文；较短的块（如小标题）只有紧邻正文块时才保留
+    """
+    long_content = [_is_candidate(block) and len(block.text) >= min_chars for block in blocks]
+    keep = list(long_content)
+    for i, block in enumerate(blocks):
+        if keep[i] or not _is_candidate(block):
+            continue
+        previous = i > 0 and long_content[i - 1]
+        following = i + 1 < len(blocks) and long_content[i + 1]
+        keep[i] = previous or following
+    return keep
+
+
+def strip_boilerplate(blocks, min_chars=MIN_BLOCK_CHARS):
+    """
+    去掉样板块，返回 (正文文本, ContentStats)。
+    页面中没有任何长正文块时（如很短的页面），保留所有候选块，避免返回空文本
+    """
+    blocks = [block for block in blocks if block.text]
+    total = sum(len(block.text) for block in blocks)
+    keep = classify_blocks(blocks, min_chars)
+    if not any(keep):
+        keep = [_is_candidate(block) for block in blocks]
+    kept = [block.text for block, flag in zip(blocks, keep) if flag]
+    kept_chars = sum(len(text) for text in kept)
+    return "\n".join(kept), ContentStats(total, kept_chars, total - kept_chars)
@@ -0,0 +1,106 @@
+import re
+from collections import namedtuple
+
+# 单个片段的最大字符数（远小于spacy默认的 max_length=1000000）以及相邻片段的重叠字符数
+DEFAULT_CHUNK_SIZE = 100000
+DEFAULT_OVERLAP = 1000
+DEFAULT_BATCH_SIZE = 4
+
+# 切分边界的优先级：段落 > 句子 > 空白
+_BOUNDARIES = [
+    re.compile(r'\n\s*'),
+    re.compile(r'[.!?。！？]+\s*'),
+    re.compile(r'\s+'),
+]
+
+# 片段在原文中的起点、本片段"负责"的区间 [owned_start, owned_end) 以及处理后的 Doc
+ChunkDoc = namedtuple('ChunkDoc', ['start', 'owned_start', 'owned_end', 'doc'])
+
+
+def chunk_size_for(nlp, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    返回不超过模型 max_length 的分块大小，长于它的文本需要分块处理
+    """
+    return min(chunk_size, getattr(nlp, 'max_length', chunk_size))
+
+
+def _last_boundary(text, lo, hi):
+    # 返回 [lo, hi) 中优先级最高的最后一个边界之后的位置，找不到时返回 None
+    for pattern in _BOUNDARIES:
+        position = None
+        for match in pattern.finditer(text, lo, hi):
+            position = match.end()
+        if position is not None and lo < position <= hi:
+            return position
+    return None
+
+
+def split_text(text, chunk_size=DEFAULT_CHUNK_SIZE, overlap=DEFAULT_OVERLAP):
+    """
+    在段落或句子边界处把文本切分为 (start, end) 片段，相邻片段至少重叠 overlap 个字符
+    """
+    length = len(text)
+    if length <= chunk_size:
+        return [(0, length)]
+    overlap = min(overlap, chunk_size // 4)
+    spans = []
+    start = 0
+    while True:
+        limit = start + chunk_size
+        if limit >= length:
+            spans.append((start, length))
+            return spans
+        end = _last_boundary(text, start + chunk_size // 2, limit) or limit
+        spans.append((start, end))
+        # 下一个片段从重叠区域之前的边界开始
+        next_start = _last_boundary(text, max(start + 1, end - 2 * overlap), end - overlap) or end - overlap
+        start = max(next_start, start + 1)
+
+
+def _owned_ranges(spans):
+    # 相邻片段的重叠区域按中点划分归属，保证每个字符只属于一个片段
+    owned = []
+    for i, (start, end) in enumerate(spans):
+        owned_start = 0 if i == 0 else (spans[i - 1][1] + start) // 2
+        owned_end = end if i == len(spans) - 1 else (end + spans[i + 1][0]) // 2
+        owned.append((owned_start, owned_end))
+    return owned
+
+
+def iter_chunk_docs(text, nlp, chunk_size=DEFAULT_CHUNK_SIZE, overlap=DEFAULT_OVERLAP, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    切分文本并通过 nlp.pipe 逐个产出 ChunkDoc
+    """
+    spans = split_text(text, chunk_size, overlap)
+    owned = _owned_ranges(spans)
+    docs = nlp.pipe((text[start:end] for start, end in spans), batch_size=batch_size)
+    for (start, _), (owned_start, owned_end), doc in zip(spans, owned, docs):
+        yield ChunkDoc(start, owned_start, owned_end, doc)
+
+
+def merge_entities(chunk_docs):
+    """
+    把各片段的实体映射回原文偏移，去掉重叠区域中的重复实体，返回 (文本, 标签, 起点, 终点) 列表
+    """
+    candidates = []
+    for chunk in chunk_docs:
+        for ent in chunk.doc.ents:
+            start = chunk.start + ent.start_char
+            if chunk.owned_start <= start < chunk.owned_end:
+                candidates.append((ent.text, ent.label_, start, chunk.start + ent.end_char))
+    # 归属划分后仍然相互重叠的实体（跨越中点被截断的情况）保留较长的一个
+    merged = []
+    for entity in sorted(candidates, key=lambda item: (item[2], item[2] - item[3])):
+        if merged and entity[2] < merged[-1][3]:
+            if entity[3] - entity[2] > merged[-1][3] - merged[-1][2]:
+                merged[-1] = entity
+            continue
+        merged.append(entity)
+    return merged
+
+
+def chunked_entities(text, nlp, chunk_size=DEFAULT_CHUNK_SIZE, overlap=DEFAULT_OVERLAP, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    分块进行NER，返回与单次 nlp(text) 相同格式的实体列表；短文本时结果与单次处理一致
+    """
+    return merge_entities(iter_chunk_docs(text, nlp, chunk_size, overlap, batch_size))
@@ -0,0 +1,137 @@
+import re
+import heapq
+from collections import deque
+from main_file import instrument
+
+# 与原 sort_marketing_content 相同的分段规则：换行或连续两个以上的空白
+_SECTION_SEPARATOR = re.compile(r'\n+|\s{2,}')
+# 不同关键词达到该数量时才使用自动机；关键词较少时（rank_keywords 默认返回20个）逐个 str.count 更快
+AUTOMATON_MIN_KEYWORDS = 64
+
+
+def iter_sections(content):
+    """
+    惰性地按 re.split(r'\\n+|\\s{2,}', content.strip()) 的规则产出各段，不生成完整的列表
+    """
+    content = content.strip()
+    start = 0
+    for match in _SECTION_SEPARATOR.finditer(content):
+        yield content[start:match.start()]
+        start = match.end()
+    yield content[start:]
+
+
+class KeywordMatcher:
+    """
+    统计关键词列表在文本中的出现次数之和。不同关键词少于 AUTOMATON_MIN_KEYWORDS 个时逐个调用 str.count，
+    否则构建 Aho-Corasick 自动机一次扫描统计所有关键词。
+    每个关键词按 str.count 的语义计数（从左到右、互不重叠），列表中重复的关键词重复计数，
+    因此 count(section) == sum(section.count(k) for k in keywords)。
+    case_sensitive 为 False 时关键词和文本都先做 casefold。
+    """
+
+    def __init__(self, keywords, case_sensitive=True, min_automaton_keywords=AUTOMATON_MIN_KEYWORDS):
+        self.case_sensitive = case_sensitive
+        self._goto = [{}]
+        self._fail = [0]
+        # 每个状态上结束的关键词：(关键词编号, 长度)，包含沿失败链继承的输出
+        self._output = [()]
+        self._weights = []
+        self._empty_weight = 0
+        ids = {}
+        for keyword in keywords:
+            keyword = self._fold(keyword)
+            if not keyword:
+                # str.count('') 返回 len + 1，单独处理
+                self._empty_weight += 1
+                continue
+            if keyword in ids:
+                self._weights[ids[keyword]] += 1
+                continue
+            ids[keyword] = len(self._weights)
+            self._weights.append(1)
+        # (关键词, 重复次数)，关键词较少时 count 直接使用
+        self._keywords = [(keyword, self._weights[keyword_id]) for keyword, keyword_id in ids.items()]
+        self.use_automaton = len(ids) >= min_automaton_keywords
+        if self.use_automaton:
+            for keyword, keyword_id in ids.items():
+                self._insert(keyword, keyword_id)
+            self._build_links()
+
+    def _fold(self, text):
+        return text if self.case_sensitive else text.casefold()
+
+    def _insert(self, keyword, keyword_id):
+        state = 0
+        for ch in keyword:
+            next_state = self._goto[state].get(ch)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][ch] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append(())
+            state = next_state
+        self._output[state] = self._output[state] + ((keyword_id, len(keyword)),)
+
+    def _build_links(self):
+        # 按广度优先计算失败链接，并把失败状态的输出并入当前状态
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, next_state in self._goto[state].items():
+                fail = self._fail[state]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[next_state] = self._goto[fail].get(ch, 0)
+                self._output[next_state] = self._output[next_state] + self._output[self._fail[next_state]]
+                queue.append(next_state)
+
+    def __len__(self):
+        return sum(self._weights) + self._empty_weight
+
+    def count(self, text):
+        """
+        返回所有关键词在 text 中出现次数之和
+        """
+        text = self._fold(text)
+        total = self._empty_weight * (len(text) + 1)
+        if not self.use_automaton:
+            for keyword, weight in self._keywords:
+                total += text.count(keyword) * weight
+            return total
+        goto, fail, output, weights = self._goto, self._fail, self._output, self._weights
+        # 每个关键词上一次计数的结束位置，保证同一关键词的匹配互不重叠
+        last_end = {}
+        state = 0
+        for position, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            for keyword_id, length in output[state]:
+                start = position + 1 - length
+                if start >= last_end.get(keyword_id, 0):
+                    last_end[keyword_id] = position + 1
+                    total += weights[keyword_id]
+        return total
+
+
+def score_section(section, matcher):
+    # 与原实现一致：段落长度 + 关键词出现次数
+    return len(section) + matcher.count(section)
+
+
+@instrument.instrumented('rank_sections')
+def rank_sections(content, keywords, top_k=None, case_sensitive=True):
+    """
+    对 content 中的各段打分并按得分从高到低返回；keywords 可以是关键词列表或已构建的 KeywordMatcher。
+    指定 top_k 时用堆只保留前 top_k 段，得分相同的段保持原有顺序。
+    """
+    matcher = keywords if isinstance(keywords, KeywordMatcher) else KeywordMatcher(keywords, case_sensitive)
+    scored = ((score_section(section, matcher), -index, section)
+              for index, section in enumerate(iter_sections(content)))
+    if top_k is None:
+        ranked = sorted(scored, reverse=True)
+    else:
+        ranked = heapq.nlargest(top_k, scored)
+    return [section for _, _, section in ranked]
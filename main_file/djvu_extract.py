@@ -0,0 +1,187 @@
+import os
+import shutil
+import logging
+import subprocess
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+# djvutxt 输出中的分页符
+PAGE_SEPARATOR = '\f'
+# 每个 djvutxt 子进程处理的页数
+PAGES_PER_TASK = 8
+# 每页允许的最长提取时间（秒），一个页面范围的超时为页数乘以该值
+PAGE_TIMEOUT = 30.0
+# 获取页数时 djvused 的超时（秒）
+COUNT_TIMEOUT = 30.0
+
+
+def available_backend():
+    """
+    返回可用的提取后端：优先使用 DjVuLibre 的 djvutxt 命令行工具，其次是 python-djvulibre（djvu.decode），
+    都不可用时返回 None
+    """
+    if shutil.which('djvutxt'):
+        return 'djvutxt'
+    try:
+        import djvu.decode  # noqa: F401
+        return 'djvulibre'
+    except ImportError:
+        return None
+
+
+def djvu_page_count(file_path, timeout=COUNT_TIMEOUT):
+    """
+    返回文档页数：优先用 djvused 读取；没有 djvused 时，单页文档（FORM:DJVU）返回1，其余无法确定时返回 None
+    """
+    if shutil.which('djvused'):
+        try:
+            result = subprocess.run(['djvused', '-e', 'n', file_path], capture_output=True, text=True,
+                                    timeout=timeout)
+            if result.returncode == 0:
+                return int(result.stdout.strip())
+            logging.warning(f"djvused 获取页数失败: {result.stderr.strip()}")
+        except (subprocess.TimeoutExpired, ValueError) as e:
+            logging.warning(f"djvused 获取页数失败: {e}")
+    try:
+        with open(file_path, 'rb') as file:
+            head = file.read(16)
+    except OSError:
+        return None
+    if head.startswith(b'AT&TFORM') and head[12:16] == b'DJVU':
+        return 1
+    return None
+
+
+def _split_pages(output, count):
+    # djvutxt 用分页符分隔各页，最后一页之后可能还有一个分页符；页数对不上时按实际内容补齐或截断
+    pages = output.split(PAGE_SEPARATOR)
+    if len(pages) == count + 1 and not pages[-1].strip():
+        pages.pop()
+    if len(pages) > count:
+        pages[count - 1:] = [PAGE_SEPARATOR.join(pages[count - 1:])]
+    return pages + [""] * (count - len(pages))
+
+
+def _run_djvutxt(file_path, start, end, page_timeout):
+    # 提取 [start, end) 范围内的页面（从0开始计数），超时或失败时抛出异常
+    result = subprocess.run(['djvutxt', f'--page={start + 1}-{end}', file_path], capture_output=True,
+                            text=True, encoding='utf-8', errors='replace', timeout=page_timeout * (end - start))
+    if result.returncode != 0:
+        raise RuntimeError(f"djvutxt 执行失败: {result.stderr.strip()}")
+    return _split_pages(result.stdout, end - start)
+
+
+def _extract_range(file_path, start, end, page_timeout):
+    """
+    提取一个页面范围；整个范围超时或失败时逐页重试，只有出错的那一页返回空文本
+    """
+    try:
+        return _run_djvutxt(file_path, start, end, page_timeout)
+    except (subprocess.TimeoutExpired, RuntimeError) as e:
+        if end - start == 1:
+            logging.error(f"提取 {os.path.basename(file_path)} 第 {start + 1} 页失败: {e}")
+            return [""]
+        logging.warning(f"提取 {os.path.basename(file_path)} 第 {start + 1}-{end} 页失败，改为逐页提取: {e}")
+    return [_extract_range(file_path, page, page + 1, page_timeout)[0] for page in range(start, end)]
+
+
+def iter_djvu_page_ranges(file_path, page_count, workers=None, pages_per_task=PAGES_PER_TASK,
+                          page_timeout=PAGE_TIMEOUT):
+    """
+    把页面按 pages_per_task 页一组分给最多 workers 个并发的 djvutxt 子进程，按页序逐页产出 (页码, 文本)。
+    同时最多保留 2*workers 个未完成的范围；None 表示使用全部CPU核心
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    ranges = iter([(start, min(start + pages_per_task, page_count)) for start in range(0, page_count, pages_per_task)])
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        pending = deque()
+
+        def submit(count):
+            for start, end in ranges:
+                pending.append((start, executor.submit(_extract_range, file_path, start, end, page_timeout)))
+                count -= 1
+                if not count:
+                    return
+
+        submit(2 * workers)
+        try:
+            while pending:
+                start, future = pending.popleft()
+                pages = future.result()
+                submit(1)
+                for offset, text in enumerate(pages):
+                    yield start + offset, text
+        finally:
+            for _, future in pending:
+                future.cancel()
+
+
+def _iter_djvutxt_stream(file_path):
+    # 无法确定页数时的后备方式：调用一次 djvutxt 并逐页读取其输出，不会把全部输出保存在内存中
+    process = subprocess.Popen(['djvutxt', file_path], stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                               text=True, encoding='utf-8', errors='replace')
+    try:
+        index = 0
+        buffer = []
+        for line in process.stdout:
+            while PAGE_SEPARATOR in line:
+                head, line = line.split(PAGE_SEPARATOR, 1)
+                buffer.append(head)
+                yield index, "".join(buffer)
+                index += 1
+                buffer = []
+            buffer.append(line)
+        tail = "".join(buffer)
+        if tail.strip():
+            yield index, tail
+        stderr = process.stderr.read()
+        if process.wait() != 0:
+            raise RuntimeError(f"djvutxt 执行失败: {stderr.strip()}")
+    finally:
+        if process.poll() is None:
+            process.kill()
+            process.wait()
+        process.stdout.close()
+        process.stderr.close()
+
+
+def _sexpr_text(sexpr):
+    # 页面文本层是嵌套的 (类型 x0 y0 x1 y1 子节点或字符串...) 列表，按顺序收集所有字符串
+    import djvu.sexpr
+    if isinstance(sexpr, djvu.sexpr.ListExpression):
+        return " ".join(filter(None, (_sexpr_text(child) for child in list(sexpr)[5:])))
+    if isinstance(sexpr, djvu.sexpr.StringExpression):
+        value = sexpr.value
+        return value.decode('utf-8', 'replace') if isinstance(value, bytes) else value
+    return ""
+
+
+def _iter_djvulibre_pages(file_path):
+    # python-djvulibre 后端：在当前进程中按页序读取文本层
+    import djvu.decode
+    context = djvu.decode.Context()
+    document = context.new_document(djvu.decode.FileURI(file_path))
+    document.decoding_job.wait()
+    for index, page in enumerate(document.pages):
+        page.text.wait()
+        yield index, _sexpr_text(page.text.sexpr) + "\n"
+
+
+def iter_djvu_pages(file_path, workers=None, page_timeout=PAGE_TIMEOUT, backend=None):
+    """
+    按页序逐页产出 (页码, 文本)。
+    使用 djvutxt 且能确定页数时，按页面范围并发运行多个带超时的子进程；无法确定页数时调用一次 djvutxt 流式读取。
+    没有 djvutxt 时使用 python-djvulibre
+    """
+    backend = backend or available_backend()
+    if backend == 'djvulibre':
+        yield from _iter_djvulibre_pages(file_path)
+        return
+    if backend != 'djvutxt':
+        raise RuntimeError("未找到 djvutxt 命令或 python-djvulibre 库，无法解析.djvu文件")
+    page_count = djvu_page_count(file_path)
+    if page_count is None:
+        yield from _iter_djvutxt_stream(file_path)
+    else:
+        yield from iter_djvu_page_ranges(file_path, page_count, workers, page_timeout=page_timeout)
@@ -0,0 +1,97 @@
+import re
+import zipfile
+from xml.etree.ElementTree import iterparse
+
+# WordprocessingML 命名空间
+W_NS = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+MC_NS = '{http://schemas.openxmlformats.org/markup-compatibility/2006}'
+
+DOCUMENT_PART = 'word/document.xml'
+# 正文之后依次读取的部件：脚注、尾注、页眉、页脚
+_EXTRA_PARTS = re.compile(r'word/(footnotes|endnotes|header\d*|footer\d*)\.xml$')
+_PART_ORDER = {'footnotes': 0, 'endnotes': 1, 'header': 2, 'footer': 3}
+
+_P = W_NS + 'p'
+_T = W_NS + 't'
+_TAB = W_NS + 'tab'
+_BREAKS = frozenset([W_NS + 'br', W_NS + 'cr'])
+# mc:Fallback 中是文本框等内容的旧格式副本，与 mc:Choice 重复，跳过
+_FALLBACK = MC_NS + 'Fallback'
+
+
+def docx_parts(archive, include_extra=True):
+    """
+    返回需要读取的XML部件名：先是 word/document.xml，再是脚注、尾注、页眉、页脚（按编号排序）
+    """
+    names = archive.namelist()
+    if DOCUMENT_PART not in names:
+        raise ValueError(f"不是有效的DOCX文件，缺少 {DOCUMENT_PART}")
+    if not include_extra:
+        return [DOCUMENT_PART]
+
+    def order(name):
+        kind = re.match(r'word/([a-z]+)(\d*)\.xml$', name)
+        return _PART_ORDER[kind.group(1)], int(kind.group(2) or 0)
+
+    return [DOCUMENT_PART] + sorted((name for name in names if _EXTRA_PARTS.match(name)), key=order)
+
+
+def iter_part_paragraphs(stream):
+    """
+    用 iterparse 流式解析一个 WordprocessingML 部件，逐段产出段落文本（包括表格单元格中的段落）。
+    处理完的元素立即清空并从父元素中移除，内存占用与部件大小无关
+    """
+    stack = []
+    paragraphs = []
+    fallback_depth = 0
+    for event, elem in iterparse(stream, events=('start', 'end')):
+        tag = elem.tag
+        if event == 'start':
+            stack.append(elem)
+            if tag == _FALLBACK:
+                fallback_depth += 1
+            elif tag == _P and not fallback_depth:
+                paragraphs.append([])
+            continue
+
+        stack.pop()
+        if tag == _FALLBACK:
+            fallback_depth -= 1
+        elif fallback_depth or not paragraphs:
+            pass
+        elif tag == _T:
+            paragraphs[-1].append(elem.text or "")
+        elif tag == _TAB:
+            paragraphs[-1].append('\t')
+        elif tag in _BREAKS:
+            paragraphs[-1].append('\n')
+        elif tag == _P:
+            # 文本框中的段落嵌套在外层段落内，先于外层段落产出
+            yield "".join(paragraphs.pop())
+
+        # 段落内部的元素要等段落结束后才能释放
+        if not paragraphs:
+            elem.clear()
+            if stack:
+                stack[-1].remove(elem)
+
+
+def iter_docx_paragraphs(file_path, include_extra=True):
+    """
+    逐段产出 .docx 文件的 (段落序号, 文本)：直接从OOXML压缩包中流式解析正文、表格，
+    以及脚注、尾注、页眉和页脚（include_extra 为 False 时只读正文），不构建 python-docx 对象模型
+    """
+    index = 0
+    with zipfile.ZipFile(file_path) as archive:
+        for part in docx_parts(archive, include_extra):
+            with archive.open(part) as stream:
+                for text in iter_part_paragraphs(stream):
+                    yield index, text
+                    index += 1
+
+
+def docx_text(file_path, include_extra=True):
+    """
+    返回 .docx 文件的全部段落文本，段落之间用换行符连接
+    """
+    return "\n".join(text for _, text in iter_docx_paragraphs(file_path, include_extra))
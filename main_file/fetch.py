@@ -0,0 +1,190 @@
+import json
+import time
+import asyncio
+import logging
+import sqlite3
+from collections import namedtuple
+from urllib.parse import urlsplit
+from main_file.text_cache import TextCache, PARSER_VERSION, cache_disabled
+from main_file.html_extract import HtmlExtractor, log_content_stats
+
+# 全局并发连接数、每个主机的并发请求数、单次请求超时（秒）、失败重试次数及退避基数（秒）
+DEFAULT_CONCURRENCY = 64
+DEFAULT_PER_HOST = 8
+DEFAULT_TIMEOUT = 10.0
+DEFAULT_RETRIES = 3
+BACKOFF = 0.5
+# Retry-After 最多等待的秒数
+MAX_RETRY_AFTER = 30.0
+# 这些状态码视为暂时性错误，会重试
+RETRY_STATUSES = frozenset([429, 500, 502, 503, 504])
+
+# 抓取结果：status 为最终的HTTP状态码（304 表示使用了本地缓存），text 为提取出的正文；失败时 error 为错误信息
+FetchResult = namedtuple('FetchResult', ['url', 'status', 'text', 'from_cache', 'error'])
+
+
+class HttpCache(TextCache):
+    """
+    条件请求使用的本地缓存：按 (URL, 提取模式, 解析器版本) 保存 ETag、Last-Modified 和提取出的文本，
+    不保存原始响应体
+    """
+    FILE_NAME = 'http_cache.sqlite'
+    MAX_MB_ENV = 'ANALYZE_HTTP_CACHE_MB'
+
+    @staticmethod
+    def make_key(url, mode):
+        return f"{url}:{mode}:{PARSER_VERSION}"
+
+    def get_entry(self, key):
+        data = self.get(key)
+        return json.loads(data) if data is not None else None
+
+    def put_entry(self, key, entry):
+        self.put(key, json.dumps(entry, ensure_ascii=False))
+
+
+class AsyncFetcher:
+    """
+    基于 httpx.AsyncClient 连接池的异步抓取器：限制全局和每个主机的并发数，超时和暂时性错误按指数退避重试，
+    有缓存时发送 If-None-Match / If-Modified-Since 条件请求；响应体分块送入HTML提取器，不在内存中保留整页。
+    用法：async with AsyncFetcher() as fetcher: result = await fetcher.fetch(url)
+    """
+
+    def __init__(self, concurrency=DEFAULT_CONCURRENCY, per_host=DEFAULT_PER_HOST, timeout=DEFAULT_TIMEOUT,
+                 retries=DEFAULT_RETRIES, cache=None, main_content=True, bypass_cache=False):
+        self.concurrency = concurrency
+        self.per_host = per_host
+        self.timeout = timeout
+        self.retries = retries
+        self.main_content = main_content
+        if cache is None and not (bypass_cache or cache_disabled()):
+            cache = HttpCache()
+        self.cache = cache
+        self._client = None
+        self._slots = None
+        self._host_slots = {}
+        self.requests = 0
+        self.not_modified = 0
+
+    async def __aenter__(self):
+        import httpx
+        limits = httpx.Limits(max_connections=self.concurrency, max_keepalive_connections=self.concurrency)
+        self._client = httpx.AsyncClient(limits=limits, timeout=self.timeout, follow_redirects=True)
+        self._slots = asyncio.Semaphore(self.concurrency)
+        return self
+
+    async def __aexit__(self, *exc):
+        await self._client.aclose()
+        self._client = None
+
+    def _host_slot(self, url):
+        host = urlsplit(url).netloc
+        if host not in self._host_slots:
+            self._host_slots[host] = asyncio.Semaphore(self.per_host)
+        return self._host_slots[host]
+
+    def _cached_entry(self, key):
+        if self.cache is None:
+            return None
+        try:
+            return self.cache.get_entry(key)
+        except sqlite3.Error as e:
+            logging.warning(f"读取HTTP缓存失败: {e}")
+            return None
+
+    def _store_entry(self, key, entry):
+        if self.cache is None or not (entry['etag'] or entry['last_modified']):
+            return
+        try:
+            self.cache.put_entry(key, entry)
+        except sqlite3.Error as e:
+            logging.warning(f"写入HTTP缓存失败: {e}")
+
+    async def fetch(self, url):
+        """
+        抓取单个URL并提取正文，返回 FetchResult；不会抛出网络异常
+        """
+        import httpx
+        key = HttpCache.make_key(url, 'main' if self.main_content else 'text')
+        entry = self._cached_entry(key)
+        headers = {}
+        if entry is not None:
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+
+        error, wait = None, None
+        for attempt in range(self.retries + 1):
+            if attempt:
+                await asyncio.sleep(wait if wait is not None else BACKOFF * 2 ** (attempt - 1))
+            try:
+                # 先占用主机的名额再占用全局名额，避免等待某个繁忙主机时占着全局连接
+                async with self._host_slot(url), self._slots:
+                    self.requests += 1
+                    result = await self._request(url, headers, entry, key)
+            except httpx.RequestError as e:
+                error, wait = f"{type(e).__name__}: {e}", None
+                continue
+            if isinstance(result, FetchResult):
+                return result
+            status, wait = result
+            error = f"HTTP {status}"
+        logging.error(f"抓取 {url} 失败: {error}")
+        return FetchResult(url, None, "", False, error)
+
+    async def _request(self, url, headers, entry, key):
+        # 返回 FetchResult；遇到可重试的状态码时返回 (状态码, 建议等待秒数或 None)
+        async with self._client.stream('GET', url, headers=headers) as response:
+            if response.status_code == 304 and entry is not None:
+                self.not_modified += 1
+                return FetchResult(url, 304, entry['text'], True, None)
+            if response.status_code in RETRY_STATUSES:
+                return response.status_code, _retry_after(response.headers.get('Retry-After'))
+            if response.status_code >= 400:
+                return FetchResult(url, response.status_code, "", False, f"HTTP {response.status_code}")
+            extractor = HtmlExtractor(text_only=True, main_content=self.main_content)
+            async for block in response.aiter_text():
+                extractor.feed(block)
+            content = extractor.close()
+            log_content_stats(content.stats, url)
+            self._store_entry(key, {
+                'etag': response.headers.get('ETag'),
+                'last_modified': response.headers.get('Last-Modified'),
+                'text': content.text,
+                'fetched_at': time.time(),
+            })
+            return FetchResult(url, response.status_code, content.text, False, None)
+
+    async def fetch_all(self, urls):
+        """
+        并发抓取所有URL，按完成顺序逐个产出 FetchResult（异步生成器）
+        """
+        tasks = [asyncio.ensure_future(self.fetch(url)) for url in urls]
+        try:
+            for task in asyncio.as_completed(tasks):
+                yield await task
+        finally:
+            for task in tasks:
+                task.cancel()
+
+
+def _retry_after(value):
+    try:
+        return min(float(value), MAX_RETRY_AFTER)
+    except (TypeError, ValueError):
+        return None
+
+
+def fetch_pages(urls, **kwargs):
+    """
+    同步接口：并发抓取 urls，返回与 urls 顺序一致的 FetchResult 列表。kwargs 传给 AsyncFetcher
+    """
+    async def run():
+        async with AsyncFetcher(**kwargs) as fetcher:
+            results = {}
+            async for result in fetcher.fetch_all(urls):
+                results[result.url] = result
+            return [results[url] for url in urls]
+
+    return asyncio.run(run())
@@ -0,0 +1,174 @@
+import os
+import zipfile
+import importlib
+from collections import OrderedDict, namedtuple
+from main_file.pdf_extract import iter_pdf_pages
+from main_file.docx_extract import iter_docx_paragraphs
+from main_file.djvu_extract import iter_djvu_pages
+
+# 嗅探时读取的文件头字节数
+SNIFF_BYTES = 4096
+
+# 一种文件格式：名称、扩展名、内容嗅探函数 sniff(head, file_path) -> bool、
+# 整篇解析函数 parser(file_path) -> str 以及可选的流式读取函数 reader(file_path) -> (序号, 文本) 迭代器。
+# parser 和 reader 可以是可调用对象，也可以是 'module:function' 字符串（第一次使用时才导入）
+FileFormat = namedtuple('FileFormat', ['name', 'extensions', 'sniff', 'parser', 'reader'])
+
+
+class UnsupportedFormatError(ValueError):
+    pass
+
+
+def file_extension(file_path):
+    return os.path.splitext(file_path)[1].lstrip('.').lower()
+
+
+def read_head(file_path, size=SNIFF_BYTES):
+    with open(file_path, 'rb') as file:
+        return file.read(size)
+
+
+def _resolve(target):
+    if isinstance(target, str):
+        module_name, _, attr = target.partition(':')
+        return getattr(importlib.import_module(module_name), attr)
+    return target
+
+
+class FormatRegistry:
+    """
+    文件格式注册表：先按文件头的魔数嗅探格式，嗅探不出时再按扩展名判断。
+    按注册顺序尝试嗅探函数，后注册的同名格式会替换先前的注册。
+    """
+
+    def __init__(self):
+        self._formats = OrderedDict()
+
+    def register(self, name, extensions=(), sniff=None, parser=None, reader=None):
+        self._formats[name] = FileFormat(name, tuple(ext.lower() for ext in extensions), sniff, parser, reader)
+        return self._formats[name]
+
+    def get(self, name):
+        return self._formats.get(name)
+
+    def formats(self):
+        return list(self._formats.values())
+
+    def extensions(self):
+        return tuple(ext for file_format in self._formats.values() for ext in file_format.extensions)
+
+    def by_extension(self, file_path):
+        extension = file_extension(file_path)
+        for file_format in self._formats.values():
+            if extension in file_format.extensions:
+                return file_format
+        return None
+
+    def sniff(self, file_path, head=None):
+        """
+        只根据文件内容判断格式，无法识别或文件不可读时返回 None
+        """
+        if head is None:
+            try:
+                head = read_head(file_path)
+            except OSError:
+                return None
+        for file_format in self._formats.values():
+            if file_format.sniff is not None and file_format.sniff(head, file_path):
+                return file_format
+        return None
+
+    def detect(self, file_path, head=None):
+        """
+        返回文件的 FileFormat：优先使用内容嗅探，扩展名作为后备；都无法识别时返回 None
+        """
+        return self.sniff(file_path, head) or self.by_extension(file_path)
+
+    def parser_for(self, file_path):
+        """
+        返回 (FileFormat, 解析函数)；格式无法识别或没有可用的解析函数时抛出 UnsupportedFormatError，
+        不再尝试解析
+        """
+        file_format = self.detect(file_path)
+        if file_format is None:
+            raise UnsupportedFormatError(f"不支持的文件类型: {os.path.basename(file_path)}")
+        if file_format.parser is None:
+            raise UnsupportedFormatError(f"不支持解析 {file_format.name} 格式的文件: {os.path.basename(file_path)}")
+        return file_format, _resolve(file_format.parser)
+
+    def reader_for(self, file_path):
+        """
+        返回 (FileFormat, 流式读取函数)；格式不支持流式读取时读取函数为 None
+        """
+        file_format = self.detect(file_path)
+        if file_format is None:
+            raise UnsupportedFormatError(f"不支持的文件类型: {os.path.basename(file_path)}")
+        return file_format, _resolve(file_format.reader) if file_format.reader is not None else None
+
+
+def sniff_pdf(head, file_path=None):
+    # PDF 头允许前面有少量垃圾字节，规范要求出现在前1024字节内
+    return b'%PDF-' in head[:1024]
+
+
+def sniff_docx(head, file_path=None):
+    # OOXML 是 ZIP 包，需要进一步确认包内有 word/document.xml（排除 xlsx、pptx、普通zip）
+    if not head.startswith(b'PK\x03\x04') or file_path is None:
+        return False
+    try:
+        with zipfile.ZipFile(file_path) as archive:
+            return 'word/document.xml' in archive.namelist()
+    except (OSError, zipfile.BadZipFile):
+        return False
+
+
+def sniff_ole2(head, file_path=None):
+    # 旧版 Word 97-2003 的 OLE2 复合文档
+    return head.startswith(b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1')
+
+
+def sniff_djvu(head, file_path=None):
+    return head.startswith(b'AT&TFORM') and head[12:15] == b'DJV'
+
+
+_HTML_MARKERS = (b'<!doctype html', b'<html', b'<head', b'<body', b'<meta', b'<title', b'<div', b'<p>', b'<p ')
+
+
+def sniff_html(head, file_path=None):
+    # 跳过BOM和空白后，文本开头附近出现常见的HTML标记
+    text = head.lstrip(b'\xef\xbb\xbf').lstrip().lower()
+    if not text.startswith(b'<'):
+        return False
+    return any(marker in text[:1024] for marker in _HTML_MARKERS)
+
+
+_registry = FormatRegistry()
+_registry.register('pdf', ('pdf',), sniff_pdf, 'main_file.analyze_all:parse_pdf', iter_pdf_pages)
+_registry.register('docx', ('docx',), sniff_docx, 'main_file.analyze_all:parse_docx', iter_docx_paragraphs)
+# 旧版二进制 .doc 无法用 python-docx 解析；扩展名为 .doc 的 OOXML 文件会被嗅探为 docx
+_registry.register('doc', ('doc',), sniff_ole2)
+_registry.register('djvu', ('djvu', 'djv'), sniff_djvu, 'main_file.analyze_all:parse_djvu', iter_djvu_pages)
+_registry.register('html', ('html', 'htm', 'xhtml'), sniff_html, 'main_file.analyze_all:parse_html')
+
+
+def get_format_registry():
+    return _registry
+
+
+def register_format(name, extensions=(), sniff=None, parser=None, reader=None):
+    """
+    在全局注册表中注册（或替换）一种文件格式
+    """
+    return _registry.register(name, extensions, sniff, parser, reader)
+
+
+def detect_format(file_path):
+    return _registry.detect(file_path)
+
+
+def is_format(file_path, name):
+    """
+    判断文件（按内容嗅探，扩展名作为后备）是否为指定格式
+    """
+    file_format = _registry.detect(file_path)
+    return file_format is not None and file_format.name == name
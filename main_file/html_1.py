@@ -1,31 +1,17 @@
-from bs4 import BeautifulSoup
+from main_file.html_extract import extract_html_file
 
 
 def parse_html(html_file_path):
     try:
-        with open(html_file_path, 'r', encoding='utf-8') as file:
-            html_content = file.read()
-            soup = BeautifulSoup(html_content, 'html.parser')
-
-            # 提取页面标题
-            title = soup.title.string if soup.title else None
-
-            # 提取所有链接
-            links = [a.get('href') for a in soup.find_all('a') if a.get('href')]
-
-            # 提取所有段落文本
-            paragraphs = [p.get_text() for p in soup.find_all('p')]
-
-            # 提取所有图片链接
-            images = [img.get('src') for img in soup.find_all('img') if img.get('src')]
-
-            result = {
-                'title': title,
-                'links': links,
-                'paragraphs': paragraphs,
-                'images': images
-            }
-            return result
+        # 单次流式遍历同时提取标题、链接、段落文本和图片链接，不构建文档树
+        content = extract_html_file(html_file_path)
+        result = {
+            'title': content.title,
+            'links': content.links,
+            'paragraphs': content.paragraphs,
+            'images': content.images
+        }
+        return result
     except FileNotFoundError:
         print(f"错误: 文件 {html_file_path} 未找到。")
     except Exception as e:
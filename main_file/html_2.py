@@ -1,31 +1,35 @@
-import requests
-from bs4 import BeautifulSoup
-import spacy
+from main_file.fetch import fetch_pages
+from main_file.nlp_models import get_nlp, NER_COMPONENTS
+from main_file.chunked_ner import chunked_entities
+from main_file.content_rank import rank_sections
 import re
 
 
-# 1. 解析HTML页面
+# 1. 解析HTML页面：通过异步抓取器获取页面（连接复用、超时重试、ETag/Last-Modified 条件请求），
+# 响应体分块送入提取器，去掉导航、页脚等样板内容
 def parse_html(url):
-    try:
-        response = requests.get(url)
-        response.raise_for_status()
-        soup = BeautifulSoup(response.text, 'html.parser')
-        text_content = soup.get_text()
-        return text_content
-    except requests.RequestException as e:
-        print(f"请求出错: {e}")
+    result = fetch_pages([url])[0]
+    if result.error:
+        print(f"请求出错: {result.error}")
         return ""
+    return result.text
+
+
+# 并发抓取多个页面，返回 {url: 正文}；抓取失败的页面不包含在结果中
+def parse_html_pages(urls, **kwargs):
+    results = fetch_pages(urls, **kwargs)
+    return {result.url: result.text for result in results if not result.error}
 
 
 # 2. 使用NER识别品牌名称、热门关键词、流行趋势
 def ner_analysis(text):
-    nlp = spacy.load("en_core_web_sm")
-    doc = nlp(text)
+    nlp = get_nlp("en", components=NER_COMPONENTS)
+    # 分块进行NER（相邻片段有重叠，重叠区域的重复实体会被去掉），超过spacy max_length的长文档也能处理
     brand_names = []
     keywords = []
-    for ent in doc.ents:
-        if ent.label_ in ["ORG", "PRODUCT"]:
-            brand_names.append(ent.text)
+    for ent_text, label, _, _ in chunked_entities(text, nlp):
+        if label in ["ORG", "PRODUCT"]:
+            brand_names.append(ent_text)
     # 简单提取高频词作为热门关键词（实际可优化）
     words = re.findall(r'\w+', text.lower())
     word_counts = {}
@@ -39,15 +43,8 @@ def ner_analysis(text):
 
 # 3. 结合搜索引擎排序算法，筛选最具影响力的营销内容
 # 这里简单以文本长度和关键词出现次数作为排序依据
-def sort_marketing_content(html_content, keywords):
-    sections = re.split(r'\n+|\s{2,}', html_content.strip())
-    content_scores = []
-    for section in sections:
-        keyword_count = sum([section.count(keyword) for keyword in keywords])
-        score = len(section) + keyword_count
-        content_scores.append((section, score))
-    sorted_content = sorted(content_scores, key=lambda item: item[1], reverse=True)
-    return [c[0] for c in sorted_content]
+def sort_marketing_content(html_content, keywords, top_k=None):
+    return rank_sections(html_content, keywords, top_k)
 
 
 if __name__ == "__main__":
@@ -57,7 +54,7 @@ if __name__ == "__main__":
         brand_names, keywords = ner_analysis(html_text)
         print("识别到的品牌名称:", brand_names)
         print("识别到的热门关键词:", keywords)
-        sorted_marketing = sort_marketing_content(html_text, keywords)
+        sorted_marketing = sort_marketing_content(html_text, keywords, top_k=5)
         print("最具影响力的营销内容:")
         for content in sorted_marketing[:5]:
             print(content)
@@ -0,0 +1,232 @@
+import logging
+from collections import namedtuple
+from html.parser import HTMLParser
+from main_file.boilerplate import BOILERPLATE_TAGS, Block, strip_boilerplate
+
+# 流式读取HTML文件时每次送入解析器的字符数
+READ_SIZE = 1024 * 1024
+
+# 内容不可见的元素，其中的文本不计入正文
+SKIP_TAGS = frozenset(['script', 'style', 'noscript', 'template'])
+# 块级元素：开始和结束处插入换行，避免相邻块的文字粘连
+BLOCK_TAGS = frozenset([
+    'p', 'div', 'br', 'li', 'ul', 'ol', 'tr', 'table', 'section', 'article', 'header', 'footer', 'nav', 'aside',
+    'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'blockquote', 'pre', 'title', 'dd', 'dt', 'figcaption', 'form', 'menu',
+])
+
+# 一次遍历提取的结果；text_only 模式下只有 text 有值。
+# main_content 模式下 text 只包含正文块，stats 为 ContentStats（去除了多少样板字符），否则为 None
+HtmlContent = namedtuple('HtmlContent', ['title', 'links', 'paragraphs', 'images', 'text', 'stats'], defaults=(None,))
+
+
+class _Collector:
+    """
+    事件驱动的提取器：同时供 lxml 的 target 接口和 html.parser 使用，不构建文档树
+    """
+
+    def __init__(self, text_only=False, main_content=False):
+        self.text_only = text_only
+        self.main_content = main_content
+        self.pieces = []
+        self.blocks = []
+        self.title = None
+        self.links = []
+        self.images = []
+        self.paragraphs = []
+        self._title_parts = None
+        self._paragraph = None
+        self._skip_depth = 0
+        self._link_depth = 0
+        self._boilerplate_depth = 0
+        self._block = []
+        self._block_link_chars = 0
+
+    def _boundary(self, tag, opening):
+        # 块级元素的边界：插入换行；正文模式下结束当前文本块并记录是否进入/离开样板元素
+        self.pieces.append('\n')
+        if not self.main_content:
+            return
+        self._flush_block()
+        if tag in BOILERPLATE_TAGS:
+            self._boilerplate_depth = self._boilerplate_depth + 1 if opening else max(0, self._boilerplate_depth - 1)
+
+    def _flush_block(self):
+        text = " ".join("".join(self._block).split())
+        if text:
+            self.blocks.append(Block(text, min(self._block_link_chars, len(text)), self._boilerplate_depth > 0))
+        self._block = []
+        self._block_link_chars = 0
+
+    def start(self, tag, attrs):
+        tag = tag.lower()
+        if tag in SKIP_TAGS:
+            self._skip_depth += 1
+            return
+        if tag in BLOCK_TAGS:
+            self._boundary(tag, True)
+        if tag == 'a':
+            self._link_depth += 1
+        if self.text_only:
+            return
+        if tag == 'a':
+            href = attrs.get('href')
+            if href:
+                self.links.append(href)
+        elif tag == 'img':
+            src = attrs.get('src')
+            if src:
+                self.images.append(src)
+        elif tag == 'p':
+            # html.parser 不会自动闭合段落，新的 <p> 开始时先结束上一个
+            self._end_paragraph()
+            self._paragraph = []
+        elif tag == 'title' and self.title is None:
+            self._title_parts = []
+
+    def end(self, tag):
+        tag = tag.lower()
+        if tag in SKIP_TAGS:
+            self._skip_depth = max(0, self._skip_depth - 1)
+            return
+        if tag in BLOCK_TAGS:
+            self._boundary(tag, False)
+        if tag == 'a':
+            self._link_depth = max(0, self._link_depth - 1)
+        if self.text_only:
+            return
+        if tag == 'p':
+            self._end_paragraph()
+        elif tag == 'title' and self._title_parts is not None:
+            self.title = "".join(self._title_parts)
+            self._title_parts = None
+
+    def data(self, text):
+        if self._skip_depth:
+            return
+        self.pieces.append(text)
+        if self.main_content:
+            self._block.append(text)
+            if self._link_depth:
+                self._block_link_chars += len(" ".join(text.split()))
+        if self.text_only:
+            return
+        if self._paragraph is not None:
+            self._paragraph.append(text)
+        if self._title_parts is not None:
+            self._title_parts.append(text)
+
+    def _end_paragraph(self):
+        if self._paragraph is not None:
+            self.paragraphs.append("".join(self._paragraph))
+            self._paragraph = None
+
+    def close(self):
+        self._end_paragraph()
+        if self._title_parts is not None:
+            self.title = "".join(self._title_parts)
+            self._title_parts = None
+        text = "".join(self.pieces)
+        stats = None
+        if self.main_content:
+            self._flush_block()
+            text, stats = strip_boilerplate(self.blocks)
+        if self.text_only:
+            return HtmlContent(None, [], [], [], text, stats)
+        return HtmlContent(self.title, self.links, self.paragraphs, self.images, text, stats)
+
+
+class _StdlibParser(HTMLParser):
+    # html.parser 后备实现：把回调转发给 _Collector
+    def __init__(self, collector):
+        super().__init__(convert_charrefs=True)
+        self.collector = collector
+
+    def handle_starttag(self, tag, attrs):
+        self.collector.start(tag, dict(attrs))
+
+    def handle_endtag(self, tag):
+        self.collector.end(tag)
+
+    def handle_data(self, data):
+        self.collector.data(data)
+
+
+def available_backend():
+    """
+    返回默认使用的解析后端：安装了 lxml 时为 'lxml'，否则为 'html.parser'
+    """
+    try:
+        import lxml.etree  # noqa: F401
+        return 'lxml'
+    except ImportError:
+        return 'html.parser'
+
+
+class HtmlExtractor:
+    """
+    单次流式遍历HTML，同时提取标题、链接、段落、图片和可见文本。
+    可以多次调用 feed() 分块送入内容，最后调用 close() 得到 HtmlContent。
+    text_only 为 True 时只收集可见文本；main_content 为 True 时按文本密度和链接密度去掉导航、页脚等样板块，
+    text 只保留正文。
+    """
+
+    def __init__(self, text_only=False, backend=None, main_content=False):
+        self.backend = backend or available_backend()
+        self._collector = _Collector(text_only, main_content)
+        if self.backend == 'lxml':
+            from lxml import etree
+            self._parser = etree.HTMLParser(target=self._collector)
+            self._errors = (etree.XMLSyntaxError,)
+        elif self.backend == 'html.parser':
+            self._parser = _StdlibParser(self._collector)
+            self._errors = ()
+        else:
+            raise ValueError(f"未知的HTML解析后端: {self.backend}")
+
+    def feed(self, data):
+        self._parser.feed(data)
+
+    def close(self):
+        if self.backend == 'html.parser':
+            self._parser.close()
+            return self._collector.close()
+        try:
+            return self._parser.close()
+        except self._errors as e:
+            # 空文档等情况下 lxml 会报错，已收集的内容仍然有效
+            logging.debug(f"lxml 结束解析时出错: {e}")
+            return self._collector.close()
+
+
+def extract_html(html, text_only=False, backend=None, main_content=False):
+    """
+    从HTML字符串中一次性提取 HtmlContent
+    """
+    extractor = HtmlExtractor(text_only, backend, main_content)
+    extractor.feed(html)
+    return extractor.close()
+
+
+def extract_html_file(file_path, text_only=False, backend=None, encoding='utf-8', main_content=False):
+    """
+    分块读取HTML文件并提取 HtmlContent，不需要先把整个文件读入内存
+    """
+    extractor = HtmlExtractor(text_only, backend, main_content)
+    with open(file_path, 'r', encoding=encoding) as file:
+        for block in iter(lambda: file.read(READ_SIZE), ''):
+            extractor.feed(block)
+    return extractor.close()
+
+
+def html_to_text(html, backend=None, main_content=False):
+    """
+    纯文本模式：只提取可见文本；main_content 为 True 时只保留正文
+    """
+    return extract_html(html, text_only=True, backend=backend, main_content=main_content).text
+
+
+def log_content_stats(stats, source):
+    # 报告去除样板内容后减少的字符数
+    if stats is not None and stats.total_chars:
+        logging.info(f"{source}: 去除样板内容 {stats.removed_chars}/{stats.total_chars} 个字符 "
+                     f"({stats.removed_chars / stats.total_chars:.0%})")
@@ -0,0 +1,320 @@
+import json
+import time
+import logging
+import threading
+from functools import wraps
+from collections import deque
+
+# 内存中最多保留的事件数，超出后丢弃最早的事件（汇总统计不受影响）
+MAX_EVENTS = 100000
+# Prometheus 指标名前缀
+METRIC_PREFIX = 'analyze'
+
+
+class _NoopSpan:
+    # 未启用埋点时 span() 返回的共享对象，所有操作都是空操作
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def set(self, **fields):
+        pass
+
+
+_NOOP = _NoopSpan()
+
+
+class Recorder:
+    """
+    收集埋点数据：每个 span 的事件（可流式写入 JSON Lines 文件）、按 span 名称汇总的次数/耗时/字符数，
+    以及按 (名称, 标签) 累加的计数器。线程安全
+    """
+
+    def __init__(self, jsonl_path=None, max_events=MAX_EVENTS):
+        # 只保留最近的 max_events 个事件，旧事件自动丢弃
+        self.events = deque(maxlen=max_events)
+        self.max_events = max_events
+        self.spans = {}
+        self.counters = {}
+        self._lock = threading.Lock()
+        # 行缓冲：每个事件立即写出，fork 出的工作进程不会继承未写出的数据
+        self._jsonl = open(jsonl_path, 'a', encoding='utf-8', buffering=1) if jsonl_path else None
+
+    def record(self, event):
+        with self._lock:
+            if event['type'] == 'span':
+                total = self.spans.setdefault(event['name'], {
+                    'count': 0, 'errors': 0, 'wall': 0.0, 'cpu': 0.0, 'max_wall': 0.0, 'chars_in': 0, 'chars_out': 0,
+                })
+                total['count'] += 1
+                total['errors'] += 1 if event.get('error') else 0
+                total['wall'] += event['wall']
+                total['cpu'] += event['cpu']
+                total['max_wall'] = max(total['max_wall'], event['wall'])
+                total['chars_in'] += event.get('chars_in') or 0
+                total['chars_out'] += event.get('chars_out') or 0
+            self.events.append(event)
+            if self._jsonl is not None:
+                self._jsonl.write(json.dumps(event, ensure_ascii=False) + "\n")
+
+    def count(self, name, value=1, labels=None):
+        key = (name, tuple(sorted((labels or {}).items())))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def drain(self):
+        """
+        取出并清空目前记录的事件和计数器，返回可以 pickle 的 (事件列表, 计数器)；用于把工作进程的测量结果传回父进程
+        """
+        with self._lock:
+            events, counters = list(self.events), dict(self.counters)
+            self.events.clear()
+            self.counters.clear()
+            self.spans.clear()
+        return events, counters
+
+    def merge(self, drained):
+        # 并入 drain() 的结果：事件逐个记录（同时更新汇总和流式输出），计数器累加
+        events, counters = drained
+        for event in events:
+            self.record(event)
+        with self._lock:
+            for key, value in counters.items():
+                self.counters[key] = self.counters.get(key, 0) + value
+
+    def close(self):
+        with self._lock:
+            if self._jsonl is not None:
+                self._jsonl.close()
+                self._jsonl = None
+
+
+class Span:
+    """
+    计时区间：记录墙钟时间和进程CPU时间；可以用 set() 附加 chars_in、chars_out 等字段，
+    区间内抛出的异常会记录在事件的 error 字段中并继续向外抛出
+    """
+
+    def __init__(self, recorder, name, labels):
+        self.recorder = recorder
+        self.name = name
+        self.fields = dict(labels)
+
+    def set(self, **fields):
+        self.fields.update(fields)
+
+    def __enter__(self):
+        self._wall = time.perf_counter()
+        self._cpu = time.process_time()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        event = {
+            'type': 'span',
+            'name': self.name,
+            'ts': time.time(),
+            'wall': round(time.perf_counter() - self._wall, 6),
+            'cpu': round(time.process_time() - self._cpu, 6),
+        }
+        event.update(self.fields)
+        if exc_type is not None:
+            event['error'] = exc_type.__name__
+        self.recorder.record(event)
+        return False
+
+
+_recorder = None
+
+
+def enable(jsonl_path=None):
+    """
+    启用埋点并返回新的 Recorder；jsonl_path 不为空时每个事件立即追加写入该文件
+    """
+    global _recorder
+    disable()
+    _recorder = Recorder(jsonl_path)
+    return _recorder
+
+
+def disable():
+    global _recorder
+    if _recorder is not None:
+        _recorder.close()
+    _recorder = None
+
+
+def enabled():
+    return _recorder is not None
+
+
+def init_worker(enable_recording):
+    """
+    工作进程的初始化函数：不沿用从父进程继承的 Recorder（及其输出文件），需要时启用新的 Recorder；
+    工作进程中的测量结果用 drain() 取出，随任务结果传回父进程后用 merge() 并入
+    """
+    global _recorder
+    _recorder = Recorder() if enable_recording else None
+
+
+def drain():
+    return _recorder.drain() if _recorder is not None else None
+
+
+def merge(drained):
+    if _recorder is not None and drained:
+        _recorder.merge(drained)
+
+
+def get_recorder():
+    return _recorder
+
+
+def span(name, **labels):
+    """
+    用法：with span('parse_pdf', path=file_path) as s: ...; s.set(chars_out=len(text))。
+    未启用时返回共享的空操作对象
+    """
+    if _recorder is None:
+        return _NOOP
+    return Span(_recorder, name, labels)
+
+
+def count(name, value=1, **labels):
+    """
+    累加计数器（如缓存命中、模型加载次数）；未启用时不做任何事
+    """
+    if _recorder is not None:
+        _recorder.count(name, value, labels)
+
+
+def _output_fields(value):
+    # 返回字符串时记录输出字符数；ner_analysis 等返回列表（或列表的元组）时记录元素个数
+    if isinstance(value, str):
+        return {'chars_out': len(value)}
+    if isinstance(value, list):
+        return {'items_out': len(value)}
+    if type(value) is tuple and all(isinstance(item, list) for item in value):
+        return {'items_out': sum(len(item) for item in value)}
+    return {}
+
+
+def instrumented(name):
+    """
+    装饰器：把函数调用包在名为 name 的 span 中。第一个参数是文本时记录 chars_in，
+    是文件路径时记录 path；返回值为字符串时记录 chars_out，为列表时记录 items_out。未启用时只多一次全局变量判断
+    """
+    def decorate(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if _recorder is None:
+                return func(*args, **kwargs)
+            labels = {}
+            if args and isinstance(args[0], str):
+                if name.startswith('parse_'):
+                    labels['path'] = args[0]
+                else:
+                    labels['chars_in'] = len(args[0])
+            with Span(_recorder, name, labels) as current:
+                result = func(*args, **kwargs)
+                current.set(**_output_fields(result))
+            return result
+        return wrapper
+    return decorate
+
+
+def _escape_label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{key}="{_escape_label(value)}"' for key, value in labels) + '}'
+
+
+def prometheus_text(recorder=None):
+    """
+    以 Prometheus 文本格式导出各 span 的次数、耗时、字符数以及全部计数器
+    """
+    recorder = recorder or _recorder
+    lines = []
+    metrics = [
+        ('span_count', 'count', 'counter', "span 调用次数"),
+        ('span_errors', 'errors', 'counter', "抛出异常的 span 次数"),
+        ('span_wall_seconds', 'wall', 'counter', "span 累计墙钟时间（秒）"),
+        ('span_cpu_seconds', 'cpu', 'counter', "span 累计进程CPU时间（秒）"),
+        ('span_max_wall_seconds', 'max_wall', 'gauge', "单次 span 的最长墙钟时间（秒）"),
+        ('span_chars_in', 'chars_in', 'counter', "输入字符数"),
+        ('span_chars_out', 'chars_out', 'counter', "输出字符数"),
+    ]
+    with recorder._lock:
+        spans = {name: dict(total) for name, total in recorder.spans.items()}
+        counters = dict(recorder.counters)
+    for metric, field, kind, help_text in metrics:
+        full_name = f"{METRIC_PREFIX}_{metric}" + ('_total' if kind == 'counter' else '')
+        lines.append(f"# HELP {full_name} {help_text}")
+        lines.append(f"# TYPE {full_name} {kind}")
+        for name in sorted(spans):
+            lines.append(f"{full_name}{_format_labels([('stage', name)])} {spans[name][field]}")
+    for counter_name in sorted({name for name, _ in counters}):
+        full_name = f"{METRIC_PREFIX}_{counter_name}_total"
+        lines.append(f"# TYPE {full_name} counter")
+        for (name, labels), value in sorted(counters.items()):
+            if name == counter_name:
+                lines.append(f"{full_name}{_format_labels(labels)} {value}")
+    return "\n".join(lines) + "\n"
+
+
+def summary_table(recorder=None):
+    """
+    运行结束时的汇总表：每个 span 的次数、总耗时、CPU时间、平均耗时、最长耗时和字符数，按总耗时降序
+    """
+    recorder = recorder or _recorder
+    with recorder._lock:
+        spans = sorted(recorder.spans.items(), key=lambda item: item[1]['wall'], reverse=True)
+        counters = sorted(recorder.counters.items())
+    header = f"{'阶段':<24}{'次数':>8}{'总耗时(s)':>12}{'CPU(s)':>10}{'平均(ms)':>10}{'最长(ms)':>10}{'输入字符':>12}{'输出字符':>12}"
+    lines = [header]
+    for name, total in spans:
+        average = total['wall'] / total['count'] * 1000 if total['count'] else 0.0
+        lines.append(f"{name:<24}{total['count']:>8}{total['wall']:>12.3f}{total['cpu']:>10.3f}{average:>10.1f}"
+                     f"{total['max_wall'] * 1000:>10.1f}{total['chars_in']:>12}{total['chars_out']:>12}")
+    for (name, labels), value in counters:
+        label_text = ",".join(f"{key}={label}" for key, label in labels)
+        lines.append(f"{name}{'[' + label_text + ']' if label_text else ''}: {value}")
+    return "\n".join(lines)
+
+
+def write_jsonl(path, recorder=None):
+    recorder = recorder or _recorder
+    with recorder._lock:
+        events = list(recorder.events)
+    with open(path, 'w', encoding='utf-8') as file:
+        for event in events:
+            file.write(json.dumps(event, ensure_ascii=False) + "\n")
+
+
+def write_prometheus(path, recorder=None):
+    with open(path, 'w', encoding='utf-8') as file:
+        file.write(prometheus_text(recorder))
+
+
+def export(path, recorder=None):
+    """
+    按扩展名导出：.jsonl 为事件流，.prom / .txt 为 Prometheus 文本格式
+    """
+    if path.lower().endswith('.jsonl'):
+        write_jsonl(path, recorder)
+    elif path.lower().endswith(('.prom', '.txt')):
+        write_prometheus(path, recorder)
+    else:
+        raise ValueError(f"不支持的指标导出格式: {path}（支持 .jsonl、.prom）")
+
+
+def log_summary(recorder=None):
+    recorder = recorder or _recorder
+    if recorder is not None:
+        logging.info("埋点汇总:\n" + summary_table(recorder))
+
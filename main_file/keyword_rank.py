@@ -0,0 +1,146 @@
+import re
+from collections import namedtuple
+from main_file import instrument
+
+# 共现窗口大小（窗口内的词两两相连）、返回的关键词数量以及 PageRank 参数
+DEFAULT_WINDOW = 4
+DEFAULT_TOP_N = 20
+DAMPING = 0.85
+MAX_ITER = 100
+TOLERANCE = 1e-6
+# 增量构建共现图时，累积这么多条未合并的边后合并一次稀疏矩阵
+MERGE_EDGES = 1_000_000
+
+_WORD = re.compile(r'\w+')
+
+Keyword = namedtuple('Keyword', ['word', 'score'])
+
+
+def tokenize(text, lang='en', stopwords=()):
+    """
+    把文本切分为候选词：中文使用 jieba 分词，其他语言按 \\w+ 切分并转为小写；
+    去掉停用词、纯数字以及非中文的单字符词
+    """
+    if lang == 'zh':
+        import jieba
+        words = (word.strip() for word in jieba.lcut(text))
+        words = (word for word in words if _WORD.fullmatch(word))
+    else:
+        words = (word for word in _WORD.findall(text.lower()) if len(word) > 1)
+    return [word for word in words if word not in stopwords and not word.isdigit()]
+
+
+class KeywordGraph:
+    """
+    增量构建的词共现图：逐段调用 add(text) 加入文本，最后调用 rank() 做一次 PageRank 排序。
+    共现窗口不跨越两次 add 的边界；内存取决于词表大小和不同边的数量，而不是文本长度
+    """
+
+    def __init__(self, lang='en', stopwords=(), window=DEFAULT_WINDOW):
+        self.lang = lang
+        self.stopwords = stopwords
+        self.window = window
+        self.vocabulary = {}
+        self._rows = []
+        self._cols = []
+        self._pending = 0
+        self._matrix = None
+
+    def add(self, text):
+        self.add_tokens(tokenize(text, self.lang, self.stopwords))
+
+    def add_tokens(self, tokens):
+        import numpy as np
+        vocabulary = self.vocabulary
+        ids = np.fromiter((vocabulary.setdefault(token, len(vocabulary)) for token in tokens),
+                          dtype=np.int64, count=len(tokens))
+        for offset in range(1, self.window):
+            left, right = ids[:-offset], ids[offset:]
+            distinct = left != right
+            self._rows.append(left[distinct])
+            self._cols.append(right[distinct])
+            self._pending += int(distinct.sum())
+        if self._pending >= MERGE_EDGES:
+            self._merge()
+
+    def _merge(self):
+        import numpy as np
+        from scipy import sparse
+        size = len(self.vocabulary)
+        rows = np.concatenate(self._rows) if self._rows else np.empty(0, dtype=np.int64)
+        cols = np.concatenate(self._cols) if self._cols else np.empty(0, dtype=np.int64)
+        weights = np.ones(len(rows), dtype=np.float64)
+        # coo 转 csr 时会合并重复的边；词表增长后把已合并的矩阵扩大到新的大小再相加
+        matrix = sparse.coo_matrix((weights, (rows, cols)), shape=(size, size)).tocsr()
+        if self._matrix is not None:
+            self._matrix.resize((size, size))
+            matrix = matrix + self._matrix
+        self._matrix = matrix
+        self._rows, self._cols, self._pending = [], [], 0
+
+    def matrix(self):
+        """
+        返回 (词表, 对称的 scipy.sparse CSR 矩阵)
+        """
+        self._merge()
+        return list(self.vocabulary), (self._matrix + self._matrix.T).tocsr()
+
+    def rank(self, top_n=DEFAULT_TOP_N):
+        """
+        返回按得分从高到低的 Keyword(word, score) 列表
+        """
+        import numpy as np
+        if not self.vocabulary:
+            return []
+        vocabulary, matrix = self.matrix()
+        scores = pagerank(matrix)
+        top_n = min(top_n, len(vocabulary))
+        # argpartition 先选出前 top_n 个，再只对它们排序；得分相同时按词首次出现的顺序
+        candidates = np.argpartition(-scores, top_n - 1)[:top_n]
+        order = sorted(candidates, key=lambda index: (-scores[index], index))
+        return [Keyword(vocabulary[index], float(scores[index])) for index in order]
+
+
+def cooccurrence_matrix(tokens, window=DEFAULT_WINDOW):
+    """
+    构建词共现矩阵：在长度为 window 的滑动窗口内出现的两个不同词之间的边权加一。
+    返回 (词表, 对称的 scipy.sparse CSR 矩阵)，复杂度与词数成线性关系
+    """
+    graph = KeywordGraph(window=window)
+    graph.add_tokens(tokens)
+    return graph.matrix()
+
+
+def pagerank(matrix, damping=DAMPING, max_iter=MAX_ITER, tol=TOLERANCE):
+    """
+    对加权邻接矩阵做 PageRank 幂迭代，返回每个节点的得分（总和为1）。
+    没有边的节点把得分均匀分给所有节点
+    """
+    import numpy as np
+    from scipy import sparse
+    size = matrix.shape[0]
+    if size == 0:
+        return np.empty(0)
+    out_weight = np.asarray(matrix.sum(axis=1)).ravel()
+    dangling = out_weight == 0
+    inverse = np.divide(1.0, out_weight, out=np.zeros_like(out_weight), where=~dangling)
+    # 按行归一化后转置：transition @ scores 即为每个节点从邻居获得的得分
+    transition = (sparse.diags(inverse) @ matrix).T.tocsr()
+    scores = np.full(size, 1.0 / size)
+    for _ in range(max_iter):
+        leaked = scores[dangling].sum()
+        updated = damping * (transition @ scores + leaked / size) + (1.0 - damping) / size
+        if np.abs(updated - scores).sum() < tol:
+            return updated
+        scores = updated
+    return scores
+
+
+@instrument.instrumented('rank_keywords')
+def rank_keywords(text, lang='en', stopwords=(), top_n=DEFAULT_TOP_N, window=DEFAULT_WINDOW):
+    """
+    基于词共现图和 PageRank 的关键词排序，返回按得分从高到低的 Keyword(word, score) 列表
+    """
+    graph = KeywordGraph(lang, stopwords, window)
+    graph.add(text)
+    return graph.rank(top_n)
@@ -0,0 +1,67 @@
+import logging
+from main_file import instrument
+from collections import namedtuple
+
+# 语言检测结果：规范化后的语言代码和置信度
+LanguageResult = namedtuple('LanguageResult', ['lang', 'confidence'])
+
+# 默认从全文中均匀抽取的片段数量和每个片段的字符数
+DEFAULT_SAMPLE_CHUNKS = 8
+DEFAULT_CHUNK_SIZE = 500
+DEFAULT_SEED = 0
+# 无法检测时回退的语言
+FALLBACK_LANG = 'en'
+
+
+def normalize_lang(code):
+    """
+    规范化langdetect返回的语言代码，例如 'zh-cn'、'zh-tw' 统一为 'zh'
+    """
+    return code.lower().split('-')[0]
+
+
+def sample_text(text, n_chunks=DEFAULT_SAMPLE_CHUNKS, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    从整篇文本中均匀抽取 n_chunks 个长度为 chunk_size 的片段，文本较短时直接返回原文
+    """
+    if n_chunks <= 0 or len(text) <= n_chunks * chunk_size:
+        return text
+    step = (len(text) - chunk_size) / max(n_chunks - 1, 1)
+    chunks = []
+    for i in range(n_chunks):
+        start = int(i * step)
+        chunks.append(text[start:start + chunk_size])
+    return "\n".join(chunks)
+
+
+@instrument.instrumented('detect_language')
+def detect_language(text, n_chunks=DEFAULT_SAMPLE_CHUNKS, chunk_size=DEFAULT_CHUNK_SIZE, seed=DEFAULT_SEED):
+    """
+    对文本的有限样本做一次确定性的语言检测，返回 LanguageResult
+    """
+    # 首次检测时才导入 langdetect（加载语言画像需要一定时间）
+    from langdetect import DetectorFactory, detect_langs
+    from langdetect.lang_detect_exception import LangDetectException
+    # 固定随机种子，保证同一文本的检测结果可重复
+    DetectorFactory.seed = seed
+    try:
+        candidates = detect_langs(sample_text(text, n_chunks, chunk_size))
+    except LangDetectException as e:
+        logging.warning(f"语言检测失败，使用默认语言 {FALLBACK_LANG}: {e}")
+        return LanguageResult(FALLBACK_LANG, 0.0)
+    # 合并规范化后相同的语言（如 zh-cn 和 zh-tw）的概率
+    scores = {}
+    for candidate in candidates:
+        lang = normalize_lang(candidate.lang)
+        scores[lang] = scores.get(lang, 0.0) + candidate.prob
+    lang = max(scores, key=scores.get)
+    return LanguageResult(lang, scores[lang])
+
+
+def as_language(language):
+    """
+    把语言代码字符串或 LanguageResult 统一转换为 LanguageResult
+    """
+    if isinstance(language, LanguageResult):
+        return language
+    return LanguageResult(normalize_lang(language), 1.0)
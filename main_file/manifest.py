@@ -0,0 +1,176 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+from collections import namedtuple
+from main_file.text_cache import PARSER_VERSION, file_digest
+from main_file.result_cache import ANALYSIS_VERSION
+from main_file.nlp_models import model_name_for, model_version
+
+# 状态目录中的清单文件名和结果目录名
+MANIFEST_NAME = 'manifest.sqlite'
+RESULTS_DIR = 'results'
+# 修改时间在最近这么多秒内的文件视为仍在写入，本轮不处理
+SETTLE_SECONDS = 2.0
+
+# 清单中的一条记录：文件的大小、修改时间（纳秒）和内容哈希，处理时的解析器、分析和模型版本，结果文件位置
+ManifestEntry = namedtuple('ManifestEntry', ['path', 'size', 'mtime_ns', 'digest', 'parser_version',
+                                             'analysis_version', 'lang', 'model', 'output', 'status', 'error',
+                                             'updated'])
+# 待处理文件的快照（规划时读取的 stat 和内容哈希，处理完成后原样写入清单）
+FileState = namedtuple('FileState', ['path', 'size', 'mtime_ns', 'digest'])
+# 一轮增量处理的规划：需要处理的文件、未变化的文件、内容未变只需更新 stat 的文件、已删除的文件、仍在写入的文件
+Plan = namedtuple('Plan', ['process', 'unchanged', 'touched', 'deleted', 'pending'])
+
+
+def current_model(lang):
+    # 语言对应的模型名和版本，例如 'en_core_web_sm@3.7.1'
+    name = model_name_for(lang)
+    return f"{name}@{model_version(name)}"
+
+
+class Manifest:
+    """
+    增量处理的清单：保存在状态目录下的 SQLite 文件中，每个已处理的文件一行；
+    每篇文档的结果写入 results/ 下单独的JSON文件。每条记录写入后立即提交，
+    因此中断的运行重新启动时会从最后一个已提交的文档之后继续
+    """
+
+    def __init__(self, state_dir):
+        self.state_dir = state_dir
+        self.results_dir = os.path.join(state_dir, RESULTS_DIR)
+        os.makedirs(self.results_dir, exist_ok=True)
+        self.path = os.path.join(state_dir, MANIFEST_NAME)
+        self._conn = sqlite3.connect(self.path, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS files ("
+                           "path TEXT PRIMARY KEY, size INTEGER NOT NULL, mtime_ns INTEGER NOT NULL, "
+                           "digest TEXT NOT NULL, parser_version INTEGER NOT NULL, analysis_version INTEGER NOT NULL, "
+                           "lang TEXT, model TEXT, output TEXT NOT NULL, status TEXT NOT NULL, error TEXT, "
+                           "updated REAL NOT NULL)")
+
+    def close(self):
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def entries(self):
+        """
+        返回 {路径: ManifestEntry}
+        """
+        rows = self._conn.execute(f"SELECT {', '.join(ManifestEntry._fields)} FROM files")
+        return {row[0]: ManifestEntry(*row) for row in rows}
+
+    def output_path(self, path):
+        # 按路径哈希分两级目录保存结果文件，避免单个目录中文件过多
+        name = hashlib.sha1(path.encode('utf-8')).hexdigest()
+        return os.path.join(self.results_dir, name[:2], name + '.json')
+
+    def record(self, state, record):
+        """
+        写入一篇文档的结果（先写临时文件再改名）并更新清单；record 含 error 时记为失败
+        """
+        output = self.output_path(state.path)
+        os.makedirs(os.path.dirname(output), exist_ok=True)
+        temp = output + '.tmp'
+        with open(temp, 'w', encoding='utf-8') as file:
+            json.dump(record, file, ensure_ascii=False)
+        os.replace(temp, output)
+        lang = record.get('lang')
+        with self._conn:
+            self._conn.execute("INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", (
+                state.path, state.size, state.mtime_ns, state.digest, PARSER_VERSION, ANALYSIS_VERSION, lang,
+                current_model(lang) if lang else None, output, 'error' if 'error' in record else 'ok',
+                record.get('error'), time.time()))
+
+    def touch(self, state):
+        # 文件的修改时间变了但内容没变：只更新 stat，不重新分析
+        with self._conn:
+            self._conn.execute("UPDATE files SET size = ?, mtime_ns = ?, updated = ? WHERE path = ?",
+                               (state.size, state.mtime_ns, time.time(), state.path))
+
+    def remove(self, path):
+        """
+        删除已不存在的文件在清单中的记录及其结果文件
+        """
+        row = self._conn.execute("SELECT output FROM files WHERE path = ?", (path,)).fetchone()
+        if row is not None:
+            try:
+                os.remove(row[0])
+            except FileNotFoundError:
+                pass
+        with self._conn:
+            self._conn.execute("DELETE FROM files WHERE path = ?", (path,))
+
+    def iter_records(self):
+        """
+        按路径顺序产出所有文档的结果记录
+        """
+        for path, output in self._conn.execute("SELECT path, output FROM files ORDER BY path").fetchall():
+            try:
+                with open(output, 'r', encoding='utf-8') as file:
+                    yield json.load(file)
+            except (OSError, ValueError) as e:
+                logging.warning(f"读取 {path} 的结果失败: {e}")
+
+    def export(self, output_path):
+        """
+        把当前全部结果写成一个JSON Lines文件，返回记录数
+        """
+        count = 0
+        with open(output_path, 'w', encoding='utf-8') as out:
+            for record in self.iter_records():
+                out.write(json.dumps(record, ensure_ascii=False) + "\n")
+                count += 1
+        return count
+
+
+def _up_to_date(entry, models):
+    # 解析器、分析逻辑或该语言的模型升级后，已有结果失效
+    if entry.parser_version != PARSER_VERSION or entry.analysis_version != ANALYSIS_VERSION:
+        return False
+    if entry.lang is None:
+        return True
+    if entry.lang not in models:
+        models[entry.lang] = current_model(entry.lang)
+    return entry.model == models[entry.lang]
+
+
+def plan_changes(manifest, paths, retry_errors=False, settle=SETTLE_SECONDS, now=None):
+    """
+    对比当前文件和清单，决定本轮需要处理哪些文件。大小和修改时间都没变的文件只需一次 stat；
+    stat 变化时再计算内容哈希，内容没变的文件只更新 stat。清单中有而 paths 中没有的文件视为已删除。
+    失败过的文件在内容变化或 retry_errors 为 True 时才重试
+    """
+    entries = manifest.entries()
+    now = time.time() if now is None else now
+    models = {}
+    process, unchanged, touched, pending = [], [], [], []
+    seen = set()
+    for path in paths:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        seen.add(path)
+        if now - stat.st_mtime < settle:
+            pending.append(path)
+            continue
+        entry = entries.get(path)
+        reusable = entry is not None and _up_to_date(entry, models) and not (retry_errors and entry.status == 'error')
+        if reusable and entry.size == stat.st_size and entry.mtime_ns == stat.st_mtime_ns:
+            unchanged.append(path)
+            continue
+        state = FileState(path, stat.st_size, stat.st_mtime_ns, file_digest(path))
+        if reusable and entry.digest == state.digest:
+            touched.append(state)
+        else:
+            process.append(state)
+    deleted = sorted(path for path in entries if path not in seen)
+    return Plan(process, unchanged, touched, deleted, pending)
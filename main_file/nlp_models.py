@@ -0,0 +1,235 @@
+import os
+import glob
+import logging
+import threading
+from functools import lru_cache
+from collections import OrderedDict
+from main_file import instrument
+
+# 各语言默认使用的spacy模型
+MODEL_NAMES = {
+    'zh': 'zh_core_web_sm',
+    'ru': 'ru_core_news_sm',
+    'en': 'en_core_web_sm'
+}
+
+# 默认的模型内存上限（MB），可通过环境变量 ANALYZE_MODEL_MEMORY_MB 覆盖
+DEFAULT_MEMORY_MB = 2048
+
+# 各类分析需要的spacy组件；模型中不存在的组件会被忽略，组件依赖的 tok2vec 等上游组件会自动补上
+NER_COMPONENTS = ('ner',)
+SYNTAX_COMPONENTS = ('tagger', 'morphologizer', 'parser', 'attribute_ruler')
+LEMMA_COMPONENTS = ('tagger', 'morphologizer', 'attribute_ruler', 'lemmatizer')
+
+
+def model_name_for(lang):
+    """
+    返回语言对应的spacy模型名称，未知语言回退到英文模型
+    """
+    return MODEL_NAMES.get(lang, MODEL_NAMES['en'])
+
+
+def merge_components(*profiles):
+    """
+    合并多个组件需求，例如 merge_components(NER_COMPONENTS, SYNTAX_COMPONENTS)
+    """
+    merged = []
+    for profile in profiles:
+        for name in profile:
+            if name not in merged:
+                merged.append(name)
+    return tuple(merged)
+
+
+@lru_cache(maxsize=None)
+def _pipeline_config(model_name):
+    # 只读取模型的 config.cfg（不加载权重），找不到时返回 None
+    import spacy
+    if os.path.isdir(model_name):
+        candidates = [os.path.join(model_name, 'config.cfg')]
+    elif spacy.util.is_package(model_name):
+        package_path = str(spacy.util.get_package_path(model_name))
+        candidates = [os.path.join(package_path, 'config.cfg')] + glob.glob(os.path.join(package_path, '*', 'config.cfg'))
+    else:
+        return None
+    for candidate in candidates:
+        if os.path.isfile(candidate):
+            return spacy.util.load_config(candidate, interpolate=False)
+    return None
+
+
+@lru_cache(maxsize=None)
+def model_version(model_name):
+    """
+    不加载模型，读取模型的版本号（已安装的包或模型目录下的 meta.json），找不到时返回 'unknown'
+    """
+    import spacy
+    if os.path.isdir(model_name):
+        meta_path = os.path.join(model_name, 'meta.json')
+        if os.path.isfile(meta_path):
+            return str(spacy.util.load_meta(meta_path).get('version', 'unknown'))
+        return 'unknown'
+    return spacy.util.get_package_version(model_name) or 'unknown'
+
+
+def _listener_upstreams(node):
+    # 递归查找组件模型中的 Tok2VecListener / TransformerListener，返回其上游组件名
+    upstreams = set()
+    if isinstance(node, dict):
+        if 'Listener' in str(node.get('@architectures', '')):
+            upstreams.add(node.get('upstream', '*'))
+        for value in node.values():
+            upstreams |= _listener_upstreams(value)
+    return upstreams
+
+
+def resolve_components(model_name, components):
+    """
+    根据模型配置把组件需求解析为实际需要加载的组件（包括监听的上游组件），
+    返回排序后的元组；无法读取配置时按原样返回
+    """
+    if components is None:
+        return None
+    config = _pipeline_config(model_name)
+    if config is None:
+        return tuple(sorted(set(components)))
+    pipeline = list(config['nlp']['pipeline'])
+    needed = set(name for name in components if name in pipeline)
+    for name in list(needed):
+        for upstream in _listener_upstreams(config['components'].get(name, {})):
+            if upstream == '*':
+                needed |= set(p for p in pipeline if p in ('tok2vec', 'transformer'))
+            elif upstream in pipeline:
+                needed.add(upstream)
+    return tuple(sorted(needed))
+
+
+def _default_loader(model_name, components):
+    import spacy
+    if components is None:
+        return spacy.load(model_name)
+    config = _pipeline_config(model_name)
+    if config is None:
+        return spacy.load(model_name, enable=list(components))
+    # 不需要的组件直接排除，不加载其权重，也不参与推理
+    excluded = [name for name in config['nlp']['pipeline'] if name not in components]
+    return spacy.load(model_name, exclude=excluded)
+
+
+def _estimate_model_size(nlp):
+    # 以模型数据目录在磁盘上的大小估算其内存占用
+    path = getattr(nlp, 'path', None)
+    if not path or not os.path.isdir(str(path)):
+        return 0
+    total = 0
+    for root, _, files in os.walk(str(path)):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                pass
+    return total
+
+
+class ModelRegistry:
+    """
+    进程级的spacy模型注册表：按 (模型名, 启用的组件) 懒加载并复用模型，回退到同一模型的多种语言共享一份，
+    超出内存上限时按LRU淘汰最久未使用的模型。线程安全。
+    组件需求先经过 resolver 解析，只加载分析实际需要的组件。
+    """
+
+    def __init__(self, max_memory_mb=None, loader=None, size_of=None, resolver=None):
+        if max_memory_mb is None:
+            max_memory_mb = float(os.environ.get('ANALYZE_MODEL_MEMORY_MB', DEFAULT_MEMORY_MB))
+        self.max_memory = int(max_memory_mb * 1024 * 1024)
+        self._loader = loader or _default_loader
+        self._size_of = size_of or _estimate_model_size
+        self._resolver = resolver or resolve_components
+        self._models = OrderedDict()
+        self._sizes = {}
+        self._lock = threading.Lock()
+        self._key_locks = {}
+        self.loads = 0
+        self.hits = 0
+        self.evictions = 0
+
+    def make_key(self, lang, model_name=None, components=None):
+        # 语言只用于选择模型名，不是键的一部分
+        if model_name is None:
+            model_name = model_name_for(lang)
+        return model_name, self._resolver(model_name, components)
+
+    def get(self, lang, model_name=None, components=None):
+        key = self.make_key(lang, model_name, components)
+        with self._lock:
+            if key in self._models:
+                self._models.move_to_end(key)
+                self.hits += 1
+                instrument.count('model_cache_hits', model=key[0])
+                return self._models[key]
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        # 同一个key只加载一次，不同key的加载互不阻塞
+        with key_lock:
+            with self._lock:
+                if key in self._models:
+                    self._models.move_to_end(key)
+                    self.hits += 1
+                    instrument.count('model_cache_hits', model=key[0])
+                    return self._models[key]
+            logging.info(f"加载spacy模型: {key[0]} (语言: {lang}, 组件: {key[1] or '全部'})")
+            with instrument.span('model_load', model=key[0]):
+                nlp = self._loader(key[0], key[1])
+            instrument.count('model_loads', model=key[0])
+            size = self._size_of(nlp)
+            with self._lock:
+                self._models[key] = nlp
+                self._sizes[key] = size
+                self.loads += 1
+                self._evict(keep=key)
+                self._key_locks.pop(key, None)
+            return nlp
+
+    def _evict(self, keep):
+        # 调用方需持有 self._lock；至少保留刚加载的模型
+        while self.memory_used() > self.max_memory and len(self._models) > 1:
+            oldest = next(iter(self._models))
+            if oldest == keep:
+                break
+            self._models.pop(oldest)
+            self._sizes.pop(oldest, None)
+            self.evictions += 1
+            logging.info(f"淘汰spacy模型: {oldest[0]} (组件: {oldest[1] or '全部'})")
+
+    def memory_used(self):
+        return sum(self._sizes.values())
+
+    def set_memory_limit(self, max_memory_mb):
+        with self._lock:
+            self.max_memory = int(max_memory_mb * 1024 * 1024)
+            if self._models:
+                self._evict(keep=next(reversed(self._models)))
+
+    def loaded(self):
+        with self._lock:
+            return list(self._models.keys())
+
+    def clear(self):
+        with self._lock:
+            self._models.clear()
+            self._sizes.clear()
+
+
+_registry = ModelRegistry()
+
+
+def get_registry():
+    return _registry
+
+
+def get_nlp(lang='en', model_name=None, components=None):
+    """
+    从全局注册表获取（必要时加载）spacy模型；components 为分析需要的组件（如 NER_COMPONENTS），
+    None 表示完整管道
+    """
+    return _registry.get(lang, model_name, components)
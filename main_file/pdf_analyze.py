@@ -1,6 +1,8 @@
 import re
-import spacy
-import PyPDF2
+from main_file.nlp_models import get_nlp, NER_COMPONENTS
+from main_file.chunked_ner import chunked_entities
+from main_file.content_rank import rank_sections
+from main_file.pdf_extract import extract_pdf_pages
 import logging
 
 
@@ -9,18 +11,12 @@ logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(
 
 
 # 解析.pdf文件
-def parse_pdf(file_path):
+def parse_pdf(file_path, workers=1):
     try:
         if not file_path or not isinstance(file_path, str):
             raise ValueError("无效的文件路径，路径必须是字符串类型")
-        text = ""
-        with open(file_path, 'rb') as file:
-            reader = PyPDF2.PdfReader(file)
-            for page in reader.pages:
-                page_text = page.extract_text()
-                if page_text:
-                    text += page_text
-        return text
+        # 逐页提取后一次性拼接，workers 大于1时按页面范围并行提取
+        return "".join(extract_pdf_pages(file_path, workers))
     except FileNotFoundError:
         logging.error(f"文件未找到: {file_path}")
         return ""
@@ -34,13 +30,13 @@ def ner_analysis(text):
     try:
         if not text or not isinstance(text, str):
             raise ValueError("无效的文本输入，文本必须是字符串类型")
-        nlp = spacy.load("en_core_web_sm")
-        doc = nlp(text)
+        nlp = get_nlp("en", components=NER_COMPONENTS)
+        # 分块进行NER（相邻片段有重叠，重叠区域的重复实体会被去掉），超过spacy max_length的长文档也能处理
         brand_names = []
         keywords = []
-        for ent in doc.ents:
-            if ent.label_ in ["ORG", "PRODUCT"]:
-                brand_names.append(ent.text)
+        for ent_text, label, _, _ in chunked_entities(text, nlp):
+            if label in ["ORG", "PRODUCT"]:
+                brand_names.append(ent_text)
         words = re.findall(r'\w+', text.lower())
         word_counts = {}
         for word in words:
@@ -56,18 +52,11 @@ def ner_analysis(text):
 
 # 结合搜索引擎排序算法，筛选最具影响力的营销内容
 # 这里简单以文本长度和关键词出现次数作为排序依据
-def sort_marketing_content(html_content, keywords):
+def sort_marketing_content(html_content, keywords, top_k=None):
     try:
         if not html_content or not isinstance(html_content, str) or not keywords or not isinstance(keywords, list):
             raise ValueError("无效的输入，html_content必须是字符串类型，keywords必须是列表类型")
-        sections = re.split(r'\n+|\s{2,}', html_content.strip())
-        content_scores = []
-        for section in sections:
-            keyword_count = sum([section.count(keyword) for keyword in keywords])
-            score = len(section) + keyword_count
-            content_scores.append((section, score))
-        sorted_content = sorted(content_scores, key=lambda item: item[1], reverse=True)
-        return [c[0] for c in sorted_content]
+        return rank_sections(html_content, keywords, top_k)
     except Exception as e:
         logging.error(f"筛选营销内容时出错: {e}")
         return []
@@ -80,7 +69,7 @@ if __name__ == "__main__":
         brand_names_pdf, keywords_pdf = ner_analysis(pdf_text)
         print("识别到的.pdf文件中的品牌名称:", brand_names_pdf)
         print("识别到的.pdf文件中的热门关键词:", keywords_pdf)
-        sorted_marketing_pdf = sort_marketing_content(pdf_text, keywords_pdf)
+        sorted_marketing_pdf = sort_marketing_content(pdf_text, keywords_pdf, top_k=5)
         print("最具影响力的.pdf文件中的营销内容:")
         for content in sorted_marketing_pdf[:5]:
             print(content)
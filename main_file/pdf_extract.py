@@ -0,0 +1,81 @@
+import os
+from collections import deque
+from itertools import islice
+from concurrent.futures import ProcessPoolExecutor
+
+# 每个工作进程至少处理的页数，页数太少时并行的开销大于收益
+MIN_PAGES_PER_WORKER = 8
+# 流式并行提取时，每个进程平均分到的页面范围数；范围越多，单次缓存的页面越少
+TASKS_PER_WORKER = 4
+
+
+def _extract_range(task):
+    # 在工作进程中运行：每个进程打开自己的 PdfReader，提取 [start, end) 范围内的页面
+    import PyPDF2
+    file_path, start, end = task
+    with open(file_path, 'rb') as file:
+        reader = PyPDF2.PdfReader(file)
+        return [reader.pages[i].extract_text() or "" for i in range(start, end)]
+
+
+def page_ranges(page_count, workers):
+    """
+    把 [0, page_count) 按顺序切分为不超过 workers 个连续的页面范围
+    """
+    workers = max(1, min(workers, page_count))
+    size, extra = divmod(page_count, workers)
+    ranges = []
+    start = 0
+    for i in range(workers):
+        end = start + size + (1 if i < extra else 0)
+        if end > start:
+            ranges.append((start, end))
+        start = end
+    return ranges
+
+
+def iter_pdf_pages(file_path, workers=1):
+    """
+    按页序逐页产出 (页码, 文本)。
+    workers 大于1时把页面范围分给进程池并行提取，同时最多保留 2*workers 个未完成的范围，
+    内存占用与文档总页数无关；None 表示使用全部CPU核心。
+    """
+    import PyPDF2
+    if workers is None:
+        workers = os.cpu_count() or 1
+    with open(file_path, 'rb') as file:
+        reader = PyPDF2.PdfReader(file)
+        page_count = len(reader.pages)
+        workers = min(workers, page_count // MIN_PAGES_PER_WORKER)
+        if workers <= 1:
+            for index, page in enumerate(reader.pages):
+                yield index, page.extract_text() or ""
+            return
+
+    task_count = min(page_count // MIN_PAGES_PER_WORKER, workers * TASKS_PER_WORKER)
+    ranges = iter(page_ranges(page_count, task_count))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        for start, end in islice(ranges, 2 * workers):
+            pending.append((start, executor.submit(_extract_range, (file_path, start, end))))
+        try:
+            while pending:
+                # 按提交顺序取结果，保证页面顺序
+                start, future = pending.popleft()
+                texts = future.result()
+                next_range = next(ranges, None)
+                if next_range is not None:
+                    pending.append((next_range[0], executor.submit(_extract_range, (file_path,) + next_range)))
+                for offset, text in enumerate(texts):
+                    yield start + offset, text
+        finally:
+            # 调用方提前停止读取（如后续分析出错关闭了生成器）时，取消还没开始的范围，不再等待无人读取的结果
+            for _, future in pending:
+                future.cancel()
+
+
+def extract_pdf_pages(file_path, workers=1):
+    """
+    提取PDF每一页的文本，返回按页序排列的列表
+    """
+    return [text for _, text in iter_pdf_pages(file_path, workers)]
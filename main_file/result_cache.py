@@ -0,0 +1,121 @@
+import json
+import hashlib
+import logging
+import sqlite3
+from main_file.nlp_models import model_version
+from main_file.text_cache import TextCache, PARSER_VERSION, cache_disabled
+
+# 分析逻辑（如关键词算法）变化时递增，旧结果自动失效
+ANALYSIS_VERSION = 3
+
+
+def text_digest(text):
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def stopwords_digest(stopwords):
+    return hashlib.sha256("\n".join(sorted(stopwords)).encode('utf-8')).hexdigest()[:16]
+
+
+def result_key(text, language, model_name, stopwords=()):
+    """
+    分析结果的缓存键：(文本哈希, 检测到的语言, spacy模型名和版本, 停用词集合哈希, 分析版本)，
+    升级模型、修改停用词或分析逻辑后旧结果自动失效
+    """
+    return ":".join([text_digest(text), language.lang, f"{model_name}-{model_version(model_name)}",
+                     stopwords_digest(stopwords), str(ANALYSIS_VERSION)])
+
+
+def file_result_key(digest, mode, components=()):
+    """
+    按文件内容缓存的分析结果（如流式分析）的键：(文件哈希, 分析方式, spacy组件, 解析器版本, 分析版本)。
+    语言要读完文件才知道，所用模型的版本和停用词哈希保存在结果的 fingerprint 字段中，读取时核对
+    """
+    return ":".join([digest, mode, ",".join(components), str(PARSER_VERSION), str(ANALYSIS_VERSION)])
+
+
+def analysis_fingerprint(lang, model_name, stopwords=()):
+    return f"{lang}:{model_name}-{model_version(model_name)}:{stopwords_digest(stopwords)}"
+
+
+class ResultCache(TextCache):
+    """
+    分析结果缓存：存储品牌名称、关键词以及可选的句法表（JSON，压缩后保存在SQLite中）
+    """
+    FILE_NAME = 'result_cache.sqlite'
+    MAX_MB_ENV = 'ANALYZE_RESULT_CACHE_MB'
+
+    def get_result(self, key):
+        data = self.get(key)
+        return json.loads(data) if data is not None else None
+
+    def put_result(self, key, result):
+        self.put(key, json.dumps(result, ensure_ascii=False))
+
+
+_cache = None
+
+
+def get_result_cache():
+    global _cache
+    if _cache is None:
+        _cache = ResultCache()
+    return _cache
+
+
+def cached_analysis(text, language, compute, model_name, stopwords=(), require=('brand_names', 'keywords'),
+                    cache=None, bypass=False):
+    """
+    返回 compute() 计算的分析结果（字典）；缓存中已有包含 require 中所有字段的结果时直接返回，
+    不做任何NLP处理。compute 抛出的异常会原样传出，失败的结果不会写入缓存。
+    """
+    if bypass or cache_disabled():
+        return compute()
+    if cache is None:
+        cache = get_result_cache()
+    key = result_key(text, language, model_name, stopwords)
+    try:
+        result = cache.get_result(key)
+    except sqlite3.Error as e:
+        logging.warning(f"读取结果缓存失败: {e}")
+        return compute()
+    if result is not None and all(field in result for field in require):
+        return result
+    result = compute()
+    try:
+        cache.put_result(key, result)
+    except sqlite3.Error as e:
+        logging.warning(f"写入结果缓存失败: {e}")
+    return result
+
+
+def load_file_result(key, fingerprint, cache=None):
+    """
+    读取 file_result_key 对应的结果；fingerprint(lang) 与结果中记录的不一致（模型升级或停用词变化）时视为未命中
+    """
+    if cache_disabled():
+        return None
+    if cache is None:
+        cache = get_result_cache()
+    try:
+        result = cache.get_result(key)
+    except sqlite3.Error as e:
+        logging.warning(f"读取结果缓存失败: {e}")
+        return None
+    if result is None or result.get('fingerprint') != fingerprint(result.get('lang')):
+        return None
+    return result
+
+
+def store_file_result(key, result, fingerprint, cache=None):
+    """
+    以 file_result_key 保存分析结果（字典，需包含 lang），同时记录 fingerprint(lang)
+    """
+    if cache_disabled():
+        return
+    if cache is None:
+        cache = get_result_cache()
+    try:
+        cache.put_result(key, dict(result, fingerprint=fingerprint(result['lang'])))
+    except sqlite3.Error as e:
+        logging.warning(f"写入结果缓存失败: {e}")
@@ -0,0 +1,421 @@
+import os
+import json
+import time
+import signal
+import asyncio
+import logging
+import argparse
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from main_file import instrument
+from main_file.nlp_models import get_nlp, NER_COMPONENTS
+from main_file.lang_detect import detect_language, as_language
+from main_file.analysis_context import AnalysisContext
+from main_file.chunked_ner import DEFAULT_CHUNK_SIZE, chunk_size_for
+from main_file.content_rank import rank_sections
+from main_file.formats import get_format_registry, UnsupportedFormatError
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+# 一个批次最多包含的文档数，以及批次中第一篇文档最多等待凑批的时间（秒）
+MAX_BATCH = 32
+MAX_LATENCY = 0.01
+# 解析文件、检测语言、提取关键词和段落排序的线程数；NER 只在一个批处理线程中运行
+PREPARE_WORKERS = 4
+# 每篇文档默认返回的段落数
+DEFAULT_TOP_K = 5
+# 请求体的大小上限（字节）
+MAX_BODY = 64 * 1024 * 1024
+
+# 送入批处理前的文档：NER 之外的结果（关键词、段落排序）已经在准备阶段算好
+Prepared = namedtuple('Prepared', ['path', 'text', 'language', 'keywords', 'sections'])
+
+_REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed', 413: 'Payload Too Large',
+            415: 'Unsupported Media Type', 422: 'Unprocessable Entity', 500: 'Internal Server Error'}
+
+
+class RequestError(Exception):
+    # 以指定HTTP状态码返回给客户端的错误
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class MicroBatcher:
+    """
+    把并发提交的请求合并成批次：批次凑满 max_batch 个，或其中最早的请求已等待 max_latency 秒时，
+    在专用的单线程执行器中调用 process_batch(items)，返回值按顺序对应各请求（元素为异常时该请求抛出该异常）
+    """
+
+    def __init__(self, process_batch, max_batch=MAX_BATCH, max_latency=MAX_LATENCY):
+        self.process_batch = process_batch
+        self.max_batch = max_batch
+        self.max_latency = max_latency
+        self.batches = 0
+        self.items = 0
+        self._pending = []
+        self._wakeup = None
+        self._task = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='batch')
+
+    def start(self):
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        for _, future, _ in self._pending:
+            if not future.done():
+                future.set_exception(RuntimeError("服务已关闭"))
+        self._pending = []
+        self._executor.shutdown(wait=True)
+
+    async def submit(self, item):
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((item, future, loop.time()))
+        self._wakeup.set()
+        return await future
+
+    async def _next_batch(self):
+        loop = asyncio.get_running_loop()
+        while not self._pending:
+            self._wakeup.clear()
+            await self._wakeup.wait()
+        # 截止时间从最早的请求到达时算起；上一批处理期间积压的请求不再额外等待
+        deadline = self._pending[0][2] + self.max_latency
+        while len(self._pending) < self.max_batch:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), remaining)
+            except asyncio.TimeoutError:
+                break
+        batch = self._pending[:self.max_batch]
+        del self._pending[:self.max_batch]
+        return batch
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._next_batch()
+            self.batches += 1
+            self.items += len(batch)
+            try:
+                results = await loop.run_in_executor(self._executor, self.process_batch,
+                                                     [item for item, _, _ in batch])
+            except Exception as e:
+                results = [e] * len(batch)
+            for (_, future, _), result in zip(batch, results):
+                if future.done():
+                    continue
+                if isinstance(result, Exception):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
+
+
+def _default_keywords(text, language):
+    # 与批量模式相同，使用 analyze_all 的关键词提取（含各语言的停用词）
+    from main_file.analyze_all import extract_keywords
+    return extract_keywords(text, language)
+
+
+class AnalysisService:
+    """
+    常驻的分析服务：模型在进程内保持加载。每个请求先在线程池中解析文件（或直接使用传入的文本）、检测语言、
+    提取关键词并对段落排序，再交给 MicroBatcher 与其他并发请求一起按语言分组送入 nlp.pipe 做NER
+    """
+
+    def __init__(self, get_model=get_nlp, keyword_fn=_default_keywords, max_batch=MAX_BATCH,
+                 max_latency=MAX_LATENCY, prepare_workers=PREPARE_WORKERS, top_k=DEFAULT_TOP_K):
+        self.get_model = get_model
+        self.keyword_fn = keyword_fn
+        self.top_k = top_k
+        self.batcher = MicroBatcher(self.analyze_batch, max_batch, max_latency)
+        self._prepare_executor = ThreadPoolExecutor(max_workers=prepare_workers, thread_name_prefix='prepare')
+
+    async def start(self):
+        self.batcher.start()
+
+    async def close(self):
+        await self.batcher.close()
+        self._prepare_executor.shutdown(wait=True)
+
+    def warm_up(self, langs=('en',)):
+        """
+        预先加载各语言的NER模型、语言检测画像和关键词提取依赖，使第一个请求不再承担这些开销
+        """
+        detect_language("Warm up the language profiles before the first request arrives.")
+        for lang in langs:
+            self.get_model(lang, components=NER_COMPONENTS)
+            self.keyword_fn("warm up keyword extraction", as_language(lang))
+
+    def prepare(self, request):
+        """
+        在线程池中运行：取得文本，检测语言（请求中给出 lang 时直接使用），提取关键词并对段落排序
+        """
+        path, text = request.get('path'), request.get('text')
+        if (path is None) == (text is None):
+            raise RequestError(400, "请求必须且只能包含 path 或 text 之一")
+        if path is not None:
+            if not isinstance(path, str) or not os.path.isfile(path):
+                raise RequestError(404, f"文件不存在: {path}")
+            try:
+                _, parser = get_format_registry().parser_for(path)
+            except UnsupportedFormatError as e:
+                raise RequestError(415, str(e))
+            text = parser(path)
+        elif not isinstance(text, str):
+            raise RequestError(400, "text 必须是字符串")
+        if not text.strip():
+            raise RequestError(422, "未提取到文本")
+        top_k = request.get('top_k', self.top_k)
+        if not isinstance(top_k, int) or top_k < 0:
+            raise RequestError(400, "top_k 必须是非负整数")
+        lang = request.get('lang')
+        language = as_language(lang) if lang else detect_language(text)
+        keywords = self.keyword_fn(text, language)
+        sections = rank_sections(text, keywords, top_k) if keywords else []
+        return Prepared(path, text, language, keywords, sections)
+
+    def analyze_batch(self, items):
+        """
+        在批处理线程中运行：同一语言的短文档一起送入 nlp.pipe；超过分块大小（或模型 max_length）的长文档单独分块处理。
+        与批量模式一样，nlp.pipe 出错时该语言剩余的文档逐篇重试，只有仍然失败的文档返回异常，不影响同批的其他请求
+        """
+        results = [None] * len(items)
+        groups = {}
+        for index, item in enumerate(items):
+            groups.setdefault(item.language.lang, []).append(index)
+        with instrument.span('server_batch', chars_in=sum(len(item.text) for item in items)) as current:
+            for lang, indexes in groups.items():
+                try:
+                    nlp = self.get_model(lang, components=NER_COMPONENTS)
+                except Exception as e:
+                    for index in indexes:
+                        results[index] = e
+                    continue
+                chunk_size = chunk_size_for(nlp)
+                short = [index for index in indexes if len(items[index].text) <= chunk_size]
+                docs = nlp.pipe((items[index].text for index in short), batch_size=max(len(short), 1))
+                for position, index in enumerate(short):
+                    try:
+                        doc = next(docs)
+                    except Exception as e:
+                        logging.warning(f"语言 {lang} 的批次处理出错，剩余 {len(short) - position} 篇改为逐篇处理: {e}")
+                        break
+                    results[index] = self._result(items[index], doc=doc, nlp=nlp)
+                for index in indexes:
+                    if results[index] is None:
+                        results[index] = self._result(items[index], nlp=nlp, chunk_size=chunk_size)
+            current.set(items_out=len(items))
+        return results
+
+    @staticmethod
+    def _result(item, doc=None, nlp=None, chunk_size=DEFAULT_CHUNK_SIZE):
+        try:
+            context = AnalysisContext(item.text, item.language, nlp=nlp, doc=doc, chunk_size=chunk_size)
+            brand_names = context.brand_names()
+        except Exception as e:
+            return e
+        result = {
+            'lang': item.language.lang,
+            'confidence': round(item.language.confidence, 4),
+            'brand_names': brand_names,
+            'keywords': item.keywords,
+            'sections': item.sections,
+        }
+        if item.path is not None:
+            result['path'] = item.path
+        return result
+
+    async def analyze(self, request):
+        """
+        分析一个请求（dict，含 path 或 text，可选 lang、top_k），返回可JSON序列化的结果
+        """
+        if not isinstance(request, dict):
+            raise RequestError(400, "请求体必须是JSON对象")
+        started = time.perf_counter()
+        loop = asyncio.get_running_loop()
+        prepared = await loop.run_in_executor(self._prepare_executor, self.prepare, request)
+        result = await self.batcher.submit(prepared)
+        result['elapsed_ms'] = round((time.perf_counter() - started) * 1000, 2)
+        instrument.count('server_requests')
+        return result
+
+    def status(self):
+        return {
+            'status': 'ok',
+            'batches': self.batcher.batches,
+            'documents': self.batcher.items,
+            'pending': len(self.batcher._pending),
+        }
+
+
+async def _read_request(reader):
+    # 读取一个HTTP/1.1请求，返回 (方法, 路径, 头部, 请求体)；连接已关闭时返回 None
+    request_line = await reader.readline()
+    if not request_line.strip():
+        return None
+    try:
+        method, target, _ = request_line.decode('latin-1').split(' ', 2)
+    except ValueError:
+        raise RequestError(400, "无效的请求行")
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+    length = int(headers.get('content-length') or 0)
+    if length > MAX_BODY:
+        raise RequestError(413, f"请求体超过 {MAX_BODY} 字节")
+    body = await reader.readexactly(length) if length else b''
+    return method.upper(), target.split('?', 1)[0], headers, body
+
+
+def _write_response(writer, status, payload, content_type='application/json; charset=utf-8', keep_alive=True):
+    if isinstance(payload, str):
+        body = payload.encode('utf-8')
+    else:
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+    head = (f"HTTP/1.1 {status} {_REASONS.get(status, '')}\r\n"
+            f"Content-Type: {content_type}\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+    writer.write(head.encode('latin-1') + body)
+
+
+class AnalysisServer:
+    """
+    极简的 HTTP/1.1 服务（支持 keep-alive），可以监听 TCP 端口或 Unix 套接字：
+    POST /analyze 分析一篇文档，GET /health 返回服务状态，启用埋点时 GET /metrics 返回 Prometheus 指标
+    """
+
+    def __init__(self, service):
+        self.service = service
+        self._server = None
+
+    async def start(self, host=DEFAULT_HOST, port=DEFAULT_PORT, unix_path=None):
+        await self.service.start()
+        if unix_path:
+            if os.path.exists(unix_path):
+                os.unlink(unix_path)
+            self._server = await asyncio.start_unix_server(self._handle, path=unix_path, limit=MAX_BODY)
+        else:
+            self._server = await asyncio.start_server(self._handle, host, port, limit=MAX_BODY)
+        return self._server
+
+    @property
+    def address(self):
+        return self._server.sockets[0].getsockname()
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        await self.service.close()
+
+    async def _dispatch(self, method, path, body):
+        if path == '/analyze':
+            if method != 'POST':
+                raise RequestError(405, "请使用 POST")
+            try:
+                request = json.loads(body or b'null')
+            except ValueError:
+                raise RequestError(400, "请求体不是有效的JSON")
+            return 200, await self.service.analyze(request)
+        if path == '/health' and method == 'GET':
+            return 200, self.service.status()
+        if path == '/metrics' and method == 'GET' and instrument.enabled():
+            return 200, instrument.prometheus_text()
+        raise RequestError(404, f"未知的路径: {path}")
+
+    async def _handle(self, reader, writer):
+        try:
+            while True:
+                keep_alive = True
+                try:
+                    request = await _read_request(reader)
+                    if request is None:
+                        break
+                    method, path, headers, body = request
+                    keep_alive = headers.get('connection', '').lower() != 'close'
+                    status, payload = await self._dispatch(method, path, body)
+                except RequestError as e:
+                    status, payload = e.status, {'error': str(e)}
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    break
+                except Exception as e:
+                    logging.error(f"处理请求时出错: {e}")
+                    status, payload = 500, {'error': str(e)}
+                content_type = 'text/plain; version=0.0.4' if isinstance(payload, str) else \
+                    'application/json; charset=utf-8'
+                _write_response(writer, status, payload, content_type, keep_alive)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+
+async def serve(host=DEFAULT_HOST, port=DEFAULT_PORT, unix_path=None, preload=('en',), **service_options):
+    """
+    启动服务并一直运行到收到 SIGINT / SIGTERM
+    """
+    service = AnalysisService(**service_options)
+    loop = asyncio.get_running_loop()
+    if preload:
+        started = time.perf_counter()
+        await loop.run_in_executor(None, service.warm_up, preload)
+        logging.info(f"模型预热完成 ({', '.join(preload)})，耗时 {time.perf_counter() - started:.2f} 秒")
+    server = AnalysisServer(service)
+    await server.start(host, port, unix_path)
+    logging.info(f"分析服务已启动: {unix_path or f'http://{host}:{server.address[1]}'}")
+    stop = asyncio.Event()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(signum, stop.set)
+        except (NotImplementedError, RuntimeError):
+            pass
+    try:
+        await stop.wait()
+    finally:
+        await server.close()
+        logging.info("分析服务已停止")
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="常驻的分析服务：保持模型加载，合并并发请求批量做NER")
+    arg_parser.add_argument('--host', default=DEFAULT_HOST, help="监听地址")
+    arg_parser.add_argument('--port', type=int, default=DEFAULT_PORT, help="监听端口")
+    arg_parser.add_argument('--unix', help="改为监听 Unix 套接字路径")
+    arg_parser.add_argument('--preload', default='en', help="启动时预加载模型的语言，逗号分隔（空字符串表示不预加载）")
+    arg_parser.add_argument('--max-batch', type=int, default=MAX_BATCH, help="每批最多的文档数")
+    arg_parser.add_argument('--max-latency-ms', type=float, default=MAX_LATENCY * 1000, help="凑批的最长等待时间（毫秒）")
+    arg_parser.add_argument('--workers', type=int, default=PREPARE_WORKERS, help="解析和关键词提取的线程数")
+    arg_parser.add_argument('--metrics', action='store_true', help="启用埋点并通过 GET /metrics 提供指标")
+    args = arg_parser.parse_args(argv)
+    if args.metrics:
+        instrument.enable()
+    preload = tuple(lang.strip() for lang in args.preload.split(',') if lang.strip())
+    asyncio.run(serve(args.host, args.port, args.unix, preload, max_batch=args.max_batch,
+                      max_latency=args.max_latency_ms / 1000, prepare_workers=args.workers))
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    main()
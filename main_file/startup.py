@@ -0,0 +1,39 @@
+import sys
+import time
+import logging
+
+# 计时起点：本模块第一次被导入的时间（入口模块最先导入它）
+_STARTED = time.perf_counter()
+
+# 导入较慢的第三方库；这些库应只在对应格式或分析阶段第一次用到时才导入
+HEAVY_MODULES = ('spacy', 'PyPDF2', 'docx', 'bs4', 'lxml', 'nltk', 'jieba', 'numpy', 'scipy', 'langdetect', 'sumy', 'httpx')
+
+_marks = []
+
+
+def mark(stage):
+    """
+    记录到达某个启动阶段时的耗时（秒）
+    """
+    _marks.append((stage, time.perf_counter() - _STARTED))
+
+
+def loaded_heavy_modules():
+    """
+    返回当前进程中已经导入的重量级库
+    """
+    return [name for name in HEAVY_MODULES if name in sys.modules]
+
+
+def startup_report():
+    return {
+        'stages': [(stage, round(seconds, 4)) for stage, seconds in _marks],
+        'heavy_modules': loaded_heavy_modules(),
+    }
+
+
+def log_startup_report():
+    report = startup_report()
+    for stage, seconds in report['stages']:
+        logging.info(f"启动阶段 {stage}: {seconds * 1000:.1f} ms")
+    logging.info(f"已导入的重量级库: {', '.join(report['heavy_modules']) or '无'}")
@@ -0,0 +1,197 @@
+import zipfile
+from collections import namedtuple
+
+# 以字符串表编码的列（值为 strings 中的下标）
+CODE_COLUMNS = ('text', 'pos', 'dep')
+# 全部整数列：head 为头词相对当前词元的偏移（根节点为0），idx 为词元在全文中的字符偏移
+COLUMNS = CODE_COLUMNS + ('head', 'idx')
+_DTYPES = {'text': 'int32', 'pos': 'int32', 'dep': 'int32', 'head': 'int32', 'idx': 'int64'}
+
+
+class SyntaxTable(namedtuple('SyntaxTable', ('strings',) + COLUMNS)):
+    """
+    列式句法分析结果：每个属性一个整数数组，text、pos、dep 是共享字符串表 strings 中的下标。
+    由 Doc.to_array 一次性构建，不为每个词元创建 Python 对象
+    """
+
+    @property
+    def n_tokens(self):
+        return len(self.text)
+
+    def column(self, name):
+        """
+        把编码列解码为字符串的 numpy 数组
+        """
+        import numpy as np
+        return np.asarray(self.strings, dtype=str)[getattr(self, name)] if self.n_tokens else np.array([], dtype=str)
+
+    def rows(self):
+        """
+        惰性产出 (文本, 词性, 依存关系, 头词) 元组，格式与原先的 syntax_rows 相同
+        """
+        strings = self.strings
+        text, pos, dep, head = (self.text.tolist(), self.pos.tolist(), self.dep.tolist(), self.head.tolist())
+        for i in range(len(text)):
+            yield strings[text[i]], strings[pos[i]], strings[dep[i]], strings[text[i + head[i]]]
+
+    def to_dict(self):
+        # 可以JSON序列化的形式，供结果缓存使用
+        return dict({'strings': list(self.strings)}, **{name: getattr(self, name).tolist() for name in COLUMNS})
+
+    @classmethod
+    def from_dict(cls, data):
+        import numpy as np
+        return cls(tuple(data['strings']), *(np.asarray(data[name], dtype=_DTYPES[name]) for name in COLUMNS))
+
+
+def _encode(doc):
+    # 返回 (字符串哈希的二维数组 [ORTH, POS, DEP]、每个词元头词的下标、每个词元的字符偏移)
+    import numpy as np
+    from spacy.attrs import ORTH, POS, DEP, HEAD, IDX
+    array = doc.to_array([ORTH, POS, DEP, HEAD, IDX])
+    # HEAD 是以无符号整数保存的有符号偏移
+    heads = np.arange(len(doc), dtype=np.int64) + array[:, 3].view(np.int64)
+    return array[:, :3], heads, array[:, 4].astype(np.int64)
+
+
+def _build(vocab, hashes, head_chars, idx):
+    # 把各列的哈希合并去重成一个字符串表，并按字符偏移把头词换算为相对偏移
+    import numpy as np
+    unique, inverse = np.unique(hashes, return_inverse=True)
+    codes = inverse.reshape(hashes.shape).astype(np.int32)
+    strings = tuple(vocab.strings[int(value)] for value in unique)
+    heads = np.searchsorted(idx, head_chars).clip(0, max(len(idx) - 1, 0))
+    head = (heads - np.arange(len(idx))).astype(np.int32)
+    return SyntaxTable(strings, codes[:, 0], codes[:, 1], codes[:, 2], head, idx)
+
+
+def syntax_table(doc, offset=0):
+    """
+    从一个 Doc 构建 SyntaxTable；offset 为 Doc 文本在全文中的起始字符位置
+    """
+    hashes, heads, chars = _encode(doc)
+    return _build(doc.vocab, hashes, chars[heads] + offset, chars + offset)
+
+
+def syntax_table_from_chunks(chunks):
+    """
+    从分块处理的 ChunkDoc 列表构建一张表：只保留每个片段负责区间内的词元，
+    头词按全文字符偏移定位，跨片段的依存关系也指向正确的词元
+    """
+    import numpy as np
+    hashes, head_chars, idx = [], [], []
+    vocab = None
+    for chunk in chunks:
+        vocab = chunk.doc.vocab
+        chunk_hashes, heads, chars = _encode(chunk.doc)
+        chars = chars + chunk.start
+        owned = (chars >= chunk.owned_start) & (chars < chunk.owned_end)
+        hashes.append(chunk_hashes[owned])
+        head_chars.append(chars[heads][owned])
+        idx.append(chars[owned])
+    if vocab is None:
+        return SyntaxTable((), *(np.array([], dtype=_DTYPES[name]) for name in COLUMNS))
+    return _build(vocab, np.concatenate(hashes), np.concatenate(head_chars), np.concatenate(idx))
+
+
+def iter_syntax_lines(table):
+    """
+    惰性格式化器：逐行产出可读的句法信息，只有在需要打印时才生成字符串
+    """
+    for token_text, pos, dep, head in table.rows():
+        yield f"词: {token_text}, 词性: {pos}, 依存关系: {dep}, 头词: {head}"
+
+
+class NpzSyntaxWriter:
+    """
+    把多张 SyntaxTable 依次写入一个 .npz 文件（每张表的各列保存为 '<序号>/<列名>.npy'），
+    不需要先把所有表保存在内存中；用 read_npz_tables 按顺序读回
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.count = 0
+        self._archive = zipfile.ZipFile(path, 'w', zipfile.ZIP_STORED)
+
+    def write(self, table):
+        import numpy as np
+        arrays = dict({'strings': np.asarray(table.strings, dtype=str)},
+                      **{name: getattr(table, name) for name in COLUMNS})
+        for name, array in arrays.items():
+            with self._archive.open(f"{self.count:06d}/{name}.npy", 'w', force_zip64=True) as file:
+                np.lib.format.write_array(file, np.asarray(array), allow_pickle=False)
+        self.count += 1
+
+    def close(self):
+        self._archive.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def read_npz_tables(path):
+    """
+    按写入顺序逐张产出 NpzSyntaxWriter 保存的 SyntaxTable
+    """
+    import numpy as np
+    with np.load(path, allow_pickle=False) as data:
+        prefixes = sorted({name.split('/', 1)[0] for name in data.files})
+        for prefix in prefixes:
+            yield SyntaxTable(tuple(data[f"{prefix}/strings"].tolist()),
+                              *(data[f"{prefix}/{name}"] for name in COLUMNS))
+
+
+class ParquetSyntaxWriter:
+    """
+    把 SyntaxTable 逐张写入 Parquet 文件（每张表一个行组），编码列写为字典列，字符串表不展开。
+    需要安装 pyarrow
+    """
+
+    def __init__(self, path):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        self._pa = pa
+        self.path = path
+        self.count = 0
+        dictionary = pa.dictionary(pa.int32(), pa.string())
+        self.schema = pa.schema([(name, dictionary) for name in CODE_COLUMNS]
+                                + [('head', pa.int32()), ('idx', pa.int64())])
+        self._writer = pq.ParquetWriter(path, self.schema)
+
+    def write(self, table):
+        pa = self._pa
+        strings = pa.array(table.strings, type=pa.string())
+        columns = [pa.DictionaryArray.from_arrays(pa.array(getattr(table, name), type=pa.int32()), strings)
+                   for name in CODE_COLUMNS]
+        columns += [pa.array(table.head, type=pa.int32()), pa.array(table.idx, type=pa.int64())]
+        self._writer.write_table(pa.Table.from_arrays(columns, schema=self.schema))
+        self.count += 1
+
+    def close(self):
+        self._writer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# 按输出文件扩展名选择写入器
+WRITERS = {
+    '.npz': NpzSyntaxWriter,
+    '.parquet': ParquetSyntaxWriter,
+}
+
+
+def open_syntax_writer(path):
+    """
+    根据扩展名（.npz 或 .parquet）创建写入器
+    """
+    for extension, writer in WRITERS.items():
+        if path.lower().endswith(extension):
+            return writer(path)
+    raise ValueError(f"不支持的句法输出格式: {path}（支持 {', '.join(WRITERS)}）")
@@ -0,0 +1,236 @@
+import os
+import re
+import time
+import zlib
+import sqlite3
+import hashlib
+import logging
+import threading
+from main_file import instrument
+
+# 解析器版本：提取逻辑变化时递增，旧缓存自动失效
+PARSER_VERSION = 4
+# 默认缓存位置和大小上限（MB），可通过环境变量覆盖
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'analyze_all')
+DEFAULT_MAX_MB = 1024
+HASH_BLOCK_SIZE = 1024 * 1024
+
+_WHITESPACE = re.compile(r'\s+')
+
+
+def file_digest(file_path):
+    """
+    计算文件内容的 SHA-256，按块读取，不把整个文件读入内存
+    """
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as file:
+        for block in iter(lambda: file.read(HASH_BLOCK_SIZE), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def cache_disabled():
+    return os.environ.get('ANALYZE_NO_CACHE', '') not in ('', '0')
+
+
+class TextCache:
+    """
+    基于SQLite的提取文本缓存：键为 (内容哈希, 解析器, 解析器版本)，值为压缩后的规范化文本，
+    总大小超过上限时按最近访问时间淘汰（LRU）。每个进程使用自己的连接。
+    """
+    # 子类可以覆盖缓存文件名和大小上限对应的环境变量
+    FILE_NAME = 'text_cache.sqlite'
+    MAX_MB_ENV = 'ANALYZE_TEXT_CACHE_MB'
+
+    def __init__(self, path=None, max_bytes=None):
+        if path is None:
+            cache_dir = os.environ.get('ANALYZE_CACHE_DIR', DEFAULT_CACHE_DIR)
+            path = os.path.join(cache_dir, self.FILE_NAME)
+        if max_bytes is None:
+            max_bytes = int(float(os.environ.get(self.MAX_MB_ENV, DEFAULT_MAX_MB)) * 1024 * 1024)
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._local = threading.local()
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("CREATE TABLE IF NOT EXISTS entries ("
+                         "key TEXT PRIMARY KEY, data BLOB NOT NULL, size INTEGER NOT NULL, last_access REAL NOT NULL)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_last_access ON entries (last_access)")
+            # 条目总大小由触发器在插入、替换和删除时维护，写入时不必每次对整张表求和；
+            # 旧版本创建的缓存文件第一次打开时按现有条目初始化
+            conn.execute("PRAGMA recursive_triggers = ON")
+            with conn:
+                conn.execute("CREATE TABLE IF NOT EXISTS totals (id INTEGER PRIMARY KEY CHECK (id = 0), "
+                             "size INTEGER NOT NULL)")
+                conn.execute("INSERT OR IGNORE INTO totals (id, size) "
+                             "SELECT 0, COALESCE(SUM(size), 0) FROM entries")
+                conn.execute("CREATE TRIGGER IF NOT EXISTS entries_insert AFTER INSERT ON entries "
+                             "BEGIN UPDATE totals SET size = size + NEW.size WHERE id = 0; END")
+                conn.execute("CREATE TRIGGER IF NOT EXISTS entries_delete AFTER DELETE ON entries "
+                             "BEGIN UPDATE totals SET size = size - OLD.size WHERE id = 0; END")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    @staticmethod
+    def make_key(digest, parser_name):
+        return f"{digest}:{parser_name}:{PARSER_VERSION}"
+
+    def get(self, key):
+        conn = self._connect()
+        row = conn.execute("SELECT data FROM entries WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            self.misses += 1
+            instrument.count('cache_misses', cache=self.FILE_NAME)
+            return None
+        with conn:
+            conn.execute("UPDATE entries SET last_access = ? WHERE key = ?", (time.time(), key))
+        self.hits += 1
+        instrument.count('cache_hits', cache=self.FILE_NAME)
+        return zlib.decompress(row[0]).decode('utf-8')
+
+    def put(self, key, text):
+        self.put_data(key, zlib.compress(text.encode('utf-8')))
+
+    def put_data(self, key, data):
+        # data 为已经用 zlib 压缩的文本
+        conn = self._connect()
+        with conn:
+            conn.execute("INSERT OR REPLACE INTO entries (key, data, size, last_access) VALUES (?, ?, ?, ?)",
+                         (key, data, len(data), time.time()))
+            self._evict(conn)
+
+    def _evict(self, conn):
+        # 未超过上限时只读一行总大小，超过时才按最近访问时间扫描
+        total = self._total(conn)
+        if total <= self.max_bytes:
+            return
+        for key, size in conn.execute("SELECT key, size FROM entries ORDER BY last_access").fetchall():
+            if total <= self.max_bytes:
+                break
+            conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+            total -= size
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses}
+
+    @staticmethod
+    def _total(conn):
+        return conn.execute("SELECT size FROM totals WHERE id = 0").fetchone()[0]
+
+    def total_size(self):
+        return self._total(self._connect())
+
+    def clear(self):
+        conn = self._connect()
+        with conn:
+            conn.execute("DELETE FROM entries")
+
+
+_cache = None
+
+
+def get_text_cache():
+    global _cache
+    if _cache is None:
+        _cache = TextCache()
+    return _cache
+
+
+def cached_parse(file_path, parser, parser_name=None, cache=None, bypass=False):
+    """
+    返回文件规范化后的文本：命中缓存时只需计算一次哈希并读取一次，
+    否则调用 parser(file_path) 解析并写入缓存。bypass 为 True 或设置了 ANALYZE_NO_CACHE 时不使用缓存。
+    """
+    if parser_name is None:
+        parser_name = getattr(parser, '__name__', 'parser')
+    if bypass or cache_disabled():
+        return _WHITESPACE.sub(' ', parser(file_path)).strip()
+    if cache is None:
+        cache = get_text_cache()
+    try:
+        key = cache.make_key(file_digest(file_path), parser_name)
+        text = cache.get(key)
+    except (OSError, sqlite3.Error) as e:
+        logging.warning(f"读取文本缓存失败，直接解析文件: {e}")
+        return _WHITESPACE.sub(' ', parser(file_path)).strip()
+    if text is not None:
+        return text
+    text = _WHITESPACE.sub(' ', parser(file_path)).strip()
+    # 解析失败（返回空文本）时不写缓存，避免把错误结果固定下来
+    if text:
+        try:
+            cache.put(key, text)
+        except sqlite3.Error as e:
+            logging.warning(f"写入文本缓存失败: {e}")
+    return text
+
+
+def stream_parser_name(parser_name):
+    # 流式读取的片段按行保存（见 record_chunks），与整篇解析的文本格式不同，因此使用单独的缓存键
+    return f"{parser_name}_chunks"
+
+
+def split_chunks(text):
+    """
+    把 record_chunks 写入的缓存文本还原为 (页码或段落序号, 文本) 片段流，与第一次读取时的片段完全相同
+    """
+    start = 0
+    while start < len(text):
+        end = text.find('\n', start)
+        end = len(text) if end < 0 else end
+        index, _, chunk = text[start:end].partition('\t')
+        yield int(index), chunk
+        start = end + 1
+
+
+def cached_text(file_path, parser_names, cache=None):
+    """
+    按文件内容哈希依次查找 parser_names 对应的缓存文本，返回 (文件哈希, 文本)，未命中时文本为 None；
+    不使用缓存或读取失败时返回 (None, None)
+    """
+    if cache_disabled():
+        return None, None
+    if cache is None:
+        cache = get_text_cache()
+    try:
+        digest = file_digest(file_path)
+        for parser_name in parser_names:
+            text = cache.get(cache.make_key(digest, parser_name))
+            if text is not None:
+                return digest, text
+    except (OSError, sqlite3.Error) as e:
+        logging.warning(f"读取文本缓存失败: {e}")
+        return None, None
+    return digest, None
+
+
+def record_chunks(chunks, digest, parser_name, cache=None):
+    """
+    包装规范化后的片段流：原样产出每个片段，同时增量压缩为每行一个片段的文本（"序号\t文本"，规范化后的片段
+    不含制表符和换行符），片段流完整读完后以 (digest, parser_name) 写入缓存，可用 split_chunks 还原；
+    中途出错或中断时不写入。内存中只保留压缩后的数据
+    """
+    if cache is None:
+        cache = get_text_cache()
+    compressor = zlib.compressobj()
+    parts = []
+    separator = b''
+    for index, text in chunks:
+        parts.append(compressor.compress(separator + f"{index}\t{text}".encode('utf-8')))
+        separator = b'\n'
+        yield index, text
+    # 没有提取到文本时不写缓存
+    if separator:
+        parts.append(compressor.flush())
+        try:
+            cache.put_data(cache.make_key(digest, parser_name), b''.join(parts))
+        except sqlite3.Error as e:
+            logging.warning(f"写入文本缓存失败: {e}")
@@ -0,0 +1,115 @@
+import logging
+from functools import lru_cache
+
+# 词法化依赖的 NLTK 数据资源：(nltk.data 中的路径, 下载时使用的名称)
+WORDNET_RESOURCE = ('corpora/wordnet', 'wordnet')
+
+# 每个共享词法化器/词干化器最多缓存的不同词数
+NORMALIZE_CACHE_SIZE = 200000
+
+_checked_resources = set()
+
+
+def ensure_nltk_resource(resource):
+    """
+    离线检查本地 NLTK 数据路径中是否已有所需资源，不访问网络；
+    缺失时抛出 LookupError 并提示下载命令
+    """
+    path, name = resource
+    if path in _checked_resources:
+        return
+    import nltk
+    try:
+        nltk.data.find(path)
+    except LookupError:
+        # wordnet 可能只以 zip 形式存在
+        try:
+            nltk.data.find(path + '.zip')
+        except LookupError:
+            message = f"缺少NLTK数据 '{name}'，请先运行: python -m nltk.downloader {name}"
+            logging.error(message)
+            raise LookupError(message) from None
+    _checked_resources.add(path)
+
+
+class TokenNormalizer:
+    """
+    按唯一词做规范化的包装器：长期持有一个词法化/词干化函数，结果保存在有界的LRU缓存中，
+    可在批量处理的多篇文档之间共享。处理一篇文档的开销取决于其中不同词的个数，而不是词的总数
+    """
+
+    def __init__(self, normalize_word, maxsize=NORMALIZE_CACHE_SIZE):
+        self._normalize = lru_cache(maxsize=maxsize)(normalize_word)
+
+    def normalize(self, word):
+        return self._normalize(word)
+
+    def normalize_tokens(self, tokens):
+        """
+        返回与 tokens 等长的规范化结果列表；每个不同的词只查一次缓存
+        """
+        mapping = {token: self._normalize(token) for token in dict.fromkeys(tokens)}
+        return [mapping[token] for token in tokens]
+
+    def normalize_array(self, tokens):
+        """
+        批量接口：返回规范化后的 numpy 字符串数组，先对 tokens 去重，只规范化词表
+        """
+        import numpy as np
+        vocabulary, inverse = np.unique(np.asarray(tokens, dtype=str), return_inverse=True)
+        normalized = np.array([self._normalize(word) for word in vocabulary.tolist()], dtype=str)
+        return normalized[inverse]
+
+    def normalize_text(self, text):
+        return " ".join(self.normalize_tokens(text.split()))
+
+    def cache_info(self):
+        return self._normalize.cache_info()
+
+    def cache_clear(self):
+        self._normalize.cache_clear()
+
+
+_lemmatizer = None
+_stemmer = None
+
+
+def get_lemmatizer():
+    """
+    返回进程内共享的 WordNet 词法化器（第一次调用时检查数据并创建）
+    """
+    global _lemmatizer
+    if _lemmatizer is None:
+        ensure_nltk_resource(WORDNET_RESOURCE)
+        from nltk.stem import WordNetLemmatizer
+        _lemmatizer = TokenNormalizer(WordNetLemmatizer().lemmatize)
+    return _lemmatizer
+
+
+def get_stemmer():
+    """
+    返回进程内共享的 Porter 词干化器
+    """
+    global _stemmer
+    if _stemmer is None:
+        from nltk.stem import PorterStemmer
+        _stemmer = TokenNormalizer(PorterStemmer().stem)
+    return _stemmer
+
+
+def lemmatize_tokens(tokens):
+    return get_lemmatizer().normalize_tokens(tokens)
+
+
+def stem_tokens(tokens):
+    return get_stemmer().normalize_tokens(tokens)
+
+
+# 词法化函数
+def lemmatize_text(text):
+    return get_lemmatizer().normalize_text(text)
+
+
+# 词干化函数
+def stem_text(text):
+    return get_stemmer().normalize_text(text)
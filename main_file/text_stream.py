@@ -0,0 +1,141 @@
+import re
+import json
+import random
+import logging
+import tempfile
+from contextlib import nullcontext
+from collections import namedtuple
+from main_file import instrument
+from main_file.formats import get_format_registry, UnsupportedFormatError
+from main_file.lang_detect import detect_language, DEFAULT_SAMPLE_CHUNKS, DEFAULT_CHUNK_SIZE
+from main_file.nlp_models import get_nlp, NER_COMPONENTS
+from main_file.analysis_context import BRAND_LABELS
+
+_WHITESPACE = re.compile(r'\s+')
+
+# 语言检测样本的字符预算：从整个片段流中按字符均匀抽样，与 detect_language 对整篇文本的默认抽样量相同
+DETECT_CHARS = DEFAULT_SAMPLE_CHUNKS * DEFAULT_CHUNK_SIZE
+# 抽样时把片段切成这么长的小段，按小段做水塘抽样
+DETECT_PIECE = DEFAULT_CHUNK_SIZE
+
+StreamResult = namedtuple('StreamResult', ['language', 'brand_names', 'keywords'])
+
+
+def normalize_chunks(chunks):
+    """
+    逐个片段规范化空白字符，跳过空片段；每次只处理一个片段
+    """
+    for index, text in chunks:
+        text = _WHITESPACE.sub(' ', text).strip()
+        if text:
+            yield index, text
+
+
+def iter_chunks(file_path, workers=1):
+    """
+    按文件内容（扩展名作为后备）选择读取器，产出规范化后的 (页码或段落序号, 文本)
+    """
+    file_format, reader = get_format_registry().reader_for(file_path)
+    if reader is None:
+        raise UnsupportedFormatError(f"不支持流式读取的文件类型: {file_format.name}")
+    if file_format.name == 'pdf':
+        return normalize_chunks(reader(file_path, workers))
+    return normalize_chunks(reader(file_path))
+
+
+class ChunkSampler:
+    """
+    对片段做固定种子的水塘抽样，最多保留 size 个片段；流式分析用它从整个文档中抽取语言检测样本
+    """
+
+    def __init__(self, size=DETECT_CHARS // DETECT_PIECE, seed=0):
+        self.size = size
+        self.items = []
+        self.seen = 0
+        self._random = random.Random(seed)
+
+    def add(self, index, text):
+        self.seen += 1
+        if len(self.items) < self.size:
+            self.items.append((index, text))
+            return
+        slot = self._random.randrange(self.seen)
+        if slot < self.size:
+            self.items[slot] = (index, text)
+
+    def text(self):
+        return " ".join(text for _, text in sorted(self.items))
+
+
+def sample_pieces(sampler, index, text, piece=DETECT_PIECE):
+    # 把片段切成固定长度的小段加入抽样，长片段（如整页PDF）与短片段（如DOCX段落）按字符数获得相应的权重
+    for offset in range(0, len(text), piece):
+        sampler.add((index, offset), text[offset:offset + piece])
+
+
+def spool_chunks(chunks, spool, sampler):
+    """
+    第一遍读取：片段逐行写入临时文件，同时做语言检测抽样；内存只保留抽样的小段
+    """
+    for index, text in chunks:
+        sample_pieces(sampler, index, text)
+        spool.write(json.dumps([index, text], ensure_ascii=False) + "\n")
+    spool.seek(0)
+
+
+def read_spool(spool):
+    for line in spool:
+        index, text = json.loads(line)
+        yield index, text
+
+
+def analyze_stream(chunks, language=None, nlp=None, keyword_graph=None, on_doc=None, batch_size=16,
+                   detect_chars=DETECT_CHARS, seed=0, components=NER_COMPONENTS):
+    """
+    增量分析片段流，逐批通过 nlp.pipe 做NER。未给出 language 时先读完整个片段流：片段写入临时文件，
+    同时从全文中按字符预算 detect_chars 抽样检测语言，再从临时文件读回片段做NER，内存占用仍取决于片段大小。
+    keyword_graph(language) 返回增量的关键词图（如 KeywordGraph），每个片段都加入图中，关键词基于全文而不是抽样。
+    on_doc(index, doc) 会对每个片段的 Doc 调用一次（例如输出句法信息），此时 components 需包含相应组件。
+    """
+    with tempfile.TemporaryFile('w+', encoding='utf-8') if language is None else nullcontext() as spool:
+        if language is None:
+            sampler = ChunkSampler(max(detect_chars // DETECT_PIECE, 1), seed)
+            spool_chunks(chunks, spool, sampler)
+            # 样本已经在读取时抽好，不再二次抽样
+            language = detect_language(sampler.text(), n_chunks=0)
+            chunks = read_spool(spool)
+        return _analyze_chunks(chunks, language, nlp, keyword_graph, on_doc, batch_size, components)
+
+
+def _analyze_chunks(chunks, language, nlp, keyword_graph, on_doc, batch_size, components):
+    if nlp is None:
+        nlp = get_nlp(language.lang, components=components)
+    graph = keyword_graph(language) if keyword_graph is not None else None
+    chars_in = 0
+
+    def feed():
+        nonlocal chars_in, graph
+        for index, text in chunks:
+            chars_in += len(text)
+            if graph is not None:
+                try:
+                    graph.add(text)
+                except Exception as e:
+                    # 与 extract_keywords 一样，关键词提取出错时不影响NER
+                    logging.error(f"关键词提取时出错: {e}")
+                    graph = None
+            yield text, index
+
+    brand_names = []
+    with instrument.span('nlp_stream', lang=language.lang) as current:
+        for doc, index in nlp.pipe(feed(), as_tuples=True, batch_size=batch_size):
+            brand_names.extend(ent.text for ent in doc.ents if ent.label_ in BRAND_LABELS)
+            if on_doc is not None:
+                on_doc(index, doc)
+        current.set(chars_in=chars_in, items_out=len(brand_names))
+    keywords = []
+    if graph is not None:
+        with instrument.span('extract_keywords', chars_in=chars_in) as current:
+            keywords = [keyword.word for keyword in graph.rank()]
+            current.set(items_out=len(keywords))
+    return StreamResult(language, brand_names, keywords)
@@ -1,32 +1,30 @@
-import re
-import spacy
-import PyPDF2
+from main_file.nlp_models import get_nlp, NER_COMPONENTS
+from main_file.chunked_ner import chunked_entities
+from main_file.content_rank import rank_sections
+from main_file.keyword_rank import rank_keywords
+from main_file.formats import is_format
+from main_file.pdf_extract import extract_pdf_pages
+from main_file import instrument
 import logging
-from sumy.parsers.plaintext import PlaintextParser
-from sumy.nlp.tokenizers import Tokenizer
-from sumy.summarizers.text_rank import TextRankSummarizer
 
 # 配置日志记录
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
 
 # 解析.pdf文件的函数
-def parse_pdf(file_path):
+@instrument.instrumented('parse_pdf')
+def parse_pdf(file_path, workers=1):
+    # PyPDF2 只在解析PDF时才导入，与其他 *_put.py 一样不在模块导入时加载重量级库
+    import PyPDF2
     try:
         if not file_path or not isinstance(file_path, str):
             raise ValueError("无效的文件路径，路径必须是字符串类型")
-        text = ""
-        with open(file_path, 'rb') as file:
-            reader = PyPDF2.PdfReader(file)
-            for page in reader.pages:
-                page_text = page.extract_text()
-                if page_text:
-                    text += page_text
-        return text
+        # 逐页提取后一次性拼接，workers 大于1时按页面范围并行提取
+        return "".join(extract_pdf_pages(file_path, workers))
     except FileNotFoundError:
         logging.error(f"文件未找到: {file_path}")
         return ""
-    except PyPDF2.utils.PdfReadError as e:
+    except PyPDF2.errors.PdfReadError as e:
         logging.error(f"PDF文件格式错误或损坏: {e}")
         return ""
     except Exception as e:
@@ -35,14 +33,13 @@ def parse_pdf(file_path):
 
 
 # 使用TextRank算法提取关键词
+@instrument.instrumented('extract_keywords')
 def extract_keywords(text):
     try:
         if not text or not isinstance(text, str):
             raise ValueError("无效的文本输入，文本必须是字符串类型")
-        parser = PlaintextParser.from_string(text, Tokenizer("english"))
-        summarizer = TextRankSummarizer()
-        keywords = summarizer(parser.document, 10)
-        return [keyword.word for keyword in keywords]
+        # 基于词共现图的 PageRank 关键词排序，返回按得分从高到低的关键词
+        return [keyword.word for keyword in rank_keywords(text)]
     except Exception as e:
         logging.error(f"关键词提取时出错: {e}")
         # 可以考虑返回一个默认的空列表，避免后续函数出错
@@ -50,16 +47,17 @@ def extract_keywords(text):
 
 
 # 使用NER识别品牌名称、热门关键词、流行趋势的函数
+@instrument.instrumented('ner_analysis')
 def ner_analysis(text):
     try:
         if not text or not isinstance(text, str):
             raise ValueError("无效的文本输入，文本必须是字符串类型")
-        nlp = spacy.load("en_core_web_sm")
-        doc = nlp(text)
+        nlp = get_nlp("en", components=NER_COMPONENTS)
+        # 分块进行NER（相邻片段有重叠，重叠区域的重复实体会被去掉），超过spacy max_length的长文档也能处理
         brand_names = []
-        for ent in doc.ents:
-            if ent.label_ in ["ORG", "PRODUCT"]:
-                brand_names.append(ent.text)
+        for ent_text, label, _, _ in chunked_entities(text, nlp):
+            if label in ["ORG", "PRODUCT"]:
+                brand_names.append(ent_text)
         keywords = extract_keywords(text)
         return brand_names, keywords
     except Exception as e:
@@ -69,20 +67,13 @@ def ner_analysis(text):
 
 # 结合搜索引擎排序算法，筛选最具影响力的营销内容的函数
 # 结合搜索引擎排序算法，筛选最具影响力的营销内容的函数
-def sort_marketing_content(html_content, keywords):
+def sort_marketing_content(html_content, keywords, top_k=None):
     try:
         if not html_content or not isinstance(html_content, str) or not keywords or not isinstance(keywords, list):
             # 可以选择返回一个空列表或者给出更友好的提示
             logging.warning("输入不符合要求，无法进行营销内容筛选。")
             return []
-        sections = re.split(r'\n+|\s{2,}', html_content.strip())
-        content_scores = []
-        for section in sections:
-            keyword_count = sum([section.count(keyword) for keyword in keywords])
-            score = len(section) + keyword_count
-            content_scores.append((section, score))
-        sorted_content = sorted(content_scores, key=lambda item: item[1], reverse=True)
-        return [c[0] for c in sorted_content]
+        return rank_sections(html_content, keywords, top_k)
     except Exception as e:
         logging.error(f"筛选营销内容时出错: {e}")
         return []
@@ -90,15 +81,15 @@ def sort_marketing_content(html_content, keywords):
 
 def pdf_main():
     pdf_file_path = input("请输入你的PDF文件路径: ")
-    if not pdf_file_path or not isinstance(pdf_file_path, str) or not pdf_file_path.endswith('.pdf'):
-        logging.error("无效的文件路径，请输入有效的.pdf文件路径")
+    if not pdf_file_path or not isinstance(pdf_file_path, str) or not is_format(pdf_file_path, 'pdf'):
+        logging.error("无效的文件路径，请输入有效的.pdf文件路径（按文件内容判断格式）")
         return
     pdf_text = parse_pdf(pdf_file_path)
     if pdf_text:
         brand_names_pdf, keywords_pdf = ner_analysis(pdf_text)
         print("识别到的.pdf文件中的品牌名称:", brand_names_pdf)
         print("识别到的.pdf文件中的热门关键词:", keywords_pdf)
-        sorted_marketing_pdf = sort_marketing_content(pdf_text, keywords_pdf)
+        sorted_marketing_pdf = sort_marketing_content(pdf_text, keywords_pdf, top_k=5)
         print("最具影响力的.pdf文件中的营销内容:")
         for content in sorted_marketing_pdf[:5]:
             print(content)
@@ -0,0 +1,61 @@
+import unittest
+import spacy
+from main_file.analysis_context import AnalysisContext
+from test_support import ruler_model, APPLE_PATTERNS
+
+
+@spacy.Language.component("lower_lemma")
+def lower_lemma(doc):
+    # 代替真正的 lemmatizer：词元取小写形式
+    for token in doc:
+        token.lemma_ = token.lower_
+    return doc
+
+
+class CountingNlp:
+    def __init__(self, lemmas=True):
+        patterns = APPLE_PATTERNS + [{"label": "GPE", "pattern": "Paris"}]
+        self.nlp = ruler_model(patterns, pipes=("lower_lemma",) if lemmas else ())
+        self.calls = 0
+
+    def __call__(self, text):
+        self.calls += 1
+        return self.nlp(text)
+
+
+class TestAnalysisContext(unittest.TestCase):
+    def setUp(self):
+        self.nlp = CountingNlp()
+        self.context = AnalysisContext("Apple opens a store in Paris.", language="en", nlp=self.nlp)
+
+    def test_single_parse_shared(self):
+        self.assertEqual(self.context.brand_names(), ["Apple"])
+        rows = self.context.syntax_rows()
+        lemmas = self.context.lemmas()
+        entities = self.context.entities()
+        self.assertEqual(rows[0][0], "Apple")
+        self.assertEqual(len(lemmas), len(rows))
+        self.assertEqual(lemmas[0], "apple")
+        self.assertEqual(entities[1], ("Paris", "GPE", 23, 28))
+        self.assertEqual(self.nlp.calls, 1)
+
+    def test_lemmas_require_lemmatizer(self):
+        context = AnalysisContext("Apple opens a store.", language="en", nlp=CountingNlp(lemmas=False))
+        with self.assertRaises(ValueError):
+            context.lemmas()
+        self.assertEqual(AnalysisContext("", language="en", nlp=CountingNlp(lemmas=False)).lemmas(), [])
+
+    def test_precomputed_doc(self):
+        doc = self.nlp("Apple")
+        context = AnalysisContext("Apple", language="en", doc=doc)
+        self.assertEqual(context.brand_names(), ["Apple"])
+        self.assertEqual(self.nlp.calls, 1)
+
+    def test_nltk_passes_are_lazy(self):
+        self.assertIsNone(self.context._stemmed_text)
+        self.assertEqual(self.context.stemmed_text, "appl open a store in paris.")
+        self.assertEqual(self.nlp.calls, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,122 @@
+import unittest
+import tempfile
+import os
+import json
+from main_file import instrument
+from main_file.batch import collect_paths, run_batch, main
+from test_support import blank_model
+
+
+class TestBatch(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.paths = []
+        for i in range(3):
+            path = os.path.join(self.temp_dir.name, f"doc{i}.html")
+            with open(path, 'w', encoding='utf-8') as file:
+                file.write(f"<html><body><p>Apple sells phones in store number {i}. "
+                           f"The store is open every day of the week.</p></body></html>")
+            self.paths.append(path)
+        with open(os.path.join(self.temp_dir.name, "notes.txt"), 'w', encoding='utf-8') as file:
+            file.write("ignored")
+
+    def test_collect_paths_directory(self):
+        self.assertEqual(collect_paths(self.temp_dir.name), self.paths)
+
+    def test_collect_paths_glob(self):
+        self.assertEqual(collect_paths(os.path.join(self.temp_dir.name, "doc[01].html")), self.paths[:2])
+
+    def test_collect_paths_manifest(self):
+        manifest = os.path.join(self.temp_dir.name, "manifest.lst")
+        with open(manifest, 'w', encoding='utf-8') as file:
+            file.write("# comment\ndoc2.html\n\n" + self.paths[0] + "\n")
+        self.assertEqual(collect_paths(manifest), [self.paths[2], self.paths[0]])
+
+    def test_run_batch(self):
+        output = os.path.join(self.temp_dir.name, "out.jsonl")
+        paths = self.paths + [os.path.join(self.temp_dir.name, "missing.html")]
+        done, failed = run_batch(paths, output, batch_size=2, get_model=blank_model, bypass_cache=True)
+        self.assertEqual((done, failed), (3, 1))
+        with open(output, 'r', encoding='utf-8') as file:
+            records = [json.loads(line) for line in file]
+        self.assertEqual(len(records), 4)
+        ok = [r for r in records if 'error' not in r]
+        self.assertEqual(sorted(r['path'] for r in ok), self.paths)
+        for record in ok:
+            self.assertEqual(record['lang'], "en")
+            self.assertEqual(record['brand_names'], ["Apple"])
+            self.assertIsInstance(record['keywords'], list)
+
+    def test_worker_metrics_are_merged(self):
+        # 文本提取进程中的测量结果传回父进程，与父进程中的NER批次一起汇总
+        recorder = instrument.enable()
+        try:
+            output = os.path.join(self.temp_dir.name, "out.jsonl")
+            run_batch(self.paths, output, workers=2, get_model=blank_model, bypass_cache=True)
+        finally:
+            instrument.disable()
+        self.assertEqual(recorder.spans['extract_document']['count'], 3)
+        self.assertEqual(recorder.spans['parse_html']['count'], 3)
+        self.assertEqual(recorder.spans['ner_batch']['count'], 1)
+        self.assertGreater(recorder.spans['extract_document']['chars_out'], 0)
+
+    def test_main_exports_metrics(self):
+        metrics = os.path.join(self.temp_dir.name, "metrics.prom")
+        output = os.path.join(self.temp_dir.name, "out.jsonl")
+        self.addCleanup(instrument.disable)
+        main([self.temp_dir.name, '-o', output, '--no-cache', '--metrics', metrics])
+        with open(metrics, encoding='utf-8') as file:
+            self.assertIn('analyze_span_count_total{stage="extract_document"} 3', file.read())
+
+    def test_long_documents_are_chunked(self):
+        # 超过模型 max_length 的文档分块做NER，不会因 E088 中断整个批次
+        def small_model(lang, components=None):
+            nlp = blank_model(lang)
+            nlp.max_length = 2000
+            return nlp
+
+        path = os.path.join(self.temp_dir.name, "long.html")
+        sentences = " ".join(f"Apple opened store {i} in the city." for i in range(200))
+        with open(path, 'w', encoding='utf-8') as file:
+            file.write(f"<html><body><p>{sentences}</p></body></html>")
+        output = os.path.join(self.temp_dir.name, "out.jsonl")
+        done, failed = run_batch(self.paths + [path], output, get_model=small_model, bypass_cache=True)
+        self.assertEqual((done, failed), (4, 0))
+        with open(output, 'r', encoding='utf-8') as file:
+            records = {record['path']: record for record in map(json.loads, file)}
+        self.assertEqual(records[path]['brand_names'], ["Apple"] * 200)
+
+    def test_failing_document_does_not_stop_batch(self):
+        # 整批出错后剩余文档逐篇重试，只有出错的文档输出 error 记录
+        class FailingModel:
+            def __init__(self):
+                self.nlp = blank_model("en")
+                self.max_length = self.nlp.max_length
+
+            def __call__(self, text):
+                if "poison" in text:
+                    raise ValueError("bad document")
+                return self.nlp(text)
+
+            def pipe(self, texts, **kwargs):
+                for text in texts:
+                    yield self(text)
+
+        path = os.path.join(self.temp_dir.name, "bad.html")
+        with open(path, 'w', encoding='utf-8') as file:
+            file.write("<html><body><p>Apple poison pill for the whole batch of documents.</p></body></html>")
+        output = os.path.join(self.temp_dir.name, "out.jsonl")
+        done, failed = run_batch([path] + self.paths, output, get_model=lambda lang, components=None: FailingModel(),
+                                 bypass_cache=True)
+        self.assertEqual((done, failed), (3, 1))
+        with open(output, 'r', encoding='utf-8') as file:
+            records = {record['path']: record for record in map(json.loads, file)}
+        self.assertEqual(records[path], {'path': path, 'error': "bad document"})
+        self.assertTrue(all(records[p]['brand_names'] == ["Apple"] for p in self.paths))
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+
+if __name__ == "__main__":
+    unittest.main()
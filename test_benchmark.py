@@ -0,0 +1,84 @@
+import os
+import tempfile
+import unittest
+from main_file import bench_fixtures
+from main_file.benchmark import (measure, run_benchmarks, make_fixture, compare_reports, scaling_exponent,
+                                 load_report, main)
+from main_file.analyze_all import parse_docx, parse_html, parse_djvu
+from main_file.pdf_extract import iter_pdf_pages
+
+
+class TestBenchmark(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.workdir = self.temp_dir.name
+
+    def test_fixtures_are_deterministic_and_parseable(self):
+        self.assertEqual(bench_fixtures.synthetic_paragraphs(3, seed=1), bench_fixtures.synthetic_paragraphs(3, seed=1))
+        self.assertNotEqual(bench_fixtures.synthetic_text(50, seed=1), bench_fixtures.synthetic_text(50, seed=2))
+        self.assertEqual(len(bench_fixtures.synthetic_text(50).split()), 50)
+
+        pages = [text for _, text in iter_pdf_pages(make_fixture('pdf', 3, self.workdir))]
+        words_per_page = bench_fixtures.LINES_PER_PAGE * bench_fixtures.WORDS_PER_LINE
+        self.assertEqual([len(text.split()) for text in pages], [words_per_page] * 3)
+        paragraphs = bench_fixtures.synthetic_paragraphs(120)
+        docx_text = parse_docx(make_fixture('docx', 120, self.workdir))
+        self.assertTrue(docx_text.startswith(paragraphs[0]))
+        # 每50段插入一个 2x2 表格
+        self.assertEqual(len(docx_text.split("\n")), 120 + 2 * 4)
+        html_text = parse_html(make_fixture('html', 120, self.workdir))
+        self.assertIn(paragraphs[-1], html_text)
+        self.assertNotIn("Copyright", html_text)
+
+    def test_fake_djvu_tools(self):
+        path = make_fixture('djvu', 10, self.workdir)
+        tools_dir = os.path.join(self.workdir, 'djvu_tools')
+        old_path = os.environ['PATH']
+        os.environ['PATH'] = tools_dir + os.pathsep + old_path
+        try:
+            text = parse_djvu(path)
+        finally:
+            os.environ['PATH'] = old_path
+        self.assertTrue(text.startswith(bench_fixtures.djvu_page_text(1)))
+        self.assertIn(bench_fixtures.djvu_page_text(10), text)
+
+    def test_measure_and_report(self):
+        result = measure('sort_marketing_content', 500, repeat=2)
+        self.assertIsNone(result.skipped)
+        self.assertGreater(result.throughput, 0)
+        report = run_benchmarks(['parse_docx', 'extract_keywords'], {'docx': (50, 200), 'text': (500, 2000)},
+                                repeat=1, workdir=self.workdir, isolate=False)
+        self.assertEqual([(item['stage'], item['size']) for item in report['results']],
+                         [('parse_docx', 50), ('parse_docx', 200), ('extract_keywords', 500), ('extract_keywords', 2000)])
+        self.assertEqual(report['scaling']['parse_docx']['sizes'], [50, 200])
+        self.assertIsNotNone(report['scaling']['parse_docx']['exponent'])
+
+    def test_scaling_exponent(self):
+        self.assertAlmostEqual(scaling_exponent([10, 100, 1000], [1, 10, 100]), 1.0)
+        self.assertAlmostEqual(scaling_exponent([10, 100], [1, 100]), 2.0)
+        self.assertIsNone(scaling_exponent([10], [1]))
+
+    def test_compare_reports(self):
+        baseline = {'results': [{'stage': 'a', 'size': 1, 'seconds': 1.0, 'skipped': None},
+                                {'stage': 'b', 'size': 1, 'seconds': 1.0, 'skipped': None}]}
+        current = {'results': [{'stage': 'a', 'size': 1, 'seconds': 1.1, 'skipped': None},
+                               {'stage': 'b', 'size': 1, 'seconds': 2.0, 'skipped': None},
+                               {'stage': 'c', 'size': 1, 'seconds': 5.0, 'skipped': None}]}
+        regressions = compare_reports(current, baseline, tolerance=0.25)
+        self.assertEqual([(item['stage'], item['ratio']) for item in regressions], [('b', 2.0)])
+
+    def test_cli_baseline_round_trip(self):
+        baseline = os.path.join(self.workdir, "baseline.json")
+        output = os.path.join(self.workdir, "report.json")
+        args = ['--stages', 'sort_marketing_content', '--sizes', 'text=500', '--repeat', '1', '--no-isolate',
+                '--output', output]
+        self.assertEqual(main(args + ['--save-baseline', baseline]), 0)
+        self.assertEqual(load_report(baseline)['results'][0]['stage'], 'sort_marketing_content')
+        self.assertEqual(main(args + ['--baseline', baseline, '--tolerance', '1000']), 0)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+
+if __name__ == "__main__":
+    unittest.main()
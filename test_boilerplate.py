@@ -0,0 +1,54 @@
+import unittest
+from main_file.boilerplate import Block, classify_blocks, strip_boilerplate
+from main_file.html_extract import extract_html
+
+ARTICLE = ("Apple announced a new line of phones today, with longer battery life and a faster chip "
+           "that the company says doubles performance for most everyday tasks.")
+
+PAGE = f"""<html><head><title>News</title><script>track()</script><noscript>Enable JS</noscript></head>
+<body>
+<nav><a href="/">Home</a> <a href="/news">News</a> <a href="/about">About</a></nav>
+<header>Subscribe to our newsletter</header>
+<div class="links"><a href="/1">Related story one</a> | <a href="/2">Related story two</a></div>
+<h2>Launch event</h2>
+<p>{ARTICLE}</p>
+<p>Analysts expect strong demand in the holiday season, although supply constraints could limit availability early on.</p>
+<footer>Copyright 2024 Example Media. All rights reserved.</footer>
+</body></html>"""
+
+BACKENDS = ['html.parser', 'lxml']
+
+
+class TestBoilerplate(unittest.TestCase):
+    def test_main_content_keeps_article(self):
+        for backend in BACKENDS:
+            content = extract_html(PAGE, text_only=True, backend=backend, main_content=True)
+            self.assertIn(ARTICLE, content.text, backend)
+            self.assertIn("Launch event", content.text, backend)
+            for boilerplate in ("Home", "Related story", "newsletter", "Copyright", "track()", "Enable JS"):
+                self.assertNotIn(boilerplate, content.text, (backend, boilerplate))
+            stats = content.stats
+            self.assertEqual(stats.total_chars, stats.kept_chars + stats.removed_chars)
+            self.assertEqual(stats.kept_chars, len(content.text.replace("\n", "")))
+            self.assertGreater(stats.removed_chars, 0)
+
+    def test_stats_absent_without_main_content(self):
+        self.assertIsNone(extract_html(PAGE).stats)
+
+    def test_classify_blocks(self):
+        blocks = [
+            Block("Home News About", 15, False),
+            Block("Heading", 0, False),
+            Block("x" * 100, 0, False),
+            Block("y" * 100, 0, True),
+        ]
+        self.assertEqual(classify_blocks(blocks), [False, True, True, False])
+
+    def test_short_page_falls_back_to_all_text(self):
+        text, stats = strip_boilerplate([Block("Test content", 0, False), Block("Menu", 4, False)])
+        self.assertEqual(text, "Test content")
+        self.assertEqual(stats.removed_chars, 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,49 @@
+import unittest
+from main_file.chunked_ner import split_text, chunked_entities
+from main_file.analysis_context import AnalysisContext
+from test_support import ruler_model, APPLE_PATTERNS
+
+
+PATTERNS = APPLE_PATTERNS + [{"label": "ORG", "pattern": [{"LOWER": "big"}, {"LOWER": "data"}, {"LOWER": "corp"}]}]
+
+
+class TestChunkedNer(unittest.TestCase):
+    def setUp(self):
+        self.nlp = ruler_model()
+        sentences = [f"Sentence {i} mentions Apple and Big Data Corp today." for i in range(120)]
+        self.text = " ".join(sentences)
+
+    def test_split_text_covers_with_overlap(self):
+        spans = split_text(self.text, chunk_size=300, overlap=60)
+        self.assertGreater(len(spans), 10)
+        self.assertEqual(spans[0][0], 0)
+        self.assertEqual(spans[-1][1], len(self.text))
+        for (start, end), (next_start, _) in zip(spans, spans[1:]):
+            self.assertLessEqual(end - start, 300)
+            self.assertGreaterEqual(end - next_start, 60)
+            # 片段在句子边界处结束
+            self.assertEqual(self.text[end - 2:end], ". ")
+
+    def test_short_text_single_chunk(self):
+        text = "Apple and Big Data Corp."
+        self.assertEqual(split_text(text), [(0, len(text))])
+        expected = [(e.text, e.label_, e.start_char, e.end_char) for e in self.nlp(text).ents]
+        self.assertEqual(chunked_entities(text, self.nlp), expected)
+
+    def test_chunked_matches_single_pass(self):
+        expected = [(e.text, e.label_, e.start_char, e.end_char) for e in self.nlp(self.text).ents]
+        entities = chunked_entities(self.text, self.nlp, chunk_size=300, overlap=60)
+        self.assertEqual(entities, expected)
+        for ent_text, _, start, end in entities:
+            self.assertEqual(self.text[start:end], ent_text)
+
+    def test_context_chunked_tokens(self):
+        single = AnalysisContext(self.text, language="en", nlp=self.nlp, chunk_size=len(self.text))
+        chunked = AnalysisContext(self.text, language="en", nlp=self.nlp, chunk_size=300, overlap=60)
+        self.assertTrue(chunked.chunked)
+        self.assertEqual([row[0] for row in chunked.syntax_rows()], [row[0] for row in single.syntax_rows()])
+        self.assertEqual(chunked.brand_names(), single.brand_names())
+
+
+if __name__ == "__main__":
+    unittest.main()
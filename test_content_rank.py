@@ -0,0 +1,54 @@
+import re
+import random
+import unittest
+from main_file.content_rank import AUTOMATON_MIN_KEYWORDS, KeywordMatcher, iter_sections, rank_sections
+
+
+def naive_rank(content, keywords):
+    sections = re.split(r'\n+|\s{2,}', content.strip())
+    scores = [(section, len(section) + sum(section.count(k) for k in keywords)) for section in sections]
+    return [s for s, _ in sorted(scores, key=lambda item: item[1], reverse=True)]
+
+
+class TestContentRank(unittest.TestCase):
+    def test_iter_sections_matches_split(self):
+        content = "  first line\n\nsecond   third\tfourth\n  fifth  "
+        self.assertEqual(list(iter_sections(content)), re.split(r'\n+|\s{2,}', content.strip()))
+
+    def test_count_matches_str_count(self):
+        rng = random.Random(0)
+        for _ in range(200):
+            text = "".join(rng.choice("ab c") for _ in range(rng.randint(0, 40)))
+            keywords = ["".join(rng.choice("abc") for _ in range(rng.randint(1, 4))) for _ in range(rng.randint(1, 6))]
+            expected = sum(text.count(k) for k in keywords)
+            self.assertEqual(KeywordMatcher(keywords).count(text), expected, (text, keywords))
+            automaton = KeywordMatcher(keywords, min_automaton_keywords=1)
+            self.assertTrue(automaton.use_automaton)
+            self.assertEqual(automaton.count(text), expected, (text, keywords))
+
+    def test_overlapping_and_duplicate_keywords(self):
+        for threshold in (1, AUTOMATON_MIN_KEYWORDS):
+            matcher = KeywordMatcher(["aa", "a", "aa", ""], min_automaton_keywords=threshold)
+            self.assertEqual(matcher.count("aaa"), 3 + 1 + 1 + 4)
+
+    def test_automaton_threshold(self):
+        self.assertFalse(KeywordMatcher(["w%d" % i for i in range(20)]).use_automaton)
+        self.assertTrue(KeywordMatcher(["w%d" % i for i in range(AUTOMATON_MIN_KEYWORDS)]).use_automaton)
+
+    def test_case_insensitive(self):
+        self.assertEqual(KeywordMatcher(["ai"]).count("AI and ai"), 1)
+        self.assertEqual(KeywordMatcher(["ai"], case_sensitive=False).count("AI and ai"), 2)
+
+    def test_rank_matches_naive_sort(self):
+        content = "AI is the future.\nMachine learning is powerful.\n\nData science is in demand.  AI AI"
+        keywords = ["AI", "Machine learning", "is"]
+        self.assertEqual(rank_sections(content, keywords), naive_rank(content, keywords))
+        self.assertEqual(rank_sections(content, keywords, top_k=2), naive_rank(content, keywords)[:2])
+
+    def test_top_k_keeps_order_of_ties(self):
+        content = "bbb\nccc\naaa\ndd"
+        self.assertEqual(rank_sections(content, ["x"], top_k=2), ["bbb", "ccc"])
+
+
+if __name__ == "__main__":
+    unittest.main()
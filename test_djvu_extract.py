@@ -0,0 +1,90 @@
+import os
+import stat
+import tempfile
+import unittest
+from main_file import djvu_extract
+from main_file.djvu_extract import iter_djvu_pages, djvu_page_count, available_backend
+
+# 假的 djvutxt：按 --page=起-止 输出各页文本（每页后跟分页符），并把每次调用记录到日志；第 SLOW_PAGE 页很慢
+FAKE_DJVUTXT = """#!/bin/sh
+echo "$1" >> "$CALL_LOG"
+range=${1#--page=}
+start=${range%-*}
+end=${range#*-}
+page=$start
+while [ "$page" -le "$end" ]; do
+    if [ "$page" = "$SLOW_PAGE" ]; then sleep 2; fi
+    printf 'page %s\\n\\f' "$page"
+    page=$((page + 1))
+done
+"""
+FAKE_DJVUSED = "#!/bin/sh\necho \"$PAGE_COUNT\"\n"
+
+
+class TestDjvuExtract(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.log = os.path.join(self.temp_dir.name, "calls.log")
+        self.write_script("djvutxt", FAKE_DJVUTXT)
+        self.write_script("djvused", FAKE_DJVUSED)
+        self.old_env = dict(os.environ)
+        os.environ["PATH"] = self.temp_dir.name + os.pathsep + os.environ["PATH"]
+        os.environ.update(CALL_LOG=self.log, PAGE_COUNT="20", SLOW_PAGE="0")
+
+    def write_script(self, name, content):
+        path = os.path.join(self.temp_dir.name, name)
+        with open(path, 'w') as file:
+            file.write(content)
+        os.chmod(path, os.stat(path).st_mode | stat.S_IEXEC)
+
+    def calls(self):
+        with open(self.log) as file:
+            return file.read().split()
+
+    def test_pages_in_order(self):
+        self.assertEqual(available_backend(), 'djvutxt')
+        self.assertEqual(djvu_page_count("book.djvu"), 20)
+        pages = list(iter_djvu_pages("book.djvu", workers=3))
+        self.assertEqual(pages, [(i, f"page {i + 1}\n") for i in range(20)])
+        self.assertEqual(sorted(self.calls()), sorted(["--page=1-8", "--page=9-16", "--page=17-20"]))
+
+    def test_timeout_only_loses_slow_page(self):
+        os.environ["SLOW_PAGE"] = "10"
+        pages = dict(iter_djvu_pages("book.djvu", workers=2, page_timeout=0.1))
+        self.assertEqual(len(pages), 20)
+        self.assertEqual(pages[9], "")
+        self.assertEqual(pages[8], "page 9\n")
+        self.assertEqual(pages[10], "page 11\n")
+        self.assertIn("--page=10-10", self.calls())
+
+    def test_unknown_page_count_streams_whole_file(self):
+        os.remove(os.path.join(self.temp_dir.name, "djvused"))
+        self.write_script("djvutxt", "#!/bin/sh\nprintf 'one\\n\\ftwo\\n'\n")
+        old_which = djvu_extract.shutil.which
+        djvu_extract.shutil.which = lambda name: None if name == 'djvused' else old_which(name)
+        try:
+            self.assertIsNone(djvu_page_count("book.djvu"))
+            self.assertEqual(list(iter_djvu_pages("book.djvu")), [(0, "one\n"), (1, "two\n")])
+        finally:
+            djvu_extract.shutil.which = old_which
+
+    def test_single_page_header(self):
+        os.remove(os.path.join(self.temp_dir.name, "djvused"))
+        path = os.path.join(self.temp_dir.name, "single.djvu")
+        with open(path, 'wb') as file:
+            file.write(b'AT&TFORM\x00\x00\x00\x10DJVUINFO')
+        old_which = djvu_extract.shutil.which
+        djvu_extract.shutil.which = lambda name: None if name == 'djvused' else old_which(name)
+        try:
+            self.assertEqual(djvu_page_count(path), 1)
+        finally:
+            djvu_extract.shutil.which = old_which
+
+    def tearDown(self):
+        os.environ.clear()
+        os.environ.update(self.old_env)
+        self.temp_dir.cleanup()
+
+
+if __name__ == "__main__":
+    unittest.main()
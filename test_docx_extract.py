@@ -0,0 +1,81 @@
+import io
+import os
+import zipfile
+import tempfile
+import unittest
+from docx import Document
+from main_file.docx_extract import iter_docx_paragraphs, iter_part_paragraphs, docx_parts, docx_text
+
+W = 'xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"'
+MC = 'xmlns:mc="http://schemas.openxmlformats.org/markup-compatibility/2006"'
+
+
+class TestDocxExtract(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.temp_dir.name, "test.docx")
+
+    def test_matches_python_docx_paragraphs(self):
+        doc = Document()
+        doc.add_paragraph("First paragraph about Apple.")
+        doc.add_paragraph("")
+        run = doc.add_paragraph("Bold ").add_run("and plain")
+        run.bold = True
+        doc.save(self.path)
+        expected = "\n".join(para.text for para in Document(self.path).paragraphs)
+        self.assertEqual(docx_text(self.path, include_extra=False), expected)
+
+    def test_tables_headers_and_footers(self):
+        doc = Document()
+        doc.add_paragraph("Body text.")
+        table = doc.add_table(rows=1, cols=2)
+        table.cell(0, 0).text = "Cell A"
+        table.cell(0, 1).text = "Cell B"
+        doc.sections[0].header.paragraphs[0].text = "Header text"
+        doc.sections[0].footer.paragraphs[0].text = "Footer text"
+        doc.save(self.path)
+        texts = [text for _, text in iter_docx_paragraphs(self.path)]
+        self.assertEqual(texts[:3], ["Body text.", "Cell A", "Cell B"])
+        self.assertLess(texts.index("Header text"), texts.index("Footer text"))
+        self.assertNotIn("Header text", docx_text(self.path, include_extra=False))
+
+    def test_footnotes_tabs_breaks_and_textboxes(self):
+        document = (
+            f'<w:document {W} {MC}><w:body>'
+            '<w:p><w:r><w:t>a</w:t><w:tab/><w:t>b</w:t><w:br/><w:t>c</w:t></w:r></w:p>'
+            '<w:p><w:r><mc:AlternateContent><mc:Choice><w:txbxContent><w:p><w:r><w:t>box</w:t></w:r></w:p>'
+            '</w:txbxContent></mc:Choice><mc:Fallback><w:p><w:r><w:t>box</w:t></w:r></w:p></mc:Fallback>'
+            '</mc:AlternateContent></w:r><w:r><w:t>outer</w:t></w:r></w:p>'
+            '</w:body></w:document>'
+        )
+        footnotes = f'<w:footnotes {W}><w:footnote><w:p><w:r><w:t>note</w:t></w:r></w:p></w:footnote></w:footnotes>'
+        with zipfile.ZipFile(self.path, 'w') as archive:
+            archive.writestr('word/document.xml', document)
+            archive.writestr('word/footer2.xml', f'<w:ftr {W}><w:p><w:r><w:t>footer 2</w:t></w:r></w:p></w:ftr>')
+            archive.writestr('word/footer10.xml', f'<w:ftr {W}><w:p><w:r><w:t>footer 10</w:t></w:r></w:p></w:ftr>')
+            archive.writestr('word/footnotes.xml', footnotes)
+        with zipfile.ZipFile(self.path) as archive:
+            self.assertEqual(docx_parts(archive),
+                             ['word/document.xml', 'word/footnotes.xml', 'word/footer2.xml', 'word/footer10.xml'])
+        self.assertEqual(list(iter_docx_paragraphs(self.path)),
+                         [(0, "a\tb\nc"), (1, "box"), (2, "outer"), (3, "note"), (4, "footer 2"), (5, "footer 10")])
+
+    def test_iter_part_paragraphs_is_lazy(self):
+        body = "".join(f'<w:p><w:r><w:t>p{i}</w:t></w:r></w:p>' for i in range(1000))
+        stream = io.BytesIO(f'<w:document {W}><w:body>{body}</w:body></w:document>'.encode())
+        paragraphs = iter_part_paragraphs(stream)
+        self.assertEqual(next(paragraphs), "p0")
+        self.assertEqual(sum(1 for _ in paragraphs), 999)
+
+    def test_missing_document_part(self):
+        with zipfile.ZipFile(self.path, 'w') as archive:
+            archive.writestr('xl/workbook.xml', '<workbook/>')
+        with self.assertRaises(ValueError):
+            list(iter_docx_paragraphs(self.path))
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+
+if __name__ == "__main__":
+    unittest.main()
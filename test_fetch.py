@@ -0,0 +1,131 @@
+import time
+import asyncio
+import tempfile
+import threading
+import unittest
+import os
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from main_file import fetch
+from main_file.fetch import AsyncFetcher, HttpCache, fetch_pages
+
+ARTICLE = "Apple announced new phones with a faster chip and much longer battery life for everyday use."
+
+
+def page(i):
+    return f"<html><body><nav><a href='/'>Home</a></nav><p>Page {i}. {ARTICLE}</p></body></html>"
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    # 本地替身服务器：/page/N 返回带 ETag 的页面，/flaky 第一次返回503，/slow 延迟响应，/missing 返回404
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.hits[self.path] = server.hits.get(self.path, 0) + 1
+            server.active += 1
+            server.max_active = max(server.max_active, server.active)
+            hits = server.hits[self.path]
+        try:
+            time.sleep(server.delay)
+            if self.path.startswith('/page/'):
+                etag = f'"{self.path}-v1"'
+                if self.headers.get('If-None-Match') == etag:
+                    self.send_response(304)
+                    self.send_header('ETag', etag)
+                    self.end_headers()
+                    return
+                self.send_page(page(self.path.rsplit('/', 1)[1]), {'ETag': etag})
+            elif self.path == '/flaky' and hits == 1:
+                self.send_response(503)
+                self.send_header('Retry-After', '0')
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+            elif self.path == '/flaky':
+                self.send_page(page('flaky'))
+            elif self.path == '/slow':
+                time.sleep(1.0)
+                self.send_page(page('slow'))
+            else:
+                self.send_response(404)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+        finally:
+            with server.lock:
+                server.active -= 1
+
+    def send_page(self, body, headers=None):
+        data = body.encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestFetch(unittest.TestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), FixtureHandler)
+        self.server.lock = threading.Lock()
+        self.server.hits = {}
+        self.server.active = self.server.max_active = 0
+        self.server.delay = 0.0
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        self.base = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.cache = HttpCache(path=os.path.join(self.temp_dir.name, "http.sqlite"))
+        self.old_backoff = fetch.BACKOFF
+        fetch.BACKOFF = 0.01
+
+    def test_fetch_many_pages_with_conditional_requests(self):
+        urls = [f"{self.base}/page/{i}" for i in range(40)]
+        results = fetch_pages(urls, cache=self.cache)
+        self.assertEqual([r.url for r in results], urls)
+        self.assertTrue(all(r.status == 200 and not r.from_cache for r in results))
+        self.assertIn("Page 7.", results[7].text)
+        self.assertNotIn("Home", results[7].text)
+
+        again = fetch_pages(urls, cache=self.cache)
+        self.assertTrue(all(r.status == 304 and r.from_cache for r in again))
+        self.assertEqual([r.text for r in again], [r.text for r in results])
+
+    def test_per_host_limit(self):
+        self.server.delay = 0.05
+        urls = [f"{self.base}/page/{i}" for i in range(12)]
+        fetch_pages(urls, per_host=3, bypass_cache=True)
+        self.assertLessEqual(self.server.max_active, 3)
+
+    def test_retry_and_errors(self):
+        flaky, missing = fetch_pages([f"{self.base}/flaky", f"{self.base}/missing"], bypass_cache=True)
+        self.assertEqual(flaky.status, 200)
+        self.assertEqual(self.server.hits['/flaky'], 2)
+        self.assertEqual(missing.status, 404)
+        self.assertEqual(missing.error, "HTTP 404")
+        self.assertEqual(self.server.hits['/missing'], 1)
+
+    def test_timeout(self):
+        result = fetch_pages([f"{self.base}/slow"], timeout=0.2, retries=1, bypass_cache=True)[0]
+        self.assertIsNone(result.status)
+        self.assertIn("Timeout", result.error)
+
+    def test_fetch_all_streams_results(self):
+        async def run():
+            async with AsyncFetcher(bypass_cache=True) as fetcher:
+                return [result async for result in fetcher.fetch_all([f"{self.base}/page/1", f"{self.base}/page/2"])]
+
+        results = asyncio.run(run())
+        self.assertEqual(sorted(r.url for r in results), [f"{self.base}/page/1", f"{self.base}/page/2"])
+
+    def tearDown(self):
+        fetch.BACKOFF = self.old_backoff
+        self.server.shutdown()
+        self.server.server_close()
+        self.temp_dir.cleanup()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,74 @@
+import unittest
+import tempfile
+import zipfile
+import os
+from docx import Document
+from main_file.formats import FormatRegistry, get_format_registry, detect_format, UnsupportedFormatError
+from main_file.batch import _parse_file
+from test_pdf_extract import write_text_pdf
+
+
+class TestFormats(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+
+    def path(self, name):
+        return os.path.join(self.temp_dir.name, name)
+
+    def write(self, name, data):
+        with open(self.path(name), 'wb') as file:
+            file.write(data)
+        return self.path(name)
+
+    def test_sniff_by_content(self):
+        write_text_pdf(self.path("report.html"), ["Hello"])
+        self.assertEqual(detect_format(self.path("report.html")).name, "pdf")
+        doc = Document()
+        doc.add_paragraph("Text")
+        doc.save(self.path("letter.doc"))
+        self.assertEqual(detect_format(self.path("letter.doc")).name, "docx")
+        self.write("page.txt", b"\xef\xbb\xbf  <!DOCTYPE html><html><body>Hi</body></html>")
+        self.assertEqual(detect_format(self.path("page.txt")).name, "html")
+        self.write("book.bin", b"AT&TFORM\x00\x00\x00\x10DJVMDIRM")
+        self.assertEqual(detect_format(self.path("book.bin")).name, "djvu")
+
+    def test_extension_fallback(self):
+        self.write("page.htm", b"plain text")
+        self.assertEqual(detect_format(self.path("page.htm")).name, "html")
+        self.write("notes.txt", b"plain text")
+        self.assertIsNone(detect_format(self.path("notes.txt")))
+
+    def test_zip_without_word_document_is_not_docx(self):
+        with zipfile.ZipFile(self.path("sheet.docx"), 'w') as archive:
+            archive.writestr("xl/workbook.xml", "<workbook/>")
+        # 内容不是 OOXML 文档时回退到扩展名
+        self.assertEqual(detect_format(self.path("sheet.docx")).name, "docx")
+        self.assertIsNone(get_format_registry().sniff(self.path("sheet.docx")))
+
+    def test_legacy_doc_rejected_without_parsing(self):
+        self.write("old.doc", b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1" + b"\x00" * 100)
+        with self.assertRaises(UnsupportedFormatError):
+            _parse_file(self.path("old.doc"), bypass_cache=True)
+
+    def test_mislabelled_file_parsed_with_right_parser(self):
+        self.write("page.pdf", b"<html><body><p>Apple store</p></body></html>")
+        self.assertEqual(_parse_file(self.path("page.pdf"), bypass_cache=True), "Apple store")
+
+    def test_register_custom_format(self):
+        registry = FormatRegistry()
+        registry.register('txt', ('txt',), lambda head, path: head.startswith(b'TXT:'),
+                          parser=lambda path: open(path, encoding='utf-8').read()[4:])
+        self.write("note.data", b"TXT:hello")
+        file_format, parser = registry.parser_for(self.path("note.data"))
+        self.assertEqual(file_format.name, 'txt')
+        self.assertEqual(parser(self.path("note.data")), "hello")
+        registry.register('json', ('json',), parser='json:loads')
+        self.write("a.json", b"{}")
+        self.assertIs(registry.parser_for(self.path("a.json"))[1], __import__('json').loads)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+
+if __name__ == "__main__":
+    unittest.main()
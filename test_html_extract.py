@@ -0,0 +1,75 @@
+import re
+import unittest
+import tempfile
+import os
+from bs4 import BeautifulSoup
+from main_file.html_extract import extract_html, extract_html_file, html_to_text, HtmlExtractor
+from main_file import html_extract
+from main_file.html_1 import parse_html as parse_html_1
+
+PAGE = """<!DOCTYPE html>
+<html><head><title>Shop &amp; Co</title><style>p { color: red }</style>
+<script>var x = "<p>hidden</p>";</script></head>
+<body><h1>Welcome</h1><p>Apple <b>phones</b> on sale.</p>
+<a href="/a">First</a> <a>no href</a> <img src="x.png"><img alt="none">
+<p>Second paragraph<p>Third</body></html>"""
+
+BACKENDS = ['html.parser', 'lxml']
+
+
+def words(text):
+    return re.sub(r'\s+', ' ', text).strip()
+
+
+class TestHtmlExtract(unittest.TestCase):
+    def test_single_pass_extraction(self):
+        for backend in BACKENDS:
+            content = extract_html(PAGE, backend=backend)
+            self.assertEqual(content.title, "Shop & Co", backend)
+            self.assertEqual(content.links, ["/a"], backend)
+            self.assertEqual(content.images, ["x.png"], backend)
+            self.assertEqual([words(p) for p in content.paragraphs],
+                             ["Apple phones on sale.", "Second paragraph", "Third"], backend)
+            self.assertNotIn("hidden", content.text)
+            self.assertNotIn("color", content.text)
+
+    def test_text_matches_get_text(self):
+        # 除了块级元素之间多出的换行，可见文本与 BeautifulSoup.get_text() 一致
+        expected = "".join(BeautifulSoup(PAGE, 'html.parser').get_text().split())
+        for backend in BACKENDS:
+            self.assertEqual("".join(html_to_text(PAGE, backend=backend).split()), expected, backend)
+
+    def test_text_only_mode(self):
+        content = extract_html(PAGE, text_only=True)
+        self.assertEqual((content.title, content.links, content.paragraphs), (None, [], []))
+        self.assertIn("Welcome", content.text)
+
+    def test_blocks_are_separated(self):
+        self.assertEqual(html_to_text("<div>one</div><div>two</div>").split(), ["one", "two"])
+
+    def test_chunked_feed_and_file(self):
+        extractor = HtmlExtractor()
+        for i in range(0, len(PAGE), 7):
+            extractor.feed(PAGE[i:i + 7])
+        self.assertEqual(words(extractor.close().text), words(html_to_text(PAGE)))
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "page.html")
+            with open(path, 'w', encoding='utf-8') as file:
+                file.write(PAGE)
+            old_size = html_extract.READ_SIZE
+            html_extract.READ_SIZE = 16
+            try:
+                self.assertEqual(extract_html_file(path).links, ["/a"])
+            finally:
+                html_extract.READ_SIZE = old_size
+            result = parse_html_1(path)
+            self.assertEqual(result['title'], "Shop & Co")
+            self.assertEqual(result['images'], ["x.png"])
+
+    def test_empty_document(self):
+        for backend in BACKENDS:
+            self.assertEqual(html_to_text("", backend=backend), "")
+
+
+if __name__ == "__main__":
+    unittest.main()
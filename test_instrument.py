@@ -0,0 +1,127 @@
+import os
+import json
+import unittest
+import tempfile
+from main_file import instrument
+from main_file.text_cache import TextCache, cached_parse
+from main_file.content_rank import rank_sections
+
+
+class TestInstrument(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.recorder = instrument.enable()
+
+    def tearDown(self):
+        instrument.disable()
+        self.temp_dir.cleanup()
+
+    def test_disabled_is_noop(self):
+        instrument.disable()
+        self.assertIs(instrument.span('parse_pdf'), instrument._NOOP)
+        instrument.count('cache_hits')
+
+        @instrument.instrumented('stage')
+        def stage(text):
+            return text.upper()
+
+        self.assertEqual(stage("abc"), "ABC")
+        self.assertFalse(instrument.enabled())
+
+    def test_span_aggregation_and_errors(self):
+        for _ in range(3):
+            with instrument.span('nlp', chars_in=10) as current:
+                current.set(chars_out=4)
+        with self.assertRaises(ValueError):
+            with instrument.span('nlp'):
+                raise ValueError("bad input")
+        total = self.recorder.spans['nlp']
+        self.assertEqual((total['count'], total['errors'], total['chars_in'], total['chars_out']), (4, 1, 30, 12))
+        self.assertGreaterEqual(total['wall'], total['max_wall'])
+        self.assertEqual(self.recorder.events[-1]['error'], 'ValueError')
+
+    def test_events_bounded(self):
+        recorder = instrument.Recorder(max_events=3)
+        for index in range(5):
+            recorder.record({'type': 'event', 'name': f'e{index}'})
+        self.assertEqual([event['name'] for event in recorder.events], ['e2', 'e3', 'e4'])
+
+    def test_counters(self):
+        instrument.count('model_loads', model='en_core_web_sm')
+        instrument.count('model_loads', model='en_core_web_sm')
+        instrument.count('model_loads', 3, model='ru_core_news_sm')
+        self.assertEqual(self.recorder.counters[('model_loads', (('model', 'en_core_web_sm'),))], 2)
+        self.assertEqual(self.recorder.counters[('model_loads', (('model', 'ru_core_news_sm'),))], 3)
+
+    def test_decorator_fields(self):
+        @instrument.instrumented('extract_keywords')
+        def keywords(text):
+            return text.split()
+
+        @instrument.instrumented('parse_txt')
+        def parse(file_path):
+            return "hello"
+
+        keywords("a b c")
+        parse("/tmp/doc.txt")
+        events = {event['name']: event for event in self.recorder.events}
+        self.assertEqual((events['extract_keywords']['chars_in'], events['extract_keywords']['items_out']), (5, 3))
+        self.assertEqual((events['parse_txt']['path'], events['parse_txt']['chars_out']), ("/tmp/doc.txt", 5))
+
+    def test_library_stage_recorded(self):
+        rank_sections("Apple news.\n\nNothing here.", ["Apple"])
+        self.assertEqual(self.recorder.spans['rank_sections']['count'], 1)
+
+    def test_cache_counters(self):
+        cache = TextCache(path=os.path.join(self.temp_dir.name, "cache.sqlite"), max_bytes=1024 * 1024)
+        file_path = os.path.join(self.temp_dir.name, "doc.txt")
+        with open(file_path, 'w', encoding='utf-8') as file:
+            file.write("text")
+        for _ in range(3):
+            cached_parse(file_path, lambda path: "text", "txt", cache=cache)
+        labels = (('cache', TextCache.FILE_NAME),)
+        self.assertEqual(self.recorder.counters[('cache_hits', labels)], 2)
+        self.assertEqual(self.recorder.counters[('cache_misses', labels)], 1)
+
+    def test_jsonl_export(self):
+        with instrument.span('parse_pdf', path="a.pdf"):
+            pass
+        path = os.path.join(self.temp_dir.name, "metrics.jsonl")
+        instrument.export(path)
+        with open(path, encoding='utf-8') as file:
+            events = [json.loads(line) for line in file]
+        self.assertEqual([event['name'] for event in events], ['parse_pdf'])
+        self.assertEqual(set(events[0]), {'type', 'name', 'ts', 'wall', 'cpu', 'path'})
+
+    def test_streaming_jsonl(self):
+        path = os.path.join(self.temp_dir.name, "stream.jsonl")
+        instrument.enable(path)
+        with instrument.span('nlp'):
+            pass
+        instrument.disable()
+        with open(path, encoding='utf-8') as file:
+            self.assertEqual(json.loads(file.readline())['name'], 'nlp')
+
+    def test_prometheus_export(self):
+        with instrument.span('parse_pdf', chars_in=0) as current:
+            current.set(chars_out=7)
+        instrument.count('cache_hits', cache='text_cache.sqlite')
+        text = instrument.prometheus_text()
+        self.assertIn('# TYPE analyze_span_wall_seconds_total counter', text)
+        self.assertIn('analyze_span_count_total{stage="parse_pdf"} 1', text)
+        self.assertIn('analyze_span_chars_out_total{stage="parse_pdf"} 7', text)
+        self.assertIn('analyze_cache_hits_total{cache="text_cache.sqlite"} 1', text)
+        with self.assertRaises(ValueError):
+            instrument.export(os.path.join(self.temp_dir.name, "metrics.csv"))
+
+    def test_summary_table(self):
+        with instrument.span('nlp', chars_in=100):
+            pass
+        instrument.count('model_loads', model='en_core_web_sm')
+        lines = instrument.summary_table().splitlines()
+        self.assertTrue(lines[1].startswith('nlp'))
+        self.assertEqual(lines[-1], 'model_loads[model=en_core_web_sm]: 1')
+
+
+if __name__ == '__main__':
+    unittest.main()
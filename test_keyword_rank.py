@@ -0,0 +1,63 @@
+import time
+import unittest
+from unittest import mock
+import numpy as np
+from main_file import keyword_rank
+from main_file.keyword_rank import tokenize, cooccurrence_matrix, pagerank, rank_keywords, KeywordGraph
+
+
+class TestKeywordRank(unittest.TestCase):
+    def test_tokenize(self):
+        tokens = tokenize("The Apple phone, the 2024 Apple store!", stopwords={"the"})
+        self.assertEqual(tokens, ["apple", "phone", "apple", "store"])
+
+    def test_cooccurrence_matrix(self):
+        vocabulary, matrix = cooccurrence_matrix(["a", "b", "a", "c"], window=2)
+        self.assertEqual(vocabulary, ["a", "b", "c"])
+        self.assertTrue((matrix != matrix.T).nnz == 0)
+        self.assertEqual(matrix[0, 1], 2)
+        self.assertEqual(matrix[0, 2], 1)
+        self.assertEqual(matrix[1, 2], 0)
+
+    def test_pagerank_star(self):
+        # 星形图的中心节点得分最高，得分总和为1
+        _, matrix = cooccurrence_matrix(["hub", "x", "hub", "y", "hub", "z"], window=2)
+        scores = pagerank(matrix)
+        self.assertAlmostEqual(scores.sum(), 1.0)
+        self.assertEqual(int(np.argmax(scores)), 0)
+
+    def test_rank_keywords(self):
+        text = "Marketing data drives marketing strategy. Data teams share marketing data daily."
+        keywords = rank_keywords(text, top_n=3)
+        self.assertEqual(len(keywords), 3)
+        self.assertEqual({k.word for k in keywords[:2]}, {"marketing", "data"})
+        self.assertEqual([k.score for k in keywords], sorted((k.score for k in keywords), reverse=True))
+        self.assertEqual(rank_keywords("", top_n=3), [])
+
+    def test_incremental_graph(self):
+        # 逐段加入与一次加入整段文本的结果相同（窗口不跨越段落），中途合并矩阵不影响结果
+        paragraphs = ["Marketing data drives marketing strategy.", "Data teams share marketing data daily.",
+                      "Strategy teams read the data."]
+        whole = KeywordGraph(window=3)
+        for paragraph in paragraphs:
+            whole.add(paragraph)
+        with mock.patch.object(keyword_rank, 'MERGE_EDGES', 1):
+            merged = KeywordGraph(window=3)
+            for paragraph in paragraphs:
+                merged.add(paragraph)
+        self.assertEqual(merged.rank(), whole.rank())
+        self.assertEqual(whole.rank(top_n=1)[0].word, "data")
+        self.assertEqual(KeywordGraph().rank(), [])
+
+    def test_large_document(self):
+        words = ["word%d" % i for i in range(2000)]
+        rng = np.random.default_rng(0)
+        text = ". ".join(" ".join(words[i] for i in rng.integers(0, len(words), 10)) for _ in range(100000))
+        start = time.perf_counter()
+        keywords = rank_keywords(text, top_n=10)
+        self.assertEqual(len(keywords), 10)
+        self.assertLess(time.perf_counter() - start, 30)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,38 @@
+import unittest
+from main_file.lang_detect import detect_language, normalize_lang, sample_text, as_language, LanguageResult
+
+
+class TestLangDetect(unittest.TestCase):
+    def test_normalize_lang(self):
+        self.assertEqual(normalize_lang("zh-cn"), "zh")
+        self.assertEqual(normalize_lang("zh-TW"), "zh")
+        self.assertEqual(normalize_lang("en"), "en")
+
+    def test_sample_text_is_bounded(self):
+        text = "abcdefghij" * 10000
+        sample = sample_text(text, n_chunks=4, chunk_size=100)
+        self.assertEqual(len(sample), 4 * 100 + 3)
+        self.assertTrue(sample.endswith(text[-100:]))
+        self.assertEqual(sample_text("short", n_chunks=4, chunk_size=100), "short")
+
+    def test_detect_language_repeatable(self):
+        text = "This is a sample text written in plain English for testing. " * 200
+        first = detect_language(text)
+        self.assertEqual(first.lang, "en")
+        self.assertGreater(first.confidence, 0.5)
+        for _ in range(3):
+            self.assertEqual(detect_language(text), first)
+
+    def test_detect_chinese_normalized(self):
+        result = detect_language("这是一个用于测试语言检测的中文句子，我们希望它被识别为中文。")
+        self.assertEqual(result.lang, "zh")
+
+    def test_detect_language_fallback(self):
+        self.assertEqual(detect_language("12345"), LanguageResult("en", 0.0))
+
+    def test_as_language(self):
+        self.assertEqual(as_language("zh-cn"), LanguageResult("zh", 1.0))
+
+
+if __name__ == "__main__":
+    unittest.main()
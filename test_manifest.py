@@ -0,0 +1,150 @@
+import os
+import json
+import time
+import unittest
+import tempfile
+from unittest import mock
+import spacy
+from main_file.batch import run_incremental, watch
+from main_file.manifest import Manifest, plan_changes
+from test_support import blank_model
+
+
+@spacy.Language.component("poison_check")
+def poison_check(doc):
+    # 含 poison 的文档在NER阶段出错
+    if "poison" in doc.text:
+        raise ValueError("bad document")
+    return doc
+
+
+class InterruptedModel:
+    # 处理完第一篇文档后模拟运行被中断
+    def __init__(self):
+        self.nlp = blank_model("en")
+
+    def pipe(self, texts, **kwargs):
+        for index, doc in enumerate(self.nlp.pipe(texts)):
+            if index == 1:
+                raise KeyboardInterrupt
+            yield doc
+
+
+class TestManifest(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.source = os.path.join(self.temp_dir.name, "docs")
+        self.state_dir = os.path.join(self.temp_dir.name, "state")
+        self.output = os.path.join(self.temp_dir.name, "results.jsonl")
+        os.makedirs(self.source)
+        self.paths = [self.write(f"doc{i}.html", i) for i in range(3)]
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def write(self, name, number, body=None):
+        path = os.path.join(self.source, name)
+        with open(path, 'w', encoding='utf-8') as file:
+            file.write(body if body is not None else
+                       f"<html><body><p>Apple sells phones in store number {number}. "
+                       f"The store is open every day of the week.</p></body></html>")
+        # 把修改时间设到过去，避免被当作仍在写入的文件
+        past = time.time() - 60 - number
+        os.utime(path, (past, past))
+        return path
+
+    def run_incremental(self, **kwargs):
+        kwargs.setdefault('get_model', blank_model)
+        return run_incremental(self.source, self.state_dir, self.output, bypass_cache=True, **kwargs)
+
+    def records(self):
+        with open(self.output, 'r', encoding='utf-8') as file:
+            return [json.loads(line) for line in file]
+
+    def test_only_changes_are_processed(self):
+        first = self.run_incremental()
+        self.assertEqual((first.done, first.failed, first.unchanged), (3, 0, 0))
+        self.assertEqual([record['path'] for record in self.records()], self.paths)
+        self.assertEqual(self.run_incremental()[:4], (0, 0, 3, 0))
+
+        # 只改修改时间：计算哈希后确认内容未变，不重新分析
+        os.utime(self.paths[0], (time.time() - 30, time.time() - 30))
+        self.assertEqual(self.run_incremental()[:4], (0, 0, 2, 1))
+
+        self.write("doc1.html", 1, "<html><body><p>Apple changed its retail store opening hours.</p></body></html>")
+        self.write("doc3.html", 3)
+        os.remove(self.paths[2])
+        result = self.run_incremental()
+        self.assertEqual((result.done, result.unchanged, result.deleted), (2, 1, 1))
+        records = self.records()
+        self.assertEqual([os.path.basename(record['path']) for record in records],
+                         ["doc0.html", "doc1.html", "doc3.html"])
+        self.assertEqual(records[0]['brand_names'], ["Apple"])
+        with Manifest(self.state_dir) as manifest:
+            outputs = [entry.output for entry in manifest.entries().values()]
+        self.assertEqual(len(outputs), 3)
+        self.assertTrue(all(os.path.isfile(output) for output in outputs))
+        stored = [os.path.join(root, name) for root, _, names in os.walk(os.path.join(self.state_dir, "results"))
+                  for name in names]
+        self.assertEqual(sorted(stored), sorted(outputs))
+
+    def test_resume_after_interruption(self):
+        with self.assertRaises(KeyboardInterrupt):
+            self.run_incremental(get_model=lambda lang, components=None: InterruptedModel())
+        with Manifest(self.state_dir) as manifest:
+            self.assertEqual(len(manifest.entries()), 1)
+        result = self.run_incremental()
+        self.assertEqual((result.done, result.unchanged), (2, 1))
+        self.assertEqual(len(self.records()), 3)
+
+    def test_errors_and_version_changes(self):
+        self.write("empty.html", 9, "<html><body></body></html>")
+        first = self.run_incremental()
+        self.assertEqual((first.done, first.failed), (3, 1))
+        self.assertEqual(self.run_incremental()[:3], (0, 0, 4))
+        self.assertEqual(self.run_incremental(retry_errors=True)[:3], (0, 1, 3))
+        with mock.patch('main_file.manifest.ANALYSIS_VERSION', -1):
+            self.assertEqual(self.run_incremental()[:3], (3, 1, 0))
+
+    def test_oversized_and_failing_documents(self):
+        # 超过 max_length 的新文件分块处理；NER出错的文件记为失败，之后的运行不再重复处理
+        def small_model(lang, components=None):
+            nlp = blank_model(lang)
+            nlp.max_length = 2000
+            return nlp
+
+        def failing_model(lang, components=None):
+            nlp = blank_model(lang)
+            nlp.add_pipe("poison_check")
+            return nlp
+
+        sentences = " ".join(f"Apple opened store {i} in the city." for i in range(200))
+        long_path = self.write("long.html", 5, f"<html><body><p>{sentences}</p></body></html>")
+        result = self.run_incremental(get_model=small_model)
+        self.assertEqual((result.done, result.failed), (4, 0))
+        records = {record['path']: record for record in self.records()}
+        self.assertEqual(records[long_path]['brand_names'], ["Apple"] * 200)
+
+        bad_path = self.write("bad.html", 6, "<html><body><p>Apple poison in a new document.</p></body></html>")
+        result = self.run_incremental(get_model=failing_model)
+        self.assertEqual((result.done, result.failed, result.unchanged), (0, 1, 4))
+        self.assertEqual({record['path']: record for record in self.records()}[bad_path]['error'], "bad document")
+        self.assertEqual(self.run_incremental(get_model=failing_model)[:3], (0, 0, 5))
+
+    def test_files_still_being_written_wait(self):
+        path = os.path.join(self.source, "landing.html")
+        with open(path, 'w', encoding='utf-8') as file:
+            file.write("<html><body><p>Apple</p></body></html>")
+        with Manifest(self.state_dir) as manifest:
+            plan = plan_changes(manifest, self.paths + [path])
+        self.assertEqual(plan.pending, [path])
+        self.assertEqual([state.path for state in plan.process], self.paths)
+
+    def test_watch_rounds(self):
+        watch(self.source, self.state_dir, self.output, interval=0, max_rounds=2, get_model=blank_model,
+              bypass_cache=True)
+        self.assertEqual(len(self.records()), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,113 @@
+import unittest
+import tempfile
+import threading
+import time
+import spacy
+from main_file.nlp_models import (ModelRegistry, model_name_for, resolve_components, merge_components,
+                                  NER_COMPONENTS, SYNTAX_COMPONENTS)
+
+
+def save_test_pipeline(path):
+    # tagger 通过 Tok2VecListener 监听 tok2vec，ner 使用自己的嵌入层
+    nlp = spacy.blank("en")
+    nlp.add_pipe("tok2vec")
+    listener = {"@architectures": "spacy.Tok2VecListener.v1", "width": 96, "upstream": "tok2vec"}
+    tagger = nlp.add_pipe("tagger", config={"model": {"@architectures": "spacy.Tagger.v2", "tok2vec": listener}})
+    tagger.add_label("NN")
+    ner = nlp.add_pipe("ner")
+    ner.add_label("ORG")
+    nlp.initialize()
+    nlp.to_disk(path)
+
+
+class TestModelRegistry(unittest.TestCase):
+    def setUp(self):
+        self.load_calls = []
+
+        def fake_loader(model_name, components):
+            self.load_calls.append((model_name, components))
+            time.sleep(0.01)
+            return object()
+
+        self.fake_loader = fake_loader
+
+    def test_model_name_for(self):
+        self.assertEqual(model_name_for("zh"), "zh_core_web_sm")
+        self.assertEqual(model_name_for("ru"), "ru_core_news_sm")
+        self.assertEqual(model_name_for("fr"), "en_core_web_sm")
+
+    def test_loads_once(self):
+        registry = ModelRegistry(loader=self.fake_loader, size_of=lambda nlp: 0)
+        first = registry.get("en")
+        second = registry.get("en")
+        self.assertIs(first, second)
+        self.assertEqual(len(self.load_calls), 1)
+        self.assertEqual(registry.hits, 1)
+
+    def test_components_are_part_of_key(self):
+        registry = ModelRegistry(loader=self.fake_loader, size_of=lambda nlp: 0)
+        full = registry.get("en")
+        ner_only = registry.get("en", components=["ner"])
+        self.assertIsNot(full, ner_only)
+        self.assertEqual(self.load_calls, [("en_core_web_sm", None), ("en_core_web_sm", ("ner",))])
+
+    def test_fallback_languages_share_model(self):
+        # 回退到 en_core_web_sm 的语言共享同一份模型
+        registry = ModelRegistry(loader=self.fake_loader, size_of=lambda nlp: 0)
+        models = [registry.get(lang, components=["ner"]) for lang in ("en", "fr", "de", "es")]
+        self.assertEqual(len(set(id(model) for model in models)), 1)
+        self.assertEqual(self.load_calls, [("en_core_web_sm", ("ner",))])
+
+    def test_concurrent_get_loads_once(self):
+        registry = ModelRegistry(loader=self.fake_loader, size_of=lambda nlp: 0)
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(registry.get("ru"))) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(self.load_calls), 1)
+        self.assertEqual(len(set(id(r) for r in results)), 1)
+
+    def test_lru_eviction(self):
+        # 每个模型按1MB计，上限2MB
+        registry = ModelRegistry(max_memory_mb=2, loader=self.fake_loader, size_of=lambda nlp: 1024 * 1024)
+        registry.get("en")
+        registry.get("ru")
+        registry.get("en")
+        registry.get("zh")
+        loaded = [key[0] for key in registry.loaded()]
+        self.assertEqual(loaded, ["en_core_web_sm", "zh_core_web_sm"])
+        self.assertEqual(registry.evictions, 1)
+
+
+class TestComponentProfiles(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.model_path = self.temp_dir.name
+        save_test_pipeline(self.model_path)
+
+    def test_merge_components(self):
+        self.assertEqual(merge_components(("ner",), ("tagger", "ner")), ("ner", "tagger"))
+
+    def test_resolve_components(self):
+        self.assertEqual(resolve_components(self.model_path, NER_COMPONENTS), ("ner",))
+        # tagger 监听 tok2vec，需要一起加载；模型中不存在的组件被忽略
+        self.assertEqual(resolve_components(self.model_path, SYNTAX_COMPONENTS), ("tagger", "tok2vec"))
+        self.assertIsNone(resolve_components(self.model_path, None))
+
+    def test_registry_excludes_unneeded_components(self):
+        registry = ModelRegistry(size_of=lambda nlp: 0)
+        ner_only = registry.get("en", model_name=self.model_path, components=NER_COMPONENTS)
+        self.assertEqual(ner_only.pipe_names, ["ner"])
+        syntax = registry.get("en", model_name=self.model_path, components=SYNTAX_COMPONENTS)
+        self.assertEqual(syntax.pipe_names, ["tok2vec", "tagger"])
+        self.assertEqual(len(registry.loaded()), 2)
+        syntax("A short sentence.")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,95 @@
+import unittest
+import tempfile
+import os
+from concurrent.futures import Future
+from unittest import mock
+from PyPDF2 import PdfWriter
+from PyPDF2.generic import DecodedStreamObject, DictionaryObject, NameObject
+from main_file import pdf_extract
+from main_file.pdf_extract import extract_pdf_pages, iter_pdf_pages, page_ranges
+
+
+def write_text_pdf(path, page_texts):
+    writer = PdfWriter()
+    font = DictionaryObject({
+        NameObject("/Type"): NameObject("/Font"),
+        NameObject("/Subtype"): NameObject("/Type1"),
+        NameObject("/BaseFont"): NameObject("/Helvetica"),
+    })
+    font_ref = writer._add_object(font)
+    for text in page_texts:
+        writer.add_blank_page(width=400, height=400)
+        page = writer.pages[-1]
+        stream = DecodedStreamObject()
+        stream.set_data(f"BT /F1 12 Tf 20 200 Td ({text}) Tj ET".encode("latin-1"))
+        page[NameObject("/Contents")] = writer._add_object(stream)
+        page[NameObject("/Resources")] = DictionaryObject({
+            NameObject("/Font"): DictionaryObject({NameObject("/F1"): font_ref})
+        })
+    with open(path, 'wb') as file:
+        writer.write(file)
+
+
+class TestPdfExtract(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.pdf_path = os.path.join(self.temp_dir.name, "pages.pdf")
+        self.page_texts = [f"Page number {i}" for i in range(10)]
+        write_text_pdf(self.pdf_path, self.page_texts)
+        self.min_pages = pdf_extract.MIN_PAGES_PER_WORKER
+
+    def test_page_ranges(self):
+        self.assertEqual(page_ranges(10, 3), [(0, 4), (4, 7), (7, 10)])
+        self.assertEqual(page_ranges(2, 4), [(0, 1), (1, 2)])
+
+    def test_sequential_pages(self):
+        pages = extract_pdf_pages(self.pdf_path)
+        self.assertEqual([p.strip() for p in pages], self.page_texts)
+
+    def test_parallel_matches_sequential(self):
+        pdf_extract.MIN_PAGES_PER_WORKER = 1
+        self.assertEqual(extract_pdf_pages(self.pdf_path, workers=3), extract_pdf_pages(self.pdf_path))
+
+    def test_iter_pdf_pages_parallel_in_order(self):
+        pdf_extract.MIN_PAGES_PER_WORKER = 1
+        pages = list(iter_pdf_pages(self.pdf_path, workers=2))
+        self.assertEqual([index for index, _ in pages], list(range(10)))
+        self.assertEqual([text.strip() for _, text in pages], self.page_texts)
+
+    def test_early_close_cancels_pending_ranges(self):
+        # 调用方只读第一页就停止时，尚未开始的范围被取消
+        submitted = []
+
+        class LazyExecutor:
+            # 只执行第一个任务，其余任务保持未开始状态
+            def __init__(self, max_workers):
+                pass
+
+            def __enter__(self):
+                return self
+
+            def __exit__(self, *exc):
+                return False
+
+            def submit(self, fn, args):
+                future = Future()
+                if not submitted:
+                    future.set_result(fn(args))
+                submitted.append(future)
+                return future
+
+        pdf_extract.MIN_PAGES_PER_WORKER = 1
+        with mock.patch.object(pdf_extract, 'ProcessPoolExecutor', LazyExecutor):
+            pages = iter_pdf_pages(self.pdf_path, workers=2)
+            self.assertEqual(next(pages)[0], 0)
+            pages.close()
+        self.assertTrue(all(future.cancelled() for future in submitted[1:]))
+        self.assertGreater(len(submitted), 1)
+
+    def tearDown(self):
+        pdf_extract.MIN_PAGES_PER_WORKER = self.min_pages
+        self.temp_dir.cleanup()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,142 @@
+import unittest
+import tempfile
+import os
+import json
+from main_file import result_cache, text_cache
+from main_file.lang_detect import LanguageResult
+from unittest import mock
+from main_file.result_cache import (ResultCache, cached_analysis, result_key, file_result_key, load_file_result,
+                                  store_file_result)
+from main_file.batch import run_batch
+from test_support import blank_model
+
+EN = LanguageResult("en", 1.0)
+
+
+class TestResultCache(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.cache = ResultCache(path=os.path.join(self.temp_dir.name, "results.sqlite"))
+        self.calls = 0
+
+    def compute(self):
+        self.calls += 1
+        return {'brand_names': ["Apple"], 'keywords': ["phone"]}
+
+    def test_hit_skips_compute(self):
+        first = cached_analysis("some text", EN, self.compute, "en_core_web_sm", cache=self.cache)
+        second = cached_analysis("some text", EN, self.compute, "en_core_web_sm", cache=self.cache)
+        self.assertEqual(first, second)
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(self.cache.stats(), {'hits': 1, 'misses': 1})
+
+    def test_key_components(self):
+        base = result_key("text", EN, "en_core_web_sm", {"a"})
+        self.assertNotEqual(base, result_key("text", EN, "en_core_web_lg", {"a"}))
+        self.assertNotEqual(base, result_key("text", EN, "en_core_web_sm", {"a", "b"}))
+        self.assertNotEqual(base, result_key("text", LanguageResult("ru", 1.0), "en_core_web_sm", {"a"}))
+        self.assertEqual(base, result_key("text", EN, "en_core_web_sm", ["a"]))
+
+    def test_missing_field_recomputes(self):
+        cached_analysis("text", EN, self.compute, "m", cache=self.cache)
+        cached_analysis("text", EN, lambda: dict(self.compute(), syntax=[]), "m", cache=self.cache,
+                        require=('brand_names', 'keywords', 'syntax'))
+        self.assertEqual(self.calls, 2)
+
+    def test_failure_not_cached(self):
+        def fail():
+            raise RuntimeError("model missing")
+        with self.assertRaises(RuntimeError):
+            cached_analysis("text", EN, fail, "m", cache=self.cache)
+        cached_analysis("text", EN, self.compute, "m", cache=self.cache)
+        self.assertEqual(self.calls, 1)
+
+    def test_batch_rerun_skips_nlp(self):
+        old_caches = result_cache._cache, text_cache._cache
+        result_cache._cache = self.cache
+        text_cache._cache = text_cache.TextCache(path=os.path.join(self.temp_dir.name, "text.sqlite"))
+        loads = []
+
+        def counting_model(lang, components=None):
+            loads.append(lang)
+            return blank_model(lang, components)
+
+        try:
+            path = os.path.join(self.temp_dir.name, "doc.html")
+            with open(path, 'w', encoding='utf-8') as file:
+                file.write("<p>Apple sells phones. The store is open every day of the week.</p>")
+            output = os.path.join(self.temp_dir.name, "out.jsonl")
+            run_batch([path], output, get_model=counting_model)
+            with open(output, 'r', encoding='utf-8') as file:
+                first = file.read()
+            run_batch([path], output, get_model=counting_model)
+            with open(output, 'r', encoding='utf-8') as file:
+                second = file.read()
+        finally:
+            result_cache._cache, text_cache._cache = old_caches
+        self.assertEqual(loads, ["en"])
+        self.assertEqual(json.loads(first), json.loads(second))
+
+    def test_file_result_fingerprint(self):
+        key = file_result_key("digest", "stream", ("ner",))
+        self.assertNotEqual(key, file_result_key("digest", "stream", ("ner", "parser")))
+        store_file_result(key, {'lang': "en", 'brand_names': ["Apple"]}, lambda lang: lang + "-v1", cache=self.cache)
+        self.assertEqual(load_file_result(key, lambda lang: lang + "-v1", cache=self.cache)['brand_names'], ["Apple"])
+        # 模型升级或停用词变化后缓存的结果失效
+        self.assertIsNone(load_file_result(key, lambda lang: lang + "-v2", cache=self.cache))
+
+    def test_streamed_rerun_skips_nlp(self):
+        from main_file import analyze_all
+        from main_file.formats import detect_format
+        from main_file.bench_fixtures import make_docx
+        path = make_docx(os.path.join(self.temp_dir.name, "doc.docx"), 20)
+        loads = []
+
+        def counting_model(lang, components=None):
+            loads.append(lang)
+            return blank_model(lang, components)
+
+        texts = text_cache.TextCache(path=os.path.join(self.temp_dir.name, "text.sqlite"))
+        with mock.patch.object(result_cache, '_cache', self.cache), mock.patch.object(text_cache, '_cache', texts), \
+                mock.patch('main_file.text_stream.get_nlp', counting_model), \
+                mock.patch('main_file.analysis_context.get_nlp', counting_model), \
+                mock.patch('builtins.print') as printed:
+            for _ in range(2):
+                analyze_all.analyze_file(path, detect_format(path))
+        self.assertEqual(loads, ["en"])
+        self.assertEqual(printed.call_args_list[:2], printed.call_args_list[2:])
+
+    def test_whole_text_skips_syntax_unless_requested(self):
+        # 不输出句法信息时只加载NER组件，结果缓存中也不保存句法表
+        from main_file import analyze_all
+        from main_file.formats import detect_format
+        from main_file.nlp_models import NER_COMPONENTS
+        path = os.path.join(self.temp_dir.name, "page.html")
+        with open(path, 'w', encoding='utf-8') as file:
+            file.write("<html><body><p>Apple sells phones in every store of the city center.</p></body></html>")
+        requested = []
+
+        def counting_model(lang, components=None):
+            requested.append(tuple(components))
+            return blank_model(lang, components)
+
+        texts = text_cache.TextCache(path=os.path.join(self.temp_dir.name, "text.sqlite"))
+        with mock.patch.object(result_cache, '_cache', self.cache), mock.patch.object(text_cache, '_cache', texts), \
+                mock.patch('main_file.analysis_context.get_nlp', counting_model), mock.patch('builtins.print'):
+            analyze_all.analyze_file(path, detect_format(path))
+            self.assertEqual(requested, [tuple(NER_COMPONENTS)])
+            self.assertEqual([set(result) for result in self.stored_results()], [{'brand_names', 'keywords'}])
+            analyze_all.analyze_file(path, detect_format(path), print_syntax=True)
+        self.assertIn('parser', requested[1])
+        self.assertIn('syntax', self.stored_results()[0])
+
+    def stored_results(self):
+        keys = [row[0] for row in self.cache._connect().execute("SELECT key FROM entries")]
+        return [self.cache.get_result(key) for key in keys]
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,143 @@
+import os
+import json
+import asyncio
+import unittest
+import tempfile
+from main_file.server import AnalysisService, AnalysisServer, MicroBatcher
+from test_support import ruler_model
+
+
+class RecordingModel:
+    # 空白英文模型加实体规则，记录每次 nlp.pipe 收到的文档数
+    def __init__(self):
+        self.nlp = ruler_model()
+        self.batches = []
+
+    def __call__(self, text):
+        return self.nlp(text)
+
+    def pipe(self, texts, **kwargs):
+        texts = list(texts)
+        self.batches.append(len(texts))
+        return self.nlp.pipe(texts)
+
+
+async def http_request(address, method, path, payload=None):
+    reader, writer = await asyncio.open_connection(*address[:2])
+    body = json.dumps(payload).encode('utf-8') if payload is not None else b''
+    writer.write(f"{method} {path} HTTP/1.1\r\nHost: test\r\nContent-Length: {len(body)}\r\n"
+                 f"Connection: close\r\n\r\n".encode('latin-1') + body)
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    head, _, body = response.partition(b'\r\n\r\n')
+    status = int(head.split(b' ', 2)[1])
+    return status, json.loads(body)
+
+
+class TestServer(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.model = RecordingModel()
+        self.service = AnalysisService(get_model=lambda lang, components=None: self.model,
+                                       keyword_fn=lambda text, language: ["Apple", "store"],
+                                       max_batch=8, max_latency=0.2)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def run_with_server(self, scenario):
+        async def main():
+            server = AnalysisServer(self.service)
+            await server.start('127.0.0.1', 0)
+            try:
+                return await scenario(server.address)
+            finally:
+                await server.close()
+        return asyncio.run(main())
+
+    def test_concurrent_requests_are_batched(self):
+        async def scenario(address):
+            requests = [{'text': f"Apple opened store {i}.\nNothing else happened.", 'lang': 'en'} for i in range(6)]
+            return await asyncio.gather(*(http_request(address, 'POST', '/analyze', r) for r in requests))
+
+        responses = self.run_with_server(scenario)
+        self.assertEqual([status for status, _ in responses], [200] * 6)
+        for status, result in responses:
+            self.assertEqual(result['brand_names'], ["Apple"])
+            self.assertEqual(result['keywords'], ["Apple", "store"])
+            self.assertEqual(result['sections'][0][:5], "Apple")
+            self.assertEqual(result['lang'], "en")
+        self.assertEqual(sum(self.model.batches), 6)
+        self.assertLess(len(self.model.batches), 6)
+
+    def test_file_path_request(self):
+        path = os.path.join(self.temp_dir.name, "page.html")
+        with open(path, 'w', encoding='utf-8') as file:
+            file.write("<html><body><p>Apple sells phones in every store of the city center.</p></body></html>")
+
+        async def scenario(address):
+            ok = await http_request(address, 'POST', '/analyze', {'path': path, 'lang': 'en', 'top_k': 1})
+            missing = await http_request(address, 'POST', '/analyze', {'path': path + ".missing"})
+            invalid = await http_request(address, 'POST', '/analyze', {'text': "x", 'path': path})
+            health = await http_request(address, 'GET', '/health')
+            unknown = await http_request(address, 'GET', '/nothing')
+            return ok, missing, invalid, health, unknown
+
+        ok, missing, invalid, health, unknown = self.run_with_server(scenario)
+        self.assertEqual(ok[0], 200)
+        self.assertEqual((ok[1]['path'], ok[1]['brand_names'], len(ok[1]['sections'])), (path, ["Apple"], 1))
+        self.assertEqual([missing[0], invalid[0], unknown[0]], [404, 400, 404])
+        self.assertIn('error', missing[1])
+        self.assertEqual((health[0], health[1]['status'], health[1]['documents']), (200, 'ok', 1))
+
+    def test_failing_document_is_isolated(self):
+        # nlp.pipe 在某篇文档上出错时，只有这篇文档的请求失败，同批的其他请求照常返回
+        class FailingModel(RecordingModel):
+            def pipe(self, texts, **kwargs):
+                for doc in super().pipe(texts, **kwargs):
+                    if "poison" in doc.text:
+                        raise ValueError("bad doc")
+                    yield doc
+
+            def __call__(self, text):
+                if "poison" in text:
+                    raise ValueError("bad doc")
+                return super().__call__(text)
+
+        self.model = FailingModel()
+        items = [self.service.prepare({'text': text, 'lang': 'en'})
+                 for text in ("Apple opened a store.", "poison Apple text.", "Apple sells phones.")]
+        results = self.service.analyze_batch(items)
+        self.assertEqual([results[0]['brand_names'], results[2]['brand_names']], [["Apple"], ["Apple"]])
+        self.assertIsInstance(results[1], ValueError)
+
+    def test_batcher_deadline_and_size(self):
+        batches = []
+
+        def process(items):
+            batches.append(list(items))
+            if 'bad' in items:
+                return [ValueError("bad item") if item == 'bad' else item.upper() for item in items]
+            return [item.upper() for item in items]
+
+        async def scenario():
+            batcher = MicroBatcher(process, max_batch=3, max_latency=0.05)
+            batcher.start()
+            try:
+                results = await asyncio.gather(*(batcher.submit(item) for item in "abcde"))
+                late = await batcher.submit('f')
+                with self.assertRaises(ValueError):
+                    await asyncio.gather(batcher.submit('g'), batcher.submit('bad'))
+                return results, late
+            finally:
+                await batcher.close()
+
+        results, late = asyncio.run(scenario())
+        self.assertEqual(results, list("ABCDE"))
+        self.assertEqual(late, 'F')
+        self.assertEqual([len(batch) for batch in batches[:3]], [3, 2, 1])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,37 @@
+import sys
+import tempfile
+import unittest
+import subprocess
+from main_file import text_normalize
+
+
+class TestStartup(unittest.TestCase):
+    def test_import_loads_no_heavy_modules(self):
+        code = ("import main_file.analyze_all, main_file.analyze_all_1, main_file.batch\n"
+                "from main_file.startup import loaded_heavy_modules\n"
+                "print(','.join(loaded_heavy_modules()))")
+        result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, timeout=60)
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertEqual(result.stdout.strip(), "")
+
+    def test_help_does_not_touch_network(self):
+        result = subprocess.run([sys.executable, '-m', 'main_file.analyze_all', '--help'],
+                                capture_output=True, text=True, timeout=60)
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertIn('--startup-report', result.stdout)
+
+    def test_missing_nltk_resource_is_reported_offline(self):
+        import nltk
+        with tempfile.TemporaryDirectory() as temp_dir:
+            old_path = list(nltk.data.path)
+            nltk.data.path[:] = [temp_dir]
+            try:
+                with self.assertRaises(LookupError) as raised:
+                    text_normalize.ensure_nltk_resource(('corpora/not_installed', 'not_installed'))
+            finally:
+                nltk.data.path[:] = old_path
+        self.assertIn("nltk.downloader not_installed", str(raised.exception))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,80 @@
+import os
+import tempfile
+import unittest
+from spacy.vocab import Vocab
+from spacy.tokens import Doc
+from main_file.chunked_ner import ChunkDoc
+from main_file.syntax_table import (SyntaxTable, syntax_table, syntax_table_from_chunks, iter_syntax_lines,
+                                    NpzSyntaxWriter, read_npz_tables, open_syntax_writer)
+
+try:
+    import pyarrow.parquet as pq
+except ImportError:
+    pq = None
+
+
+class TestSyntaxTable(unittest.TestCase):
+    def setUp(self):
+        self.vocab = Vocab()
+        self.doc = Doc(self.vocab, words=["Apple", "opens", "a", "store", "."],
+                       pos=["PROPN", "VERB", "DET", "NOUN", "PUNCT"],
+                       deps=["nsubj", "ROOT", "det", "dobj", "punct"], heads=[1, 1, 3, 1, 1])
+        self.temp_dir = tempfile.TemporaryDirectory()
+
+    def test_matches_token_attributes(self):
+        table = syntax_table(self.doc)
+        expected = [(t.text, t.pos_, t.dep_, t.head.text) for t in self.doc]
+        self.assertEqual(list(table.rows()), expected)
+        self.assertEqual(table.head.tolist(), [1, 0, 1, -2, -3])
+        self.assertEqual(table.idx.tolist(), [t.idx for t in self.doc])
+        self.assertEqual(table.column('pos').tolist(), [t.pos_ for t in self.doc])
+        self.assertEqual(len(table.strings), len(set(table.strings)))
+        self.assertEqual(next(iter_syntax_lines(table)), "词: Apple, 词性: PROPN, 依存关系: nsubj, 头词: opens")
+
+    def test_chunks_resolve_heads_across_boundaries(self):
+        # 全文 "a b c d"：第一个片段负责 a、b，其中 a 的头词 c 落在第二个片段负责的区间内
+        first = Doc(self.vocab, words=["a", "b", "c"], deps=["dep", "ROOT", "ROOT"], heads=[2, 1, 2])
+        second = Doc(self.vocab, words=["b", "c", "d"], deps=["ROOT", "ROOT", "dep"], heads=[0, 1, 1])
+        table = syntax_table_from_chunks([ChunkDoc(0, 0, 4, first), ChunkDoc(2, 4, 7, second)])
+        self.assertEqual([row[0] for row in table.rows()], ["a", "b", "c", "d"])
+        self.assertEqual(table.head.tolist(), [2, 0, 0, -1])
+        self.assertEqual(table.idx.tolist(), [0, 2, 4, 6])
+        self.assertEqual(syntax_table_from_chunks([]).n_tokens, 0)
+
+    def test_dict_round_trip(self):
+        table = syntax_table(self.doc)
+        restored = SyntaxTable.from_dict(table.to_dict())
+        self.assertEqual(list(restored.rows()), list(table.rows()))
+
+    def test_npz_writer_streams_tables(self):
+        path = os.path.join(self.temp_dir.name, "syntax.npz")
+        second = Doc(self.vocab, words=["Hello"])
+        with open_syntax_writer(path) as writer:
+            self.assertIsInstance(writer, NpzSyntaxWriter)
+            writer.write(syntax_table(self.doc))
+            writer.write(syntax_table(second))
+        tables = list(read_npz_tables(path))
+        self.assertEqual([table.n_tokens for table in tables], [5, 1])
+        self.assertEqual(list(tables[0].rows()), list(syntax_table(self.doc).rows()))
+
+    @unittest.skipIf(pq is None, "需要 pyarrow")
+    def test_parquet_writer(self):
+        path = os.path.join(self.temp_dir.name, "syntax.parquet")
+        with open_syntax_writer(path) as writer:
+            writer.write(syntax_table(self.doc))
+            writer.write(syntax_table(Doc(self.vocab, words=["Hello"], pos=["INTJ"])))
+        data = pq.read_table(path).to_pydict()
+        self.assertEqual(data['text'], ["Apple", "opens", "a", "store", ".", "Hello"])
+        self.assertEqual(data['pos'][-1], "INTJ")
+        self.assertEqual(data['head'][:5], [1, 0, 1, -2, -3])
+
+    def test_unknown_extension(self):
+        with self.assertRaises(ValueError):
+            open_syntax_writer(os.path.join(self.temp_dir.name, "syntax.csv"))
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+
+if __name__ == "__main__":
+    unittest.main()
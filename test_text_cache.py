@@ -0,0 +1,120 @@
+import unittest
+import tempfile
+import os
+from unittest import mock
+from main_file import text_cache, result_cache
+from main_file.text_cache import TextCache, cached_parse, cached_text, file_digest, record_chunks, split_chunks
+from main_file.result_cache import ResultCache
+
+
+class TestTextCache(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.cache = TextCache(path=os.path.join(self.temp_dir.name, "cache.sqlite"), max_bytes=10 * 1024 * 1024)
+        self.file_path = os.path.join(self.temp_dir.name, "doc.txt")
+        with open(self.file_path, 'w', encoding='utf-8') as file:
+            file.write("Hello   world\n\nagain")
+        self.calls = 0
+
+    def parser(self, file_path):
+        self.calls += 1
+        with open(file_path, 'r', encoding='utf-8') as file:
+            return file.read()
+
+    def test_cached_parse_hit(self):
+        first = cached_parse(self.file_path, self.parser, "txt", cache=self.cache)
+        second = cached_parse(self.file_path, self.parser, "txt", cache=self.cache)
+        self.assertEqual(first, "Hello world again")
+        self.assertEqual(second, first)
+        self.assertEqual(self.calls, 1)
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+
+    def test_content_change_invalidates(self):
+        cached_parse(self.file_path, self.parser, "txt", cache=self.cache)
+        with open(self.file_path, 'w', encoding='utf-8') as file:
+            file.write("changed")
+        self.assertEqual(cached_parse(self.file_path, self.parser, "txt", cache=self.cache), "changed")
+        self.assertEqual(self.calls, 2)
+
+    def test_bypass(self):
+        cached_parse(self.file_path, self.parser, "txt", cache=self.cache)
+        cached_parse(self.file_path, self.parser, "txt", cache=self.cache, bypass=True)
+        self.assertEqual(self.calls, 2)
+
+    def test_lru_eviction(self):
+        # 随机内容压缩后每条约1000字节，上限只够保存两条
+        cache = TextCache(path=os.path.join(self.temp_dir.name, "small.sqlite"), max_bytes=2500)
+        payloads = [os.urandom(1000).hex() for _ in range(3)]
+        cache.put("a", payloads[0])
+        cache.put("b", payloads[1])
+        cache.get("a")
+        cache.put("c", payloads[2])
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a"), payloads[0])
+        self.assertEqual(cache.get("c"), payloads[2])
+        self.assertLessEqual(cache.total_size(), 2500)
+
+    def test_running_total(self):
+        # 替换、淘汰和清空后，维护的总大小与实际条目大小一致；旧缓存文件打开时按现有条目初始化
+        path = os.path.join(self.temp_dir.name, "total.sqlite")
+        cache = TextCache(path=path, max_bytes=2500)
+        cache.put("a", os.urandom(1000).hex())
+        cache.put("a", os.urandom(500).hex())
+        cache.put("b", os.urandom(1000).hex())
+        cache.put("c", os.urandom(1000).hex())
+        conn = cache._connect()
+        actual = conn.execute("SELECT SUM(size) FROM entries").fetchone()[0]
+        self.assertEqual(cache.total_size(), actual)
+        self.assertLessEqual(actual, 2500)
+        with conn:
+            conn.execute("DROP TABLE totals")
+        cache._local.conn = None
+        self.assertEqual(cache.total_size(), actual)
+        cache.clear()
+        self.assertEqual(cache.total_size(), 0)
+
+    def test_record_chunks(self):
+        digest = file_digest(self.file_path)
+        self.assertEqual(cached_text(self.file_path, ["stream"], cache=self.cache), (digest, None))
+        chunks = record_chunks(iter([(0, "Hello world"), (1, "again")]), digest, "stream", cache=self.cache)
+        self.assertEqual(next(chunks), (0, "Hello world"))
+        # 片段流没有读完时不写入缓存
+        self.assertIsNone(cached_text(self.file_path, ["stream"], cache=self.cache)[1])
+        self.assertEqual(list(chunks), [(1, "again")])
+        digest, text = cached_text(self.file_path, ["txt", "stream"], cache=self.cache)
+        self.assertEqual(list(split_chunks(text)), [(0, "Hello world"), (1, "again")])
+
+    def test_streamed_file_reuses_cached_text(self):
+        # 第一次流式读取时写入文本缓存，再次分析同一文件时不再逐段提取；缓存的片段走同样的流式分析，输出相同
+        from main_file import analyze_all, text_stream
+        from main_file.formats import detect_format
+        from main_file.bench_fixtures import make_docx
+        from test_support import blank_model
+        path = make_docx(os.path.join(self.temp_dir.name, "doc.docx"), 20)
+        reads = []
+
+        def iter_chunks(file_path, workers=1):
+            reads.append(file_path)
+            return text_stream.iter_chunks(file_path, workers)
+
+        results = ResultCache(path=os.path.join(self.temp_dir.name, "results.sqlite"))
+        with mock.patch.object(text_cache, '_cache', self.cache), mock.patch.object(result_cache, '_cache', results), \
+                mock.patch('main_file.text_stream.get_nlp', blank_model), \
+                mock.patch('main_file.analysis_context.get_nlp', blank_model), \
+                mock.patch.object(analyze_all, 'iter_chunks', iter_chunks), mock.patch('builtins.print') as printed:
+            for _ in range(2):
+                analyze_all.analyze_file(path, detect_format(path))
+                results.clear()
+        self.assertEqual(reads, [path])
+        self.assertEqual(printed.call_args_list[:2], printed.call_args_list[2:])
+        self.assertIsNotNone(cached_text(path, ["docx_chunks"], cache=self.cache)[1])
+
+    def test_file_digest(self):
+        self.assertEqual(len(file_digest(self.file_path)), 64)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+
+if __name__ == "__main__":
+    unittest.main()
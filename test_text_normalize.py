@@ -0,0 +1,46 @@
+import unittest
+from nltk.stem import PorterStemmer
+from main_file.text_normalize import TokenNormalizer, get_stemmer, stem_text, stem_tokens
+
+
+class TestTextNormalize(unittest.TestCase):
+    def setUp(self):
+        self.calls = []
+
+        def normalize_word(word):
+            self.calls.append(word)
+            return word.rstrip('s')
+
+        self.normalizer = TokenNormalizer(normalize_word, maxsize=3)
+
+    def test_unique_tokens_normalized_once(self):
+        tokens = ["cats", "dogs", "cats", "cats", "dogs"] * 1000
+        self.assertEqual(self.normalizer.normalize_tokens(tokens), [token.rstrip('s') for token in tokens])
+        self.assertEqual(sorted(self.calls), ["cats", "dogs"])
+        # 缓存在多篇文档之间共享
+        self.normalizer.normalize_text("dogs and cats")
+        self.assertEqual(sorted(self.calls), ["and", "cats", "dogs"])
+
+    def test_lru_bound(self):
+        self.normalizer.normalize_tokens(["a", "b", "c", "d"])
+        info = self.normalizer.cache_info()
+        self.assertEqual((info.maxsize, info.currsize), (3, 3))
+        self.normalizer.normalize("a")
+        self.assertEqual(self.calls.count("a"), 2)
+
+    def test_normalize_array(self):
+        result = self.normalizer.normalize_array(["cats", "dog", "cats"])
+        self.assertEqual(result.tolist(), ["cat", "dog", "cat"])
+        self.assertEqual(sorted(self.calls), ["cats", "dog"])
+        self.assertEqual(self.normalizer.normalize_array([]).tolist(), [])
+
+    def test_stemmer_matches_nltk(self):
+        stemmer = PorterStemmer()
+        text = "running runners ran easily running"
+        self.assertEqual(stem_text(text), " ".join(stemmer.stem(word) for word in text.split()))
+        self.assertEqual(stem_tokens(["running"]), [stemmer.stem("running")])
+        self.assertIs(get_stemmer(), get_stemmer())
+
+
+if __name__ == "__main__":
+    unittest.main()
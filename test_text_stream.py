@@ -0,0 +1,95 @@
+import unittest
+import tempfile
+import os
+import stat
+import spacy
+from unittest import mock
+from docx import Document
+from main_file.lang_detect import LanguageResult
+from main_file.text_stream import normalize_chunks, iter_chunks, ChunkSampler, analyze_stream
+from main_file.keyword_rank import KeywordGraph
+from test_support import ruler_model
+from main_file.djvu_extract import iter_djvu_pages
+
+
+class TestTextStream(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+
+    def test_normalize_chunks(self):
+        chunks = [(0, "  a \n\n b "), (1, " \t "), (2, "c")]
+        self.assertEqual(list(normalize_chunks(chunks)), [(0, "a b"), (2, "c")])
+
+    def test_iter_chunks_docx(self):
+        path = os.path.join(self.temp_dir.name, "test.docx")
+        doc = Document()
+        doc.add_paragraph("First   paragraph.")
+        doc.add_paragraph("")
+        doc.add_paragraph("Second paragraph.")
+        doc.save(path)
+        self.assertEqual(list(iter_chunks(path)), [(0, "First paragraph."), (2, "Second paragraph.")])
+
+    def test_iter_djvu_pages_with_fake_djvutxt(self):
+        script = os.path.join(self.temp_dir.name, "djvutxt")
+        with open(script, 'w') as file:
+            file.write("#!/bin/sh\nprintf 'page one\\n\\fpage two\\n\\fpage three\\n'\n")
+        os.chmod(script, os.stat(script).st_mode | stat.S_IEXEC)
+        old_path = os.environ["PATH"]
+        os.environ["PATH"] = self.temp_dir.name + os.pathsep + old_path
+        try:
+            pages = list(iter_djvu_pages("book.djvu"))
+        finally:
+            os.environ["PATH"] = old_path
+        self.assertEqual(pages, [(0, "page one\n"), (1, "page two\n"), (2, "page three\n")])
+
+    def test_chunk_sampler_is_bounded(self):
+        sampler = ChunkSampler(size=5, seed=1)
+        for i in range(1000):
+            sampler.add(i, f"chunk{i}")
+        self.assertEqual(len(sampler.items), 5)
+        self.assertEqual(sampler.seen, 1000)
+        indexes = [index for index, _ in sampler.items]
+        self.assertTrue(any(index >= 5 for index in indexes))
+
+    def test_analyze_stream(self):
+        nlp = ruler_model()
+        chunks = [(i, f"Apple page {i}.") for i in range(20)]
+        seen = []
+        result = analyze_stream(iter(chunks), language=LanguageResult("en", 1.0), nlp=nlp,
+                                keyword_graph=lambda language: KeywordGraph(language.lang),
+                                on_doc=lambda index, doc: seen.append(index))
+        self.assertEqual(result.brand_names, ["Apple"] * 20)
+        self.assertEqual(seen, list(range(20)))
+        self.assertEqual(set(result.keywords[:2]), {"apple", "page"})
+
+    def test_language_sampled_from_whole_stream(self):
+        # 开头几页是英文、正文是俄文：语言样本从整个片段流中抽取，不只看开头
+        nlp = spacy.blank("ru")
+        english = [(i, "This introduction is written in English for the cover page. " * 4) for i in range(10)]
+        russian = [(i, "Компания открыла новый магазин в центре города и продает телефоны. " * 4)
+                   for i in range(10, 200)]
+        sampled = []
+
+        def detect(text, **kwargs):
+            sampled.append(text)
+            return LanguageResult("ru" if "Компания" in text else "en", 1.0)
+
+        with mock.patch('main_file.text_stream.detect_language', detect):
+            result = analyze_stream(iter(english + russian), nlp=nlp, detect_chars=2000)
+        self.assertEqual(result.language.lang, "ru")
+        self.assertLessEqual(len(sampled[0]), 2000 + 10)
+
+    def test_keywords_cover_every_chunk(self):
+        # 关键词基于所有片段：只在最后的片段中出现的高频词也能排在前面
+        chunks = [(i, f"filler{i} text{i}") for i in range(500)]
+        chunks += [(500 + i, "marketing budget marketing plan marketing") for i in range(50)]
+        result = analyze_stream(iter(chunks), language=LanguageResult("en", 1.0), nlp=spacy.blank("en"),
+                                keyword_graph=lambda language: KeywordGraph(language.lang))
+        self.assertEqual(result.keywords[0], "marketing")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+
+if __name__ == "__main__":
+    unittest.main()